@@ -1,17 +1,59 @@
 import psutil
+import asyncio
 import time
 import os
+import json
+import threading
+import numpy as np
+from latency_histogram import LatencyHistogram
+from connection_timing import PHASES as CONNECTION_PHASES
+
+# Series recorded by the background sampler, in the order they appear in the timeline
+TIMELINE_SERIES = ("rss_mb", "cpu_percent", "threads", "open_fds", "sockets")
+
+class ConfigOverlay:
+    """Read-only view of the config module with some settings replaced.
+
+    Senders only read settings through `self.config`, so passing an overlay lets one process run
+    the same sender class with different settings (e.g. each step of a saturation sweep)
+    without touching the global config.
+    """
+    def __init__(self, base, **overrides):
+        self._base = base
+        self._overrides = overrides
+
+    def __getattr__(self, name):
+        overrides = self.__dict__.get("_overrides", {})
+        if name in overrides:
+            return overrides[name]
+        return getattr(self._base, name)
+
+    def as_env(self):
+        """The overrides as environment variables, for benchmark subprocesses (config reads them on import)."""
+        return {name: (str(value).lower() if isinstance(value, bool) else str(value)) for name, value in self._overrides.items()}
+
 
 class ResourceMonitor:
-    """A simple class to monitor CPU and memory usage."""
-    def __init__(self, process_name_hint="benchmark_process"):
+    """A simple class to monitor CPU and memory usage.
+
+    Besides the start/stop snapshots, a background thread samples RSS, CPU%, thread count,
+    open file descriptors and socket count every `sample_interval_s` seconds so transient
+    peaks (pool warm-up, TLS handshakes, response buffering) show up. Set it to 0 to disable.
+    """
+    def __init__(self, process_name_hint="benchmark_process", sample_interval_s=0.1):
         self.process = psutil.Process(os.getpid())
         self.process_name_hint = process_name_hint # For logging/labeling if needed
+        self.sample_interval_s = sample_interval_s
         self.cpu_time_start = 0
         self.memory_start_mb = 0
         self.duration_seconds = 0
+        self.cpu_time_percent = 0
+        self.memory_increase_mb = 0
         self._monitoring_start_time = 0
         self._is_running = False # Add a flag
+        self._timeline = {"t_s": [], **{name: [] for name in TIMELINE_SERIES}}
+        self._sampler_thread = None
+        self._sampler_stop = threading.Event()
 
     def start(self):
         """Start monitoring resources."""
@@ -20,6 +62,11 @@ class ResourceMonitor:
         self.memory_start_mb = self.process.memory_info().rss / (1024 * 1024) # Convert bytes to MB
         self._monitoring_start_time = time.perf_counter()
         self._is_running = True # Set flag to true
+        self._take_sample()
+        if self.sample_interval_s and self.sample_interval_s > 0:
+            self._sampler_stop.clear()
+            self._sampler_thread = threading.Thread(target=self._sample_loop, name=f"{self.process_name_hint}_sampler", daemon=True)
+            self._sampler_thread.start()
         print(f"Resource monitor started for '{self.process_name_hint}'. Initial Mem: {self.memory_start_mb:.2f} MB")
 
     def stop(self):
@@ -31,6 +78,11 @@ class ResourceMonitor:
         self._monitoring_end_time = time.perf_counter()
         self.duration_seconds = self._monitoring_end_time - self._monitoring_start_time
         self._is_running = False # Set flag to false
+        if self._sampler_thread:
+            self._sampler_stop.set()
+            self._sampler_thread.join()
+            self._sampler_thread = None
+        self._take_sample()
         
         # CPU
         cpu_time_end = self.process.cpu_times().user + self.process.cpu_times().system
@@ -53,6 +105,53 @@ class ResourceMonitor:
         print(f"Resource monitor stopped for '{self.process_name_hint}'. Duration: {self.duration_seconds:.2f}s, Final Mem: {memory_end_mb:.2f} MB, Increase: {self.memory_increase_mb:.2f} MB, CPU Time Percent: {self.cpu_time_percent:.2f}%")
         return self.get_results()
 
+    def _sample_loop(self):
+        while not self._sampler_stop.wait(self.sample_interval_s):
+            self._take_sample()
+
+    def _take_sample(self):
+        """Appends one point to the resource timeline."""
+        try:
+            with self.process.oneshot():
+                rss_mb = self.process.memory_info().rss / (1024 * 1024)
+                cpu_percent = self.process.cpu_percent(interval=None) # Since the previous sample
+                threads = self.process.num_threads()
+                # num_fds is POSIX-only; Windows exposes handles instead
+                open_fds = self.process.num_fds() if hasattr(self.process, "num_fds") else self.process.num_handles()
+            # net_connections() replaced connections() in psutil 6
+            get_connections = getattr(self.process, "net_connections", None) or self.process.connections
+            sockets = len(get_connections(kind="inet"))
+        except (psutil.Error, OSError) as e:
+            print(f"Warning: resource sample failed for '{self.process_name_hint}': {e}")
+            return
+        timeline = self._timeline
+        timeline["t_s"].append(round(time.perf_counter() - self._monitoring_start_time, 4))
+        timeline["rss_mb"].append(round(rss_mb, 2))
+        timeline["cpu_percent"].append(round(cpu_percent, 1))
+        timeline["threads"].append(threads)
+        timeline["open_fds"].append(open_fds)
+        timeline["sockets"].append(sockets)
+
+    def get_timeline(self):
+        """Return the raw sampled series (columnar: one list per metric plus `t_s`)."""
+        return {"interval_s": self.sample_interval_s, **{name: list(values) for name, values in self._timeline.items()}}
+
+    def get_timeline_stats(self):
+        """Return peak/avg/p95 for every sampled series, e.g. {"peak_rss_mb": ..., "avg_rss_mb": ..., "p95_rss_mb": ...}."""
+        stats = {}
+        for name in TIMELINE_SERIES:
+            values = self._timeline[name]
+            if name == "cpu_percent":
+                values = values[1:] # The first reading only primes psutil's CPU counter
+            if values:
+                series = np.asarray(values, dtype=float)
+                stats[f"peak_{name}"] = round(float(series.max()), 2)
+                stats[f"avg_{name}"] = round(float(series.mean()), 2)
+                stats[f"p95_{name}"] = round(float(np.percentile(series, 95)), 2)
+            else:
+                stats[f"peak_{name}"] = stats[f"avg_{name}"] = stats[f"p95_{name}"] = None
+        return stats
+
     def get_results(self):
         """Return a dictionary of the collected resource usage."""
         return {
@@ -62,9 +161,313 @@ class ResourceMonitor:
             "memory_start_mb": round(self.memory_start_mb, 2),
             "memory_end_mb": round(self.process.memory_info().rss / (1024 * 1024), 2), # Get current end MB
             "memory_increase_mb": round(self.memory_increase_mb, 2),
+            **self.get_timeline_stats(),
+            "timeline": self.get_timeline(),
             "timestamp": time.time() # Current timestamp for when results are fetched
         }
     
     def is_running(self): # Add the new method
         """Check if the monitor is currently running."""
-        return self._is_running 
\ No newline at end of file
+        return self._is_running 
+
+class AttemptLog:
+    """Append-only NDJSON file of per-attempt records, written while the benchmark runs.
+
+    Records are streamed to disk instead of being accumulated in memory, so the harness
+    stays flat regardless of message count. Safe to share between worker threads.
+    """
+    def __init__(self, path):
+        self.path = path
+        self.count = 0
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._file = open(path, "w", encoding="utf-8")
+
+    def write(self, record):
+        line = json.dumps(record, separators=(",", ":")) + "\n"
+        with self._lock:
+            self._file.write(line)
+            self.count += 1
+
+    def close(self):
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+def build_arrival_offsets(num_messages, arrival, rate_msg_per_sec, ramp_start_rate_msg_per_sec=1.0, seed=None):
+    """Intended send time of each message, in seconds from the start of an open-loop run.
+
+    "constant" spaces messages 1/rate apart, "poisson" draws exponential inter-arrival times
+    with mean 1/rate, and "ramp" raises the rate linearly from `ramp_start_rate_msg_per_sec`
+    to `rate_msg_per_sec` over the run.
+    """
+    if rate_msg_per_sec <= 0:
+        raise ValueError("OPEN_LOOP_RATE_MSG_PER_SEC must be positive.")
+    indices = np.arange(num_messages, dtype=np.float64)
+    if arrival == "constant":
+        return indices / rate_msg_per_sec
+    if arrival == "poisson":
+        gaps = np.random.default_rng(seed).exponential(1 / rate_msg_per_sec, num_messages)
+        return np.concatenate(([0.0], np.cumsum(gaps[:-1])))
+    if arrival == "ramp":
+        start_rate, end_rate = max(ramp_start_rate_msg_per_sec, 1e-9), rate_msg_per_sec
+        if np.isclose(start_rate, end_rate):
+            return indices / end_rate
+        # rate(t) = start + slope*t over duration T with (start + end) / 2 * T = num_messages;
+        # message i is sent when the cumulative count start*t + slope*t**2/2 reaches i
+        duration_s = 2 * num_messages / (start_rate + end_rate)
+        slope = (end_rate - start_rate) / duration_s
+        return (np.sqrt(start_rate ** 2 + 2 * slope * indices) - start_rate) / slope
+    raise ValueError(f"Unknown OPEN_LOOP_ARRIVAL: {arrival}")
+
+
+class SendSchedule:
+    """Intended send times for an open-loop run.
+
+    Workers call `wait_sync(i)` / `await wait_async(i)` before sending message i; both sleep until
+    the message's slot and return its intended start time (a perf_counter value), which is what
+    latency is measured from. A message picked up late because every worker was busy therefore
+    carries its queueing delay instead of silently lowering the offered load.
+    """
+    def __init__(self, offsets_s):
+        self.offsets_s = offsets_s
+        self.start_time = None
+
+    def start(self):
+        self.start_time = time.perf_counter()
+
+    def intended_time(self, index):
+        return self.start_time + float(self.offsets_s[index])
+
+    def wait_sync(self, index):
+        intended = self.intended_time(index)
+        delay = intended - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        return intended
+
+    async def wait_async(self, index):
+        intended = self.intended_time(index)
+        delay = intended - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return intended
+
+    def target_rate_msg_per_sec(self):
+        """Average offered rate over the whole schedule."""
+        if len(self.offsets_s) < 2 or self.offsets_s[-1] <= 0:
+            return 0.0
+        return (len(self.offsets_s) - 1) / float(self.offsets_s[-1])
+
+
+class AttemptRecorder:
+    """Preallocated struct-of-arrays store for per-attempt measurements.
+
+    The hot loop writes each attempt's numeric fields into fixed NumPy columns by message
+    index (no per-attempt objects are kept), and `summarize()` computes every statistic in one
+    vectorized pass. Text details (response snippet, error) are streamed to the attempt log.
+    Attempts flagged as warm-up are executed and logged but left out of the steady-state
+    statistics; `window="warmup"` summarizes them on their own.
+    """
+    TIME_COLUMNS = ("db_read_time_ms", "http_request_time_ms", "total_processing_time_ms", "queue_delay_ms", "pool_acquire_ms")
+    # Phase names used for workflow keys and histograms, e.g. "p99_9_http_send_time_s"
+    PHASE_NAMES = {
+        "db_read_time_ms": "db_read_time",
+        "http_request_time_ms": "http_send_time",
+        "total_processing_time_ms": "total_processing_time",
+        "queue_delay_ms": "queue_delay", # Intended -> actual start; always 0 in closed-loop runs
+        "pool_acquire_ms": "pool_acquire_wait", # Waiting for a pooled DB connection
+    }
+
+    def __init__(self, capacity, log_path):
+        self.capacity = capacity
+        self.recorded = np.zeros(capacity, dtype=np.bool_) # Slot i holds a completed attempt
+        self.success = np.zeros(capacity, dtype=np.bool_)
+        self.status_code = np.zeros(capacity, dtype=np.int32) # 0 when no HTTP status was received
+        self.response_size_bytes = np.zeros(capacity, dtype=np.int64)
+        # One row per attempt, one column per TIME_COLUMNS entry
+        self.times_ms = np.zeros((capacity, len(self.TIME_COLUMNS)), dtype=np.float64)
+        # Connection lifecycle phases (connection_timing.PHASES); NaN where the library didn't report a phase
+        self.connection_ms = np.full((capacity, len(CONNECTION_PHASES)), np.nan, dtype=np.float64)
+        self.connection_reused = np.full(capacity, -1, dtype=np.int8) # -1 unknown, 0 new connection, 1 reused
+        self.started_at_s = np.zeros(capacity, dtype=np.float64) # Seconds since start()
+        self.completed_at_s = np.zeros(capacity, dtype=np.float64)
+        self.warmup = np.zeros(capacity, dtype=np.bool_)
+        self.started_at = time.perf_counter()
+        self.log = AttemptLog(log_path)
+
+    def start(self):
+        """Marks the start of the run; completion times are measured from here."""
+        self.started_at = time.perf_counter()
+
+    @property
+    def path(self):
+        return self.log.path
+
+    def record(self, index, status_code, success, response_size_bytes, db_read_time_ms, http_request_time_ms,
+               total_processing_time_ms, queue_delay_ms=0.0, pool_acquire_ms=0.0, response_text=None, error_message=None,
+               connection_phases_ms=None, connection_reused=None, started_at=None, completed_at=None, warmup=False):
+        completed_at_s = (completed_at if completed_at is not None else time.perf_counter()) - self.started_at
+        started_at_s = started_at - self.started_at if started_at is not None else completed_at_s - total_processing_time_ms / 1000
+        self.status_code[index] = status_code or 0
+        self.success[index] = success
+        self.response_size_bytes[index] = response_size_bytes or 0
+        self.times_ms[index] = (db_read_time_ms, http_request_time_ms, total_processing_time_ms, queue_delay_ms, pool_acquire_ms)
+        if connection_phases_ms:
+            self.connection_ms[index] = [np.nan if connection_phases_ms.get(phase) is None else connection_phases_ms[phase]
+                                         for phase in CONNECTION_PHASES]
+        if connection_reused is not None:
+            self.connection_reused[index] = int(connection_reused)
+        self.started_at_s[index] = started_at_s
+        self.completed_at_s[index] = completed_at_s
+        self.warmup[index] = warmup
+        self.recorded[index] = True
+        self.log.write({
+            "attempt": index, # Message index; records are logged in completion order
+            "status_code": status_code,
+            "response_text_snippet": response_text[:100] if response_text else None,
+            "response_size_bytes": response_size_bytes,
+            "db_read_time_ms": round(db_read_time_ms, 2),
+            "http_request_time_ms": round(http_request_time_ms, 2),
+            "total_processing_time_ms": round(total_processing_time_ms, 2),
+            "queue_delay_ms": round(queue_delay_ms, 2),
+            "pool_acquire_ms": round(pool_acquire_ms, 2),
+            "connection_phases_ms": {phase: round(value, 2) for phase, value in connection_phases_ms.items() if value is not None}
+                                    if connection_phases_ms else None,
+            "connection_reused": connection_reused,
+            "completed_at_s": round(completed_at_s, 4),
+            "warmup": warmup,
+            "success": success,
+            "error_message": str(error_message) if error_message else None
+        })
+
+    def close(self):
+        self.log.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _window(self, window):
+        """Recorded attempts of `window`: "steady" (warm-up excluded), "warmup" or "all"."""
+        if window == "steady":
+            return self.recorded & ~self.warmup
+        if window == "warmup":
+            return self.recorded & self.warmup
+        if window == "all":
+            return self.recorded
+        raise ValueError(f"Unknown window: {window}")
+
+    def summarize(self, window="steady"):
+        """Counts plus avg/p95/p99/std (ms) of every time column and avg response size, over successful attempts."""
+        attempts = self._window(window)
+        total_attempts = int(attempts.sum())
+        ok = attempts & self.success
+        successful = int(ok.sum())
+        stats = {"total_attempts": total_attempts, "successful": successful, "failed": total_attempts - successful}
+        if successful:
+            times = self.times_ms[ok]
+            means = times.mean(axis=0)
+            p95, p99 = np.percentile(times, [95, 99], axis=0)
+            stds = times.std(axis=0)
+            stats["avg_response_size_bytes"] = float(self.response_size_bytes[ok].mean())
+        else:
+            means = p95 = p99 = stds = np.zeros(len(self.TIME_COLUMNS))
+            stats["avg_response_size_bytes"] = 0.0
+        for col, name in enumerate(self.TIME_COLUMNS):
+            stats[name] = {"avg": float(means[col]), "p95": float(p95[col]), "p99": float(p99[col]), "std": float(stds[col])}
+        return stats
+
+    def summarize_connection_phases(self, window="steady"):
+        """avg/p50/p95/p99 (ms) of each connection phase, over the successful attempts that reported it, plus reuse counts."""
+        ok = self._window(window) & self.success
+        phases = {}
+        for col, phase in enumerate(CONNECTION_PHASES):
+            values = self.connection_ms[ok, col]
+            values = values[~np.isnan(values)]
+            if values.size:
+                p50, p95, p99 = np.percentile(values, [50, 95, 99])
+                phases[phase] = {"avg": float(values.mean()), "p50": float(p50), "p95": float(p95), "p99": float(p99)}
+            else:
+                phases[phase] = None # Not exposed by this library's hooks
+        reused = self.connection_reused[ok]
+        known = reused[reused >= 0]
+        return {
+            "phases": phases,
+            "new_connections": int((known == 0).sum()),
+            "reused_connections": int((known == 1).sum()),
+            "connection_reuse_percent": float((known == 1).mean() * 100) if known.size else None,
+        }
+
+    def build_histograms(self, window="steady"):
+        """One LatencyHistogram per phase, over successful attempts, keyed by PHASE_NAMES."""
+        ok = self._window(window) & self.success
+        histograms = {}
+        for col, name in enumerate(self.TIME_COLUMNS):
+            histogram = LatencyHistogram()
+            histogram.record_ms(self.times_ms[ok, col])
+            histograms[self.PHASE_NAMES[name]] = histogram
+        return histograms
+
+    def first_attempt_ms(self):
+        """Total processing time of the run's first message (cold connection, cold caches), or None."""
+        if self.capacity == 0 or not self.recorded[0]:
+            return None
+        return float(self.times_ms[0, self.TIME_COLUMNS.index("total_processing_time_ms")])
+
+    def steady_duration_s(self):
+        """From the first steady-state start to the last steady-state completion (None without warm-up attempts).
+
+        Warm-up and steady attempts overlap under concurrency, so the window spans every steady attempt.
+        """
+        warmup, steady = self._window("warmup"), self._window("steady")
+        if not warmup.any() or not steady.any():
+            return None
+        return float(self.completed_at_s[steady].max() - self.started_at_s[steady].min())
+
+    def summarize_time_windows(self, window_s):
+        """Per-window completions, failures, throughput and total-time latency (s), warm-up included, by completion time.
+
+        The last window ends at the last completion, so its throughput is over its real length.
+        """
+        attempts = self.recorded
+        if not attempts.any() or window_s <= 0:
+            return []
+        completed_at_s = self.completed_at_s[attempts]
+        success = self.success[attempts]
+        buckets = (completed_at_s // window_s).astype(np.int64)
+        num_windows = int(buckets.max()) + 1
+        completed = np.bincount(buckets, minlength=num_windows)
+        succeeded = np.bincount(buckets[success], minlength=num_windows)
+        warmup = np.bincount(buckets[self.warmup[attempts]], minlength=num_windows)
+
+        # Successful latencies grouped by window: sort once, split at the per-window counts
+        ok_buckets = buckets[success]
+        order = np.argsort(ok_buckets, kind="stable")
+        latencies_s = self.times_ms[attempts][success, self.TIME_COLUMNS.index("total_processing_time_ms")][order] / 1000
+        latencies_by_window = np.split(latencies_s, np.cumsum(succeeded)[:-1])
+
+        last_window_s = float(completed_at_s.max()) - (num_windows - 1) * window_s
+        windows = []
+        for bucket, latencies in enumerate(latencies_by_window):
+            length_s = last_window_s if bucket == num_windows - 1 else window_s
+            p50, p99 = np.percentile(latencies, [50, 99]) if latencies.size else (None, None)
+            windows.append({
+                "t_s": round(bucket * window_s, 3),
+                "completed": int(completed[bucket]),
+                "failed": int(completed[bucket] - succeeded[bucket]),
+                "warmup": int(warmup[bucket]),
+                "throughput_msg_per_sec": round(int(completed[bucket]) / length_s, 2) if length_s > 0 else None,
+                "avg_total_processing_time_s": round(float(latencies.mean()), 5) if latencies.size else None,
+                "p50_total_processing_time_s": round(float(p50), 5) if p50 is not None else None,
+                "p99_total_processing_time_s": round(float(p99), 5) if p99 is not None else None,
+            })
+        return windows
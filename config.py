@@ -3,6 +3,10 @@ from dotenv import load_dotenv
 
 load_dotenv() # Load variables from .env file
 
+def _env_bool(name, default="false"):
+    """Reads a true/false style environment variable."""
+    return os.getenv(name, default).strip().lower() in ("1", "true", "yes", "on")
+
 # --- Telegram API Configuration ---
 # Fallback to placeholders if not set in environment variables
 TELEGRAM_BOT_TOKEN = os.getenv('TELEGRAM_BOT_TOKEN')
@@ -11,21 +15,149 @@ TELEGRAM_CHAT_ID = os.getenv('TELEGRAM_CHAT_ID')  # Updated to the new chat ID
 if TELEGRAM_BOT_TOKEN == 'YOUR_TELEGRAM_BOT_TOKEN':
     print("WARNING: Telegram Bot Token is not set. Please create a .env file with TELEGRAM_BOT_TOKEN or update config.py.")
 
-TELEGRAM_API_URL_TEMPLATE = "https://api.telegram.org/bot{token}/sendMessage"
+# --- Local Telegram Bot API stand-in (mock_telegram_server.py) ---
+# When enabled, main.py starts the mock in a subprocess and every sender targets it instead of
+# api.telegram.org, so client overhead can be measured far beyond Telegram's ~30 msg/s bot limit.
+USE_MOCK_TELEGRAM_SERVER = _env_bool('USE_MOCK_TELEGRAM_SERVER')
+MOCK_SERVER_HOST = os.getenv('MOCK_SERVER_HOST', '127.0.0.1')
+MOCK_SERVER_PORT = int(os.getenv('MOCK_SERVER_PORT', '8081'))
+MOCK_SERVER_HTTP2 = _env_bool('MOCK_SERVER_HTTP2', 'true') # Offer h2 via ALPN (cleartext h2c always works with prior knowledge)
+MOCK_SERVER_CERTFILE = os.getenv('MOCK_SERVER_CERTFILE') # Optional TLS; serves https:// when set
+MOCK_SERVER_KEYFILE = os.getenv('MOCK_SERVER_KEYFILE')
+MOCK_LATENCY_DISTRIBUTION = os.getenv('MOCK_LATENCY_DISTRIBUTION', 'lognormal') # constant, uniform, normal, lognormal, exponential
+MOCK_LATENCY_MEAN_MS = float(os.getenv('MOCK_LATENCY_MEAN_MS', '40'))
+MOCK_LATENCY_STDDEV_MS = float(os.getenv('MOCK_LATENCY_STDDEV_MS', '15'))
+MOCK_ERROR_RATE = float(os.getenv('MOCK_ERROR_RATE', '0.0')) # Fraction of requests answered with HTTP 500
+MOCK_RATE_LIMIT_RATE = float(os.getenv('MOCK_RATE_LIMIT_RATE', '0.0')) # Fraction of requests answered with HTTP 429
+MOCK_RETRY_AFTER_S = int(os.getenv('MOCK_RETRY_AFTER_S', '1'))
+
+if USE_MOCK_TELEGRAM_SERVER:
+    _mock_scheme = "https" if MOCK_SERVER_CERTFILE else "http"
+    TELEGRAM_API_BASE_URL = f"{_mock_scheme}://{MOCK_SERVER_HOST}:{MOCK_SERVER_PORT}"
+else:
+    TELEGRAM_API_BASE_URL = os.getenv('TELEGRAM_API_BASE_URL', 'https://api.telegram.org').rstrip('/')
+
+TELEGRAM_API_URL_TEMPLATE = TELEGRAM_API_BASE_URL + "/bot{token}/sendMessage"
 
 # --- Benchmark Parameters ---
 NUM_MESSAGES = int(os.getenv('NUM_MESSAGES'))  # Number of messages to send for each library
 MAX_CONCURRENT_REQUESTS_PER_LIBRARY = int(os.getenv('MAX_CONCURRENT_REQUESTS_PER_LIBRARY'))
 
-# List of library names (keys from SENDER_CLASSES in main.py) to test.
-# If empty or None, all available libraries will be tested.
-# Example: LIBRARIES_TO_TEST = ["httpx", "aiohttp"]
-LIBRARIES_TO_TEST = []  # Test all by default
+# Sync senders (requests, urllib3): "serial" sends one message at a time over a single DB connection,
+# "threaded" drives them from a ThreadPoolExecutor so they can be compared with N in-flight async coroutines.
+SYNC_EXECUTION_MODE = os.getenv('SYNC_EXECUTION_MODE', 'serial')
+SYNC_THREAD_WORKERS = int(os.getenv('SYNC_THREAD_WORKERS', MAX_CONCURRENT_REQUESTS_PER_LIBRARY))
+
+# Run each library in a fresh subprocess (isolated_runner.py) that imports only its own sender,
+# so memory_increase_mb / cpu_time_percent are not skewed by libraries benchmarked earlier.
+ISOLATE_LIBRARIES_IN_SUBPROCESS = _env_bool('ISOLATE_LIBRARIES_IN_SUBPROCESS')
+
+# Event loop for main.py and the async senders: "asyncio" (default loop), "uvloop" (if installed) or "tuned"
+# (see event_loops.py). EVENT_LOOP_MATRIX runs every async sender once per EVENT_LOOP_BACKENDS entry
+# (default: all available) in its own subprocess and reports the throughput / CPU / p99 change per backend.
+EVENT_LOOP = os.getenv('EVENT_LOOP', 'asyncio')
+EVENT_LOOP_MATRIX = _env_bool('EVENT_LOOP_MATRIX')
+EVENT_LOOP_BACKENDS = [backend.strip() for backend in os.getenv('EVENT_LOOP_BACKENDS', '').split(',') if backend.strip()]
+
+# httpx protocol: "1.1" or "2" (h2c with prior knowledge against a cleartext URL, ALPN over TLS), and its
+# connection cap (0 = one per in-flight request). HTTP_PROTOCOL_MATRIX benchmarks http2-capable senders once per
+# HTTP_PROTOCOL_MODES entry (see protocol_matrix.py), e.g. HTTP/1.1 vs HTTP/2 vs HTTP/2 over a single connection.
+HTTPX_HTTP_VERSION = os.getenv('HTTPX_HTTP_VERSION', '2')
+# The sync httpx senders (httpx-sync, httpx-client) stay on HTTP/1.1 like requests and urllib3, so the cold
+# per-call vs pooled comparison isn't mixed up with a protocol change (the protocol matrix sets both)
+HTTPX_SYNC_HTTP_VERSION = os.getenv('HTTPX_SYNC_HTTP_VERSION', '1.1')
+HTTPX_MAX_CONNECTIONS = int(os.getenv('HTTPX_MAX_CONNECTIONS', '0'))
+HTTP_PROTOCOL_MATRIX = _env_bool('HTTP_PROTOCOL_MATRIX')
+HTTP_PROTOCOL_MODES = [mode.strip() for mode in os.getenv('HTTP_PROTOCOL_MODES', '').split(',') if mode.strip()]
+
+# Per-request DNS / connect / TLS / request write / TTFB / body read timing and keep-alive reuse, from
+# aiohttp trace hooks, httpcore's trace extension and instrumented urllib3 connections (connection_timing.py)
+CONNECTION_PHASE_TIMING = _env_bool('CONNECTION_PHASE_TIMING', 'true')
+
+# Warm-up: WARMUP_MESSAGES extra messages are sent first, and any message started within WARMUP_SECONDS of the
+# run's start is warm-up too. Warm-up attempts are executed and logged but excluded from the statistics, and
+# reported separately as cold-start figures. TIME_WINDOW_S sets the width of the per-window throughput/latency series.
+WARMUP_MESSAGES = int(os.getenv('WARMUP_MESSAGES', '0'))
+WARMUP_SECONDS = float(os.getenv('WARMUP_SECONDS', '0'))
+TIME_WINDOW_S = float(os.getenv('TIME_WINDOW_S', '1.0'))
+
+# Repeated trials (trials.py): run the whole library list TRIALS times in rotated order, report confidence
+# intervals and test every pairwise ranking for significance. Needs TRIALS >= 4 for p < 0.05 to be reachable.
+TRIALS = max(1, int(os.getenv('TRIALS', '1')))
+SIGNIFICANCE_ALPHA = float(os.getenv('SIGNIFICANCE_ALPHA', '0.05'))
+BOOTSTRAP_RESAMPLES = int(os.getenv('BOOTSTRAP_RESAMPLES', '2000'))
+
+# Sender logging (event_log.py) goes through a queue drained by a background thread, off the measured path.
+# LOG_LEVEL: DEBUG (every send and error detail), INFO (progress summaries), WARNING or "quiet" (problems only).
+LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
+LOG_FORMAT = os.getenv('LOG_FORMAT', 'text') # "text" or "json" (one object per event, with its fields)
+LOG_PROGRESS_EVERY_N = int(os.getenv('LOG_PROGRESS_EVERY_N', '1000')) # Progress summary every N attempts (0 = off)
+LOG_PROGRESS_EVERY_S = float(os.getenv('LOG_PROGRESS_EVERY_S', '5')) # ... or every S seconds (0 = off)
+
+# Interval of the background resource sampler (RSS, CPU%, threads, FDs, sockets). 0 disables sampling.
+RESOURCE_SAMPLE_INTERVAL_S = float(os.getenv('RESOURCE_SAMPLE_INTERVAL_S', '0.1'))
+
+# "closed": each worker sends its next message as soon as the previous one finishes (offered load adapts to latency).
+# "open": messages are scheduled at a target arrival rate regardless of how fast responses come back, and latency is
+# measured from each message's intended send time, so queueing delay behind slow responses is not hidden.
+LOAD_MODEL = os.getenv('LOAD_MODEL', 'closed')
+OPEN_LOOP_ARRIVAL = os.getenv('OPEN_LOOP_ARRIVAL', 'constant') # constant, poisson or ramp
+OPEN_LOOP_RATE_MSG_PER_SEC = float(os.getenv('OPEN_LOOP_RATE_MSG_PER_SEC', '50'))
+# Ramp arrivals: the rate rises linearly from the start rate to OPEN_LOOP_RATE_MSG_PER_SEC over the run
+OPEN_LOOP_RAMP_START_RATE_MSG_PER_SEC = float(os.getenv('OPEN_LOOP_RAMP_START_RATE_MSG_PER_SEC', '1'))
+OPEN_LOOP_SEED = int(os.getenv('OPEN_LOOP_SEED', '42')) # Seed for Poisson inter-arrival times
+
+# Where the send loop gets its messages: "per_message" runs a SELECT before every send; "prefetch" streams
+# rows in batches of PREFETCH_BATCH_SIZE from a cursor into a bounded queue (at most PREFETCH_QUEUE_BATCHES
+# batches ahead), like a worker draining an outbox table.
+MESSAGE_SOURCE = os.getenv('MESSAGE_SOURCE', 'per_message') # per_message, prefetch or outbox
+PREFETCH_BATCH_SIZE = int(os.getenv('PREFETCH_BATCH_SIZE', '100'))
+PREFETCH_QUEUE_BATCHES = int(os.getenv('PREFETCH_QUEUE_BATCHES', '4'))
+
+# "outbox" seeds NUM_MESSAGES unsent rows per library and drains them like a production outbox worker:
+# claim OUTBOX_CLAIM_BATCH_SIZE rows with FOR UPDATE SKIP LOCKED, send them, bulk-UPDATE them as sent.
+OUTBOX_CLAIM_BATCH_SIZE = int(os.getenv('OUTBOX_CLAIM_BATCH_SIZE', '10'))
+
+# Bulk test data: after setup, load DATASET_ROWS generated messages (split evenly across the LIBRARIES_TO_TEST libraries) with
+# COPY FROM STDIN ("copy", psycopg2) or asyncpg's copy_records_to_table ("asyncpg"). 0 keeps the 7 seed rows only.
+DATASET_ROWS = int(os.getenv('DATASET_ROWS', '0'))
+DATASET_LOADER = os.getenv('DATASET_LOADER', 'copy')
+DATASET_TEXT_MIX = os.getenv('DATASET_TEXT_MIX', 'ascii') # ascii, unicode (mixed scripts) or emoji (scripts + emoji)
+DATASET_LENGTH_DISTRIBUTION = os.getenv('DATASET_LENGTH_DISTRIBUTION', 'lognormal') # fixed, uniform or lognormal
+DATASET_LENGTH_MEAN = float(os.getenv('DATASET_LENGTH_MEAN', '200')) # UTF-16 code units, as Telegram counts them
+DATASET_LENGTH_STDDEV = float(os.getenv('DATASET_LENGTH_STDDEV', '400'))
+DATASET_MAX_LENGTH = int(os.getenv('DATASET_MAX_LENGTH', '4080')) # Capped below Telegram's 4096 limit
+DATASET_COPY_CHUNK_ROWS = int(os.getenv('DATASET_COPY_CHUNK_ROWS', '100000'))
+DATASET_SEED = int(os.getenv('DATASET_SEED', '42'))
+
+# Saturation sweep: instead of one fixed run, step concurrency (or open-loop offered rate) up for each library
+# until error rate or p99 total processing time breaks the SLO, and report the max sustainable level.
+SATURATION_SWEEP = _env_bool('SATURATION_SWEEP')
+SWEEP_DIMENSION = os.getenv('SWEEP_DIMENSION', 'concurrency') # "concurrency" or "rate"
+# Comma-separated levels; defaults depend on the dimension (see saturation_sweep.DEFAULT_SWEEP_LEVELS)
+SWEEP_LEVELS = [float(level) for level in os.getenv('SWEEP_LEVELS', '').split(',') if level.strip()]
+SWEEP_MESSAGES_PER_STEP = int(os.getenv('SWEEP_MESSAGES_PER_STEP', NUM_MESSAGES))
+SWEEP_SLO_P99_S = float(os.getenv('SWEEP_SLO_P99_S', '1.0'))
+SWEEP_SLO_MAX_ERROR_RATE = float(os.getenv('SWEEP_SLO_MAX_ERROR_RATE', '0.01'))
+
+# Multi-process load: comma-separated worker-process counts, e.g. "1,8,16". Each library is run once per count
+# with NUM_MESSAGES split across that many processes, and per-process scaling efficiency is reported
+# (see process_sharding.py). Empty = single process.
+PROCESS_SHARDS = [int(count) for count in os.getenv('PROCESS_SHARDS', '').split(',') if count.strip()]
+
+# List of library names (keys of SENDER_CLASS_PATHS in senders/registry.py) to test.
+# If empty, all available libraries will be tested. Only the selected senders are imported.
+# Example: LIBRARIES_TO_TEST=httpx,aiohttp
+LIBRARIES_TO_TEST = [name.strip() for name in os.getenv('LIBRARIES_TO_TEST', '').split(',') if name.strip()]  # Test all by default
+
+# Measure each library's cold import time and memory in a fresh interpreter (serverless start-up cost)
+MEASURE_IMPORT_COST = _env_bool('MEASURE_IMPORT_COST', 'true')
 
 # --- Report Configuration ---
 REPORTS_DIR = "benchmark_reports"
 JSON_REPORT_FILENAME = "benchmark_report.json"
 MD_REPORT_FILENAME = "benchmark_telegram_libs_report.md"
+ATTEMPT_LOGS_DIRNAME = os.getenv('ATTEMPT_LOGS_DIRNAME', 'attempts') # Per-attempt NDJSON logs, inside REPORTS_DIR
 
 # --- Project Details (for reporting) ---
 PROJECT_NAME = "Telegram HTTP Library Benchmark"
@@ -45,4 +177,18 @@ if DB_USER == 'furkan' and DB_PASSWORD == '0000' and DB_HOST == 'localhost':
     print("WARNING: Using default PostgreSQL credentials from config.py. Consider setting DB_HOST, DB_PORT, DB_NAME, DB_USER, and DB_PASSWORD environment variables.")
 
 DB_TABLE_NAME = "messages_to_send"
+# Prepare the per-message reads once per connection: PREPARE/EXECUTE on psycopg2, asyncpg's statement cache
+# (warmed when each pool connection opens; needs ASYNC_DB_STATEMENT_CACHE_SIZE > 0) on asyncpg
+DB_PREPARED_STATEMENTS = _env_bool('DB_PREPARED_STATEMENTS', 'true')
+# asyncpg pool: 0 sizes it to MAX_CONCURRENT_REQUESTS_PER_LIBRARY + 1 (one connection per in-flight request,
+# plus one for a prefetcher). Prewarming opens every connection before the run starts.
+ASYNC_DB_POOL_SIZE = int(os.getenv('ASYNC_DB_POOL_SIZE', '0'))
+ASYNC_DB_POOL_PREWARM = _env_bool('ASYNC_DB_POOL_PREWARM', 'true')
+ASYNC_DB_STATEMENT_CACHE_SIZE = int(os.getenv('ASYNC_DB_STATEMENT_CACHE_SIZE', '100')) # asyncpg default; 0 disables
+# Sync senders check a psycopg2 connection out of a ThreadedConnectionPool for every message (as a web
+# worker would per request). 0 sizes the pool to the worker count (1 in serial mode).
+SYNC_DB_POOL = _env_bool('SYNC_DB_POOL', 'true')
+SYNC_DB_POOL_SIZE = int(os.getenv('SYNC_DB_POOL_SIZE', '0'))
+# EXPLAIN ANALYZE the hot queries after setup and include the plans in the report
+CAPTURE_QUERY_PLANS = _env_bool('CAPTURE_QUERY_PLANS', 'true')
 DB_SETUP_WAIT_SECONDS = 10 # Seconds to wait after setup before benchmarks 
\ No newline at end of file
@@ -0,0 +1,256 @@
+"""Per-request connection lifecycle timing: DNS, TCP connect, TLS, request write, TTFB and body read.
+
+BaseSender opens a ConnectionPhases record around every send and publishes it in a context
+variable, so each worker thread and asyncio task sees its own. Library hooks add to whichever
+record is current:
+
+- aiohttp (and Uplink, which runs on an aiohttp session): a TraceConfig
+- httpx: httpcore's "trace" request extension
+- urllib3 (and requests-session, through its adapter's PoolManager): instrumented connection classes
+
+Phases a library doesn't expose stay unmeasured (httpcore and urllib3 fold DNS into the TCP
+connect, aiohttp folds TLS into it), as do all phases of senders without hooks. DNS, connect
+and TLS are only measured on requests that opened a connection, so their averages are the cost
+of a new connection; how often that happened is the reuse flag.
+"""
+import contextvars
+import http.client
+import time
+from contextlib import contextmanager
+
+PHASES = ("dns", "connect", "tls", "request_write", "ttfb", "body_read")
+
+_current_phases = contextvars.ContextVar("connection_phases", default=None)
+
+class ConnectionPhases:
+    """Phase durations (ms) of one send, filled in by the library hooks."""
+    __slots__ = ("durations_ms", "reused", "instrumented", "_started_at", "first_byte_at")
+
+    def __init__(self):
+        self.durations_ms = {}
+        self.reused = None # None until a hook sees whether a connection was opened
+        self.instrumented = False
+        self._started_at = {}
+        self.first_byte_at = None
+
+    def start(self, phase):
+        self.instrumented = True
+        self._started_at[phase] = time.perf_counter()
+
+    def stop(self, phase):
+        """Ends `phase` (if started) and returns its duration in ms."""
+        started_at = self._started_at.pop(phase, None)
+        if started_at is None:
+            return None
+        return self.add(phase, (time.perf_counter() - started_at) * 1000)
+
+    def add(self, phase, duration_ms):
+        self.instrumented = True
+        self.durations_ms[phase] = self.durations_ms.get(phase, 0.0) + max(0.0, duration_ms)
+        return duration_ms
+
+    def opened_connection(self):
+        self.instrumented = True
+        self.reused = False
+
+    def sent_request(self):
+        """Called when the request goes out; no connection was opened before it means it was reused."""
+        self.instrumented = True
+        if self.reused is None:
+            self.reused = True
+
+    def mark_first_byte(self):
+        self.first_byte_at = time.perf_counter()
+
+    def result(self, end_time):
+        """({phase: ms or None}, reused) once the send returned at `end_time` (all None if no hook ran)."""
+        if not self.instrumented:
+            return {phase: None for phase in PHASES}, None
+        durations = dict(self.durations_ms)
+        if "body_read" not in durations and self.first_byte_at is not None:
+            # Hooks that only see the response headers: the rest of the send is reading the body
+            durations["body_read"] = max(0.0, (end_time - self.first_byte_at) * 1000)
+        return {phase: durations.get(phase) for phase in PHASES}, self.reused
+
+def current():
+    return _current_phases.get()
+
+@contextmanager
+def track(enabled=True):
+    """Publishes a fresh ConnectionPhases for the enclosed send (yields None when disabled)."""
+    if not enabled:
+        yield None
+        return
+    phases = ConnectionPhases()
+    token = _current_phases.set(phases)
+    try:
+        yield phases
+    finally:
+        _current_phases.reset(token)
+
+# --- httpx / httpcore ---
+
+# httpcore trace event prefix (after "http11."/"http2."/"connection.") -> phase
+_HTTPCORE_PHASES = {
+    "connect_tcp": "connect",
+    "start_tls": "tls",
+    "send_request_headers": "request_write",
+    "send_request_body": "request_write",
+    "receive_response_headers": "ttfb",
+    "receive_response_body": "body_read",
+}
+
+def _on_httpcore_event(event_name, info):
+    phases = current()
+    if phases is None:
+        return
+    step, _, stage = event_name.split(".", 1)[-1].rpartition(".")
+    phase = _HTTPCORE_PHASES.get(step)
+    if phase is None:
+        return
+    if stage == "started":
+        if step == "connect_tcp":
+            phases.opened_connection()
+        elif step == "send_request_headers":
+            phases.sent_request()
+        phases.start(phase)
+    else: # "complete" or "failed"
+        phases.stop(phase)
+        if step == "receive_response_headers":
+            phases.mark_first_byte()
+
+def httpcore_trace(event_name, info):
+    """Sync httpx clients: pass as `extensions={"trace": httpcore_trace}`."""
+    _on_httpcore_event(event_name, info)
+
+async def httpcore_trace_async(event_name, info):
+    """Async counterpart of httpcore_trace for httpx.AsyncClient."""
+    _on_httpcore_event(event_name, info)
+
+# --- aiohttp ---
+
+def aiohttp_trace_config():
+    """A TraceConfig reporting into the current ConnectionPhases; add it to a ClientSession's trace_configs."""
+    import aiohttp # Imported here so processes benchmarking other libraries don't import aiohttp
+
+    async def on_connection_create_start(session, context, params):
+        phases = current()
+        if phases:
+            phases.opened_connection()
+            phases.start("connect")
+
+    async def on_connection_create_end(session, context, params):
+        phases = current()
+        if phases and phases.stop("connect") is not None:
+            # aiohttp resolves inside connection creation; keep the phases disjoint
+            phases.durations_ms["connect"] = max(0.0, phases.durations_ms["connect"] - phases.durations_ms.get("dns", 0.0))
+            phases.start("request_write")
+
+    async def on_connection_reuseconn(session, context, params):
+        phases = current()
+        if phases:
+            phases.sent_request()
+            phases.start("request_write")
+
+    async def on_dns_resolvehost_start(session, context, params):
+        phases = current()
+        if phases:
+            phases.start("dns")
+
+    async def on_dns_resolvehost_end(session, context, params):
+        phases = current()
+        if phases:
+            phases.stop("dns")
+
+    async def on_request_headers_sent(session, context, params):
+        phases = current()
+        if phases:
+            phases.sent_request()
+            phases.stop("request_write")
+            phases.start("ttfb")
+
+    async def on_request_end(session, context, params):
+        # Sent once the response status line and headers have been read
+        phases = current()
+        if phases:
+            phases.stop("ttfb")
+            phases.mark_first_byte()
+
+    trace_config = aiohttp.TraceConfig()
+    trace_config.on_connection_create_start.append(on_connection_create_start)
+    trace_config.on_connection_create_end.append(on_connection_create_end)
+    trace_config.on_connection_reuseconn.append(on_connection_reuseconn)
+    trace_config.on_dns_resolvehost_start.append(on_dns_resolvehost_start)
+    trace_config.on_dns_resolvehost_end.append(on_dns_resolvehost_end)
+    trace_config.on_request_headers_sent.append(on_request_headers_sent)
+    trace_config.on_request_end.append(on_request_end)
+    return trace_config
+
+# --- urllib3 ---
+
+class _TimedHTTPResponse(http.client.HTTPResponse):
+    def begin(self):
+        super().begin()
+        phases = current()
+        if phases:
+            phases.stop("ttfb")
+            phases.mark_first_byte()
+
+class _TimedConnectionMixin:
+    """Times the TCP connect, request write and wait for the response headers of a urllib3 connection."""
+    response_class = _TimedHTTPResponse # Used by http.client's getresponse(), which urllib3 wraps
+    _tcp_connected_at = None
+
+    def _new_conn(self):
+        phases = current()
+        if phases:
+            phases.opened_connection()
+            phases.start("connect")
+        sock = super()._new_conn()
+        if phases:
+            phases.stop("connect")
+            self._tcp_connected_at = time.perf_counter()
+        return sock
+
+    def request(self, *args, **kwargs):
+        phases = current()
+        if phases:
+            phases.sent_request()
+            phases.start("request_write")
+        super().request(*args, **kwargs)
+        if phases:
+            phases.stop("request_write")
+            phases.start("ttfb")
+
+_urllib3_pool_classes = None
+
+def _build_urllib3_pool_classes():
+    # Imported here so processes benchmarking other libraries don't import urllib3
+    from urllib3.connection import HTTPConnection, HTTPSConnection
+    from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+    class TimedHTTPConnection(_TimedConnectionMixin, HTTPConnection):
+        pass
+
+    class TimedHTTPSConnection(_TimedConnectionMixin, HTTPSConnection):
+        def connect(self):
+            super().connect() # _new_conn() times the TCP part; the rest is the TLS handshake
+            phases = current()
+            if phases and self._tcp_connected_at is not None:
+                phases.add("tls", (time.perf_counter() - self._tcp_connected_at) * 1000)
+
+    class TimedHTTPConnectionPool(HTTPConnectionPool):
+        ConnectionCls = TimedHTTPConnection
+
+    class TimedHTTPSConnectionPool(HTTPSConnectionPool):
+        ConnectionCls = TimedHTTPSConnection
+
+    return {"http": TimedHTTPConnectionPool, "https": TimedHTTPSConnectionPool}
+
+def instrument_pool_manager(pool_manager):
+    """Makes `pool_manager` (a urllib3 PoolManager) open instrumented connections. Returns it."""
+    global _urllib3_pool_classes
+    if _urllib3_pool_classes is None:
+        _urllib3_pool_classes = _build_urllib3_pool_classes()
+    pool_manager.pool_classes_by_scheme = _urllib3_pool_classes
+    return pool_manager
@@ -1,13 +1,28 @@
 import psycopg2
+import psycopg2.pool
 import asyncpg
 import asyncio
-import random
-import string
+import threading
+import queue
 import time
 from contextlib import contextmanager, asynccontextmanager
 
 import config
 
+# Library names used as message prefixes (BaseSender.library_name of each sender) - must match those in main.py
+LIBRARY_MESSAGE_PREFIXES = [
+    "Httpx",
+    "Aiohttp",
+    "Requests",
+    "RequestsSession",
+    "HttpxSync",
+    "HttpxClient",
+    "Urllib3",
+    "Uplink",
+    "PTB",  # python-telegram-bot
+    "PyTelegramBotAPI"
+]
+
 # --- Database Initialization ---
 
 def setup_database():
@@ -28,11 +43,18 @@ def setup_database():
         cur.execute(f"""
             CREATE TABLE IF NOT EXISTS {config.DB_TABLE_NAME} (
                 id SERIAL PRIMARY KEY,
+                library TEXT,
                 content TEXT NOT NULL,
                 sent BOOLEAN DEFAULT FALSE,
                 created_at TIMESTAMPTZ DEFAULT NOW()
             );
         """)
+        # Tables created before the library column existed
+        cur.execute(f"ALTER TABLE {config.DB_TABLE_NAME} ADD COLUMN IF NOT EXISTS library TEXT;")
+        # Per-library lookups (ORDER BY id LIMIT n) read in index order instead of scanning with LIKE;
+        # the partial index only holds unsent rows, which is all the outbox claim looks at
+        cur.execute(f"CREATE INDEX IF NOT EXISTS {config.DB_TABLE_NAME}_library_id_idx ON {config.DB_TABLE_NAME} (library, id);")
+        cur.execute(f"CREATE INDEX IF NOT EXISTS {config.DB_TABLE_NAME}_unsent_library_id_idx ON {config.DB_TABLE_NAME} (library, id) WHERE sent = FALSE;")
         cur.execute(f"GRANT ALL PRIVILEGES ON TABLE {config.DB_TABLE_NAME} TO {config.DB_USER};")
         cur.execute(f"GRANT USAGE, SELECT ON SEQUENCE {config.DB_TABLE_NAME}_id_seq TO {config.DB_USER};")
         cur.close()
@@ -58,10 +80,6 @@ def setup_database():
             conn.close()
         raise
 
-def _generate_random_message(length=50):
-    chars = string.ascii_letters + string.digits + ' '
-    return ''.join(random.choice(chars) for _ in range(length))
-
 def _populate_database_if_empty():
     """Populates the database with library-specific messages. Clears existing messages first."""
     conn = None
@@ -74,23 +92,12 @@ def _populate_database_if_empty():
         cur.execute(f"TRUNCATE TABLE {config.DB_TABLE_NAME} RESTART IDENTITY CASCADE;") # Clears table and resets ID sequence
         print(f"Table '{config.DB_TABLE_NAME}' cleared.")
 
-        # List of libraries to benchmark - must match those in main.py
-        libraries = [
-            "Httpx",
-            "Aiohttp", 
-            "Requests",
-            "Urllib3",
-            "Uplink",
-            "PTB",  # python-telegram-bot
-            "PyTelegramBotAPI"
-        ]
-        
         print(f"Populating '{config.DB_TABLE_NAME}' with library-specific messages...")
         
         # Create one base message per library
-        library_messages = [(f"{lib} Test",) for lib in libraries]
+        library_messages = [(lib, f"{lib} Test") for lib in LIBRARY_MESSAGE_PREFIXES]
         
-        insert_query = f"INSERT INTO {config.DB_TABLE_NAME} (content) VALUES (%s)"
+        insert_query = f"INSERT INTO {config.DB_TABLE_NAME} (library, content) VALUES (%s, %s)"
         cur.executemany(insert_query, library_messages)
         conn.commit()
         print(f"Successfully inserted {len(library_messages)} library-specific messages.")
@@ -106,42 +113,127 @@ def _populate_database_if_empty():
 
 # --- Synchronous DB Operations ---
 
+# The per-message reads; {param} is %s for psycopg2 and $1 for asyncpg / PREPARE
+READ_BY_LIBRARY_SQL = "SELECT id, content FROM {table} WHERE library = {param} ORDER BY id LIMIT 1"
+READ_ANY_SQL = "SELECT id, content FROM {table} ORDER BY id LIMIT 1"
+
+def _prepare_read_statements(conn):
+    """Server-side PREPAREs the per-message reads once per connection (psycopg2 has no client-side prepare)."""
+    with conn.cursor() as cur:
+        cur.execute(f"PREPARE read_message_by_library (text) AS {READ_BY_LIBRARY_SQL.format(table=config.DB_TABLE_NAME, param='$1')};")
+        cur.execute(f"PREPARE read_any_message AS {READ_ANY_SQL.format(table=config.DB_TABLE_NAME)};")
+    conn.commit()
+
 @contextmanager
 def get_sync_db_connection():
     conn = None
     try:
         conn = psycopg2.connect(config.DATABASE_URL_SYNC)
+        if config.DB_PREPARED_STATEMENTS:
+            _prepare_read_statements(conn)
         yield conn
     finally:
         if conn:
             conn.close()
 
+# Global sync pool, shared by the sync senders' worker threads
+sync_pool = None
+
+class _PreparingConnectionPool(psycopg2.pool.ThreadedConnectionPool):
+    """ThreadedConnectionPool that PREPAREs the reads on every new connection and blocks when exhausted.
+
+    psycopg2's pool raises PoolError instead of waiting, so checkouts first take a slot from a
+    semaphore; the time spent there is the pool's checkout wait.
+    """
+    def __init__(self, minconn, maxconn, *args, **kwargs):
+        self._slots = threading.BoundedSemaphore(maxconn)
+        super().__init__(minconn, maxconn, *args, **kwargs)
+
+    def _connect(self, key=None):
+        conn = super()._connect(key)
+        if config.DB_PREPARED_STATEMENTS:
+            _prepare_read_statements(conn)
+        return conn
+
+    def acquire(self):
+        self._slots.acquire()
+        try:
+            return self.getconn()
+        except Exception:
+            self._slots.release()
+            raise
+
+    def release(self, conn):
+        try:
+            self.putconn(conn) # Rolls back the read's open transaction; PREPAREd statements survive
+        finally:
+            self._slots.release()
+
+def sync_pool_size(workers):
+    """Pool size for `workers` threads: one connection each."""
+    if config.SYNC_DB_POOL_SIZE > 0:
+        return config.SYNC_DB_POOL_SIZE
+    return max(1, int(workers))
+
+def create_sync_pool(max_size):
+    global sync_pool
+    if sync_pool is None:
+        print("Creating psycopg2 connection pool...")
+        # minconn == maxconn: psycopg2 closes returned connections above minconn, which would mean a reconnect per message
+        sync_pool = _PreparingConnectionPool(max_size, max_size, config.DATABASE_URL_SYNC)
+        print("Psycopg2 pool created.")
+    return sync_pool
+
+def close_sync_pool():
+    global sync_pool
+    if sync_pool:
+        print("Closing psycopg2 connection pool...")
+        sync_pool.closeall()
+        sync_pool = None
+
+def sync_pool_info():
+    """Pool settings for the run's execution info (empty if no pool exists)."""
+    if sync_pool is None:
+        return {}
+    return {
+        "db_pool_size": sync_pool.maxconn,
+        "db_pool_prewarmed": True,
+        "db_prepared_statements": config.DB_PREPARED_STATEMENTS,
+    }
+
+@contextmanager
+def get_pooled_sync_db_connection():
+    if sync_pool is None:
+        raise ConnectionError("Psycopg2 pool is not available.")
+    conn = sync_pool.acquire()
+    try:
+        yield conn
+    finally:
+        sync_pool.release(conn)
+
 def read_message_sync(conn, library_name=None):
     """
     Reads a message from the database.
-    If library_name is provided, tries to find a message containing that library name.
+    If library_name is provided, tries to find a message for that library (via the library column).
     Returns (id, content) or (None, None).
     """
     with conn.cursor() as cur:
         if library_name:
             # First try to find a specific message for this library
-            cur.execute(f"""
-                SELECT id, content FROM {config.DB_TABLE_NAME}
-                WHERE content LIKE %s
-                ORDER BY id
-                LIMIT 1;
-            """, (f"%{library_name}%",))
+            if config.DB_PREPARED_STATEMENTS:
+                cur.execute("EXECUTE read_message_by_library (%s);", (library_name,))
+            else:
+                cur.execute(READ_BY_LIBRARY_SQL.format(table=config.DB_TABLE_NAME, param="%s"), (library_name,))
             
             row = cur.fetchone()
             if row:
                 return row
         
         # If no library_name provided or no specific message found, get any message
-        cur.execute(f"""
-            SELECT id, content FROM {config.DB_TABLE_NAME}
-            ORDER BY id
-            LIMIT 1;
-        """)
+        if config.DB_PREPARED_STATEMENTS:
+            cur.execute("EXECUTE read_any_message;")
+        else:
+            cur.execute(READ_ANY_SQL.format(table=config.DB_TABLE_NAME))
         row = cur.fetchone()
         if row:
             return row
@@ -153,14 +245,37 @@ def read_message_sync(conn, library_name=None):
 # Global pool variable (can also be managed within the async main function)
 async_pool = None
 
-async def create_async_pool():
+async def _prepare_read_statements_async(conn):
+    """Pool `init` hook: prepares the reads once per physical connection.
+
+    asyncpg's statement cache keeps a connection's prepared statements across pool acquisitions
+    (the pool's reset doesn't DEALLOCATE them), so running each read once here moves its Parse
+    out of the measured loop; later reads through conn.fetchrow() reuse the cached statement.
+    """
+    if config.DB_PREPARED_STATEMENTS and config.ASYNC_DB_STATEMENT_CACHE_SIZE > 0:
+        await conn.fetchrow(READ_BY_LIBRARY_SQL.format(table=config.DB_TABLE_NAME, param="$1"), None)
+        await conn.fetchrow(READ_ANY_SQL.format(table=config.DB_TABLE_NAME))
+
+def async_pool_size(concurrency):
+    """Pool size for `concurrency` in-flight requests: one connection each, plus one for a prefetcher."""
+    if config.ASYNC_DB_POOL_SIZE > 0:
+        return config.ASYNC_DB_POOL_SIZE
+    return max(1, int(concurrency)) + 1
+
+async def create_async_pool(max_size=None):
     global async_pool
     if async_pool is None:
         print("Creating asyncpg connection pool...")
+        if max_size is None:
+            # Every in-flight async request holds a connection, so size the pool to the concurrency window
+            max_size = async_pool_size(config.MAX_CONCURRENT_REQUESTS_PER_LIBRARY)
         try:
             async_pool = await asyncpg.create_pool(
                 dsn=config.DATABASE_URL_SYNC, # asyncpg uses DSN format directly
-                min_size=1, max_size=10 # Example pool size
+                # Prewarming opens every connection up front, so connects don't land in the measured loop
+                min_size=max_size if config.ASYNC_DB_POOL_PREWARM else 1, max_size=max_size,
+                statement_cache_size=config.ASYNC_DB_STATEMENT_CACHE_SIZE,
+                init=_prepare_read_statements_async
             )
             print("Asyncpg pool created.")
         except Exception as e:
@@ -177,6 +292,17 @@ async def close_async_pool():
         async_pool = None
         print("Asyncpg pool closed.")
 
+def async_pool_info():
+    """Pool settings for the run's execution info (empty if no pool exists)."""
+    if async_pool is None:
+        return {}
+    return {
+        "db_pool_size": async_pool.get_max_size(),
+        "db_pool_prewarmed": config.ASYNC_DB_POOL_PREWARM,
+        "db_statement_cache_size": config.ASYNC_DB_STATEMENT_CACHE_SIZE,
+        "db_prepared_statements": config.DB_PREPARED_STATEMENTS and config.ASYNC_DB_STATEMENT_CACHE_SIZE > 0, # Prepared via the statement cache
+    }
+
 @asynccontextmanager
 async def get_async_db_connection():
     pool = await create_async_pool()
@@ -188,29 +314,389 @@ async def get_async_db_connection():
 async def read_message_async(conn, library_name=None):
     """
     Reads a message asynchronously from the database.
-    If library_name is provided, tries to find a message containing that library name.
+    If library_name is provided, tries to find a message for that library (via the library column).
     Returns (id, content) or (None, None).
     """
+    # Reads go through asyncpg's statement cache, prepared once per connection (see _prepare_read_statements_async)
     if library_name:
         # First try to find a specific message for this library
-        row = await conn.fetchrow(f"""
-            SELECT id, content FROM {config.DB_TABLE_NAME}
-            WHERE content LIKE $1
-            ORDER BY id
-            LIMIT 1;
-        """, f"%{library_name}%")
+        row = await conn.fetchrow(READ_BY_LIBRARY_SQL.format(table=config.DB_TABLE_NAME, param="$1"), library_name)
         
         if row:
             return row['id'], row['content']
     
     # If no library_name provided or no specific message found, get any message
-    row = await conn.fetchrow(f"""
-        SELECT id, content FROM {config.DB_TABLE_NAME}
-        ORDER BY id
-        LIMIT 1;
-    """)
+    row = await conn.fetchrow(READ_ANY_SQL.format(table=config.DB_TABLE_NAME))
     
     if row:
         return row['id'], row['content']
     else:
-        return None, None 
\ No newline at end of file
+        return None, None 
+
+# --- Batched Prefetch ---
+# Instead of one SELECT per send, a producer streams rows from a cursor in batches into a bounded
+# queue that the send loop drains, like a worker draining an outbox table. Rows are cycled until
+# `num_messages` have been delivered (the per-message path also re-reads the same rows).
+
+_END_OF_MESSAGES = object()
+
+def _prefetch_query(library_name):
+    """(query, params) for the library's rows, or for all rows when library_name is None."""
+    if library_name:
+        return f"SELECT id, content FROM {config.DB_TABLE_NAME} WHERE library = %s ORDER BY id", (library_name,)
+    return f"SELECT id, content FROM {config.DB_TABLE_NAME} ORDER BY id", ()
+
+class _PrefetcherStats:
+    def __init__(self, batch_size):
+        self.batch_size = batch_size
+        self.fetch_batches = 0
+        self.fetch_time_s = 0.0
+        self.rows_fetched = 0
+
+    def add_batch(self, rows, elapsed_s):
+        # The empty fetch that ends a pass still costs a round trip, but isn't a batch
+        if rows:
+            self.fetch_batches += 1
+        self.fetch_time_s += elapsed_s
+        self.rows_fetched += rows
+
+    def stats(self):
+        """DB cost of the run, amortized over the delivered messages."""
+        return {
+            "message_source": "prefetch",
+            "prefetch_batch_size": self.batch_size,
+            "db_fetch_batches": self.fetch_batches,
+            "db_fetch_time_total_s": round(self.fetch_time_s, 5),
+            "amortized_db_fetch_time_per_message_ms": round(self.fetch_time_s * 1000 / self.rows_fetched, 5) if self.rows_fetched else 0,
+        }
+
+class SyncMessagePrefetcher(_PrefetcherStats):
+    """Fills a bounded queue from a psycopg2 server-side (named) cursor on a background thread.
+
+    `get()` is safe to call from several worker threads and returns (id, content), or
+    (None, None) once `num_messages` rows were delivered or the table is empty.
+    """
+    def __init__(self, library_name, num_messages, batch_size, queue_batches):
+        super().__init__(batch_size)
+        self.library_name = library_name
+        self.num_messages = num_messages
+        self.queue = queue.Queue(maxsize=max(1, batch_size * queue_batches))
+        self.error = None
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(target=self._produce, name=f"{library_name}_prefetch", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def _put(self, item):
+        # Bounded put that still notices stop() if the consumers quit early
+        while not self._stop_event.is_set():
+            try:
+                self.queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _stream_pass(self, conn, library_name, remaining):
+        """Streams one pass over the matching rows. Returns the number of rows delivered."""
+        query, params = _prefetch_query(library_name)
+        delivered = 0
+        with conn.cursor(name=f"prefetch_{self.library_name.lower()}") as cur:
+            cur.itersize = self.batch_size
+            cur.execute(query, params)
+            while delivered < remaining:
+                fetch_start = time.perf_counter()
+                rows = cur.fetchmany(min(self.batch_size, remaining - delivered))
+                self.add_batch(len(rows), time.perf_counter() - fetch_start)
+                if not rows:
+                    break
+                for row in rows:
+                    if not self._put(row):
+                        return delivered
+                    delivered += 1
+        conn.commit() # Named cursors live inside a transaction
+        return delivered
+
+    def _produce(self):
+        try:
+            with get_sync_db_connection() as conn:
+                remaining = self.num_messages
+                library_name = self.library_name
+                while remaining > 0 and not self._stop_event.is_set():
+                    delivered = self._stream_pass(conn, library_name, remaining)
+                    if delivered == 0:
+                        if library_name is None:
+                            break # Table is empty
+                        library_name = None # Fall back to any message, like read_message_sync
+                        continue
+                    remaining -= delivered
+        except Exception as e:
+            print(f"Error in message prefetcher for {self.library_name}: {e}")
+            self.error = e
+        finally:
+            self._put(_END_OF_MESSAGES)
+
+    def get(self):
+        item = self.queue.get()
+        if item is _END_OF_MESSAGES:
+            self.queue.put(item) # Wake the next waiting worker too
+            if self.error:
+                raise self.error
+            return None, None
+        return item
+
+    def stop(self):
+        self._stop_event.set()
+        self._thread.join(timeout=5)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+class AsyncMessagePrefetcher(_PrefetcherStats):
+    """asyncio counterpart of SyncMessagePrefetcher, using an asyncpg cursor (`cursor.fetch(n)`).
+
+    The producer task holds one pooled connection for the whole run.
+    """
+    def __init__(self, library_name, num_messages, batch_size, queue_batches):
+        super().__init__(batch_size)
+        self.library_name = library_name
+        self.num_messages = num_messages
+        self.queue = asyncio.Queue(maxsize=max(1, batch_size * queue_batches))
+        self.error = None
+        self._task = None
+
+    def start(self):
+        self._task = asyncio.create_task(self._produce())
+        return self
+
+    async def _stream_pass(self, conn, library_name, remaining):
+        query, params = _prefetch_query(library_name)
+        query = query.replace("%s", "$1")
+        delivered = 0
+        async with conn.transaction(): # asyncpg cursors require a transaction
+            cursor = await conn.cursor(query, *params)
+            while delivered < remaining:
+                fetch_start = time.perf_counter()
+                rows = await cursor.fetch(min(self.batch_size, remaining - delivered))
+                self.add_batch(len(rows), time.perf_counter() - fetch_start)
+                if not rows:
+                    break
+                for row in rows:
+                    await self.queue.put((row['id'], row['content']))
+                    delivered += 1
+        return delivered
+
+    async def _produce(self):
+        try:
+            async with get_async_db_connection() as conn:
+                remaining = self.num_messages
+                library_name = self.library_name
+                while remaining > 0:
+                    delivered = await self._stream_pass(conn, library_name, remaining)
+                    if delivered == 0:
+                        if library_name is None:
+                            break
+                        library_name = None
+                        continue
+                    remaining -= delivered
+        except Exception as e:
+            print(f"Error in message prefetcher for {self.library_name}: {e}")
+            self.error = e
+        finally:
+            await self.queue.put(_END_OF_MESSAGES)
+
+    async def get(self):
+        item = await self.queue.get()
+        if item is _END_OF_MESSAGES:
+            self.queue.put_nowait(item)
+            if self.error:
+                raise self.error
+            return None, None
+        return item
+
+    async def stop(self):
+        if self._task and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    async def __aenter__(self):
+        return self.start()
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.stop()
+
+
+# --- Outbox Draining ---
+# Each worker claims a batch of unsent rows with SELECT ... FOR UPDATE SKIP LOCKED (so concurrent
+# workers never block on or double-send each other's rows), sends them, then marks the delivered
+# ones sent with one bulk UPDATE and commits, which also releases the locks on any rows it failed.
+
+def _outbox_content(library_name):
+    return f"{library_name} Outbox"
+
+def seed_outbox(library_name, num_messages):
+    """Replaces the library's seeded outbox rows with `num_messages` fresh unsent ones (not timed).
+
+    Claims take any unsent row of the library, so generated dataset rows are drained too.
+    """
+    content = _outbox_content(library_name)
+    with get_sync_db_connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute(f"DELETE FROM {config.DB_TABLE_NAME} WHERE library = %s AND content = %s;", (library_name, content))
+            cur.execute(f"INSERT INTO {config.DB_TABLE_NAME} (library, content) SELECT %s, %s FROM generate_series(1, %s);",
+                        (library_name, content, num_messages))
+        conn.commit()
+    print(f"Seeded {num_messages} unsent outbox rows for {library_name}.")
+
+class OutboxStats:
+    """Claim/mark counters shared by all outbox workers of one run (thread-safe)."""
+    def __init__(self, batch_size):
+        self.batch_size = batch_size
+        self._lock = threading.Lock()
+        self.claims = 0
+        self.empty_claims = 0
+        self.rows_claimed = 0
+        self.claim_time_s = 0.0
+        self.rows_marked_sent = 0
+        self.mark_time_s = 0.0
+
+    def add_claim(self, rows, elapsed_s):
+        with self._lock:
+            self.claims += 1
+            self.empty_claims += rows == 0
+            self.rows_claimed += rows
+            self.claim_time_s += elapsed_s
+
+    def add_mark(self, rows, elapsed_s):
+        with self._lock:
+            self.rows_marked_sent += rows
+            self.mark_time_s += elapsed_s
+
+    def stats(self):
+        delivered = self.rows_marked_sent
+        return {
+            "message_source": "outbox",
+            "outbox_claim_batch_size": self.batch_size,
+            "outbox_claims": self.claims,
+            "outbox_empty_claims": self.empty_claims,
+            "outbox_rows_claimed": self.rows_claimed,
+            "outbox_rows_marked_sent": delivered,
+            "outbox_claim_time_total_s": round(self.claim_time_s, 5),
+            "outbox_mark_sent_time_total_s": round(self.mark_time_s, 5),
+            # Claim (locking read) + bulk UPDATE/commit, spread over the rows actually delivered
+            "amortized_db_time_per_message_ms": round((self.claim_time_s + self.mark_time_s) * 1000 / delivered, 5) if delivered else 0,
+        }
+
+_CLAIM_QUERY = """
+    SELECT id, content FROM {table}
+    WHERE sent = FALSE AND library = {library}
+    ORDER BY id
+    LIMIT {limit}
+    FOR UPDATE SKIP LOCKED;
+"""
+
+class SyncOutboxClaimer:
+    """One worker's claim/mark cycle over its own psycopg2 connection."""
+    def __init__(self, conn, library_name, batch_size, stats):
+        self.conn = conn
+        self.library_name = library_name
+        self.batch_size = batch_size
+        self.stats = stats
+
+    def claim(self):
+        """Locks up to batch_size unsent rows. Returns (rows, claim time in ms)."""
+        claim_start = time.perf_counter()
+        with self.conn.cursor() as cur:
+            cur.execute(_CLAIM_QUERY.format(table=config.DB_TABLE_NAME, library="%s", limit="%s"), (self.library_name, self.batch_size))
+            rows = cur.fetchall()
+        elapsed_s = time.perf_counter() - claim_start
+        self.stats.add_claim(len(rows), elapsed_s)
+        return rows, elapsed_s * 1000
+
+    def mark_sent(self, message_ids):
+        """Bulk-marks the delivered rows and commits (releasing every lock of the batch)."""
+        mark_start = time.perf_counter()
+        if message_ids:
+            with self.conn.cursor() as cur:
+                cur.execute(f"UPDATE {config.DB_TABLE_NAME} SET sent = TRUE WHERE id = ANY(%s);", (list(message_ids),))
+        self.conn.commit()
+        self.stats.add_mark(len(message_ids), time.perf_counter() - mark_start)
+
+class AsyncOutboxClaimer:
+    """asyncpg counterpart of SyncOutboxClaimer; the worker holds one pooled connection."""
+    def __init__(self, conn, library_name, batch_size, stats):
+        self.conn = conn
+        self.library_name = library_name
+        self.batch_size = batch_size
+        self.stats = stats
+        self._transaction = None
+
+    async def claim(self):
+        claim_start = time.perf_counter()
+        self._transaction = self.conn.transaction()
+        await self._transaction.start()
+        records = await self.conn.fetch(_CLAIM_QUERY.format(table=config.DB_TABLE_NAME, library="$1", limit="$2"), self.library_name, self.batch_size)
+        rows = [(record['id'], record['content']) for record in records]
+        elapsed_s = time.perf_counter() - claim_start
+        self.stats.add_claim(len(rows), elapsed_s)
+        if not rows:
+            await self._finish_transaction()
+        return rows, elapsed_s * 1000
+
+    async def mark_sent(self, message_ids):
+        mark_start = time.perf_counter()
+        if message_ids:
+            await self.conn.execute(f"UPDATE {config.DB_TABLE_NAME} SET sent = TRUE WHERE id = ANY($1::int[]);", list(message_ids))
+        await self._finish_transaction()
+        self.stats.add_mark(len(message_ids), time.perf_counter() - mark_start)
+
+    async def _finish_transaction(self):
+        if self._transaction is not None:
+            transaction, self._transaction = self._transaction, None
+            await transaction.commit()
+
+
+# --- Query Plans ---
+
+def capture_query_plans(library_name=LIBRARY_MESSAGE_PREFIXES[0]):
+    """EXPLAIN (ANALYZE, BUFFERS) of the benchmark's hot queries against the current table, for the report.
+
+    Runs in a transaction that is rolled back, since EXPLAIN ANALYZE really executes the outbox
+    claim (and takes its row locks).
+    """
+    table = config.DB_TABLE_NAME
+    if config.DB_PREPARED_STATEMENTS:
+        read_query, read_params = "EXECUTE read_message_by_library (%s)", (library_name,)
+    else:
+        read_query, read_params = READ_BY_LIBRARY_SQL.format(table=table, param="%s"), (library_name,)
+    prefetch_query, prefetch_params = _prefetch_query(library_name)
+    queries = [
+        ("read_message", read_query, read_params),
+        ("prefetch_scan", prefetch_query, prefetch_params),
+        ("outbox_claim", _CLAIM_QUERY.format(table=table, library="%s", limit="%s").strip().rstrip(";"), (library_name, 10)),
+    ]
+    plans = {}
+    with get_sync_db_connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute("SELECT reltuples::bigint, pg_total_relation_size(oid) FROM pg_class WHERE relname = %s;", (table,))
+            table_rows, table_bytes = cur.fetchone() or (0, 0)
+            for name, query, params in queries:
+                cur.execute(f"EXPLAIN (ANALYZE, BUFFERS) {query}", params)
+                plan_lines = [row[0] for row in cur.fetchall()]
+                execution_line = next((line for line in plan_lines if line.startswith("Execution Time:")), "")
+                plans[name] = {
+                    "query": " ".join(cur.mogrify(query, params).decode("utf-8").split()),
+                    "plan": plan_lines,
+                    "execution_time_ms": float(execution_line.split(":")[1].split()[0]) if execution_line else None,
+                    "uses_index": any("Index" in line for line in plan_lines),
+                }
+        conn.rollback()
+    return {"library": library_name, "table_rows_estimate": max(0, table_rows), "table_size_mb": round(table_bytes / (1024 * 1024), 2), "queries": plans}
@@ -0,0 +1,171 @@
+"""Bulk generator for large, realistic `messages_to_send` tables.
+
+setup_database() only seeds one row per library. With DATASET_ROWS > 0, main.py also loads
+that many generated messages after setup, so DB read costs can be measured at realistic table
+sizes. Rows are split evenly across the benchmarked libraries (each row starts with the
+library's name and carries it in the indexed `library` column), so a run limited by
+LIBRARIES_TO_TEST gets all DATASET_ROWS for the libraries it reads. They are bulk-loaded
+with `COPY ... FROM STDIN` (psycopg2) or `copy_records_to_table` (asyncpg) in chunks.
+
+Message lengths follow a configurable distribution and are measured in UTF-16 code units, as
+Telegram counts them, capped below the 4096 limit so the per-send "_<n>" suffix still fits.
+Text is sliced from a pre-generated character pool (ASCII, mixed scripts or scripts + emoji),
+which keeps generation cheap enough for millions of rows.
+"""
+import io
+import time
+
+import asyncpg
+import numpy as np
+
+import config
+from database_utils import LIBRARY_MESSAGE_PREFIXES, get_sync_db_connection
+
+TELEGRAM_MAX_MESSAGE_LENGTH = 4096
+SEND_SUFFIX_RESERVE = 16 # Room for the "_<n>" suffix appended by BaseSender._build_text_payload
+
+# No backslash, tab, CR or LF, so rows can go into COPY's text format unescaped
+_ASCII_CHARS = "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789" + " " * 12 + ".,!?-:;'\"()@#"
+_SCRIPT_CHARS = (
+    "àáâãäåæçèéêëìíîïñòóôõöøùúûüýßÄÖÜ" # Latin-1 / accented
+    "абвгдеёжзийклмнопрстуфхцчшщъыьэюяАБВГДЕ" # Cyrillic
+    "αβγδεζηθικλμνξοπρστυφχψω" # Greek
+    "的一是不了人我在有他这中大来上国个到说们" # CJK
+    "مرحباالعالم" # Arabic
+)
+_EMOJI_CHARS = "😀😂🥲😍🤔👍🙏🔥🎉🚀✅❌💬📣📦🕒🌍💡🧪🤖" # Astral-plane: 2 UTF-16 units each
+_POOL_SIZE = 1 << 20
+
+def _character_pool(text_mix, rng):
+    """A long random string to slice message bodies from, plus cumulative UTF-16 lengths."""
+    if text_mix == "ascii":
+        alphabet, weights = [_ASCII_CHARS], [1.0]
+    elif text_mix == "unicode":
+        alphabet, weights = [_ASCII_CHARS, _SCRIPT_CHARS], [0.7, 0.3]
+    elif text_mix == "emoji":
+        alphabet, weights = [_ASCII_CHARS, _SCRIPT_CHARS, _EMOJI_CHARS], [0.7, 0.2, 0.1]
+    else:
+        raise ValueError(f"Unknown DATASET_TEXT_MIX: {text_mix}")
+    # Each character set gets its share of the pool, spread uniformly over its characters
+    chars = np.array([c for charset in alphabet for c in charset])
+    probabilities = np.concatenate([np.full(len(charset), weight / len(charset)) for charset, weight in zip(alphabet, weights)])
+    pool_chars = rng.choice(chars, size=_POOL_SIZE, p=probabilities / probabilities.sum())
+    pool = "".join(pool_chars.tolist())
+    utf16_units = np.cumsum([2 if ord(c) > 0xFFFF else 1 for c in pool])
+    return pool, utf16_units
+
+def _message_lengths(num_rows, rng):
+    """Total message lengths (UTF-16 units) drawn from DATASET_LENGTH_DISTRIBUTION."""
+    mean, stddev = config.DATASET_LENGTH_MEAN, config.DATASET_LENGTH_STDDEV
+    distribution = config.DATASET_LENGTH_DISTRIBUTION
+    if distribution == "fixed":
+        lengths = np.full(num_rows, mean, dtype=np.float64)
+    elif distribution == "uniform":
+        lengths = rng.uniform(1, 2 * mean, num_rows)
+    elif distribution == "lognormal":
+        # Parameterize the underlying normal so the lognormal has the requested mean/stddev
+        sigma_sq = np.log(1 + (stddev / mean) ** 2)
+        lengths = rng.lognormal(np.log(mean) - sigma_sq / 2, np.sqrt(sigma_sq), num_rows)
+    else:
+        raise ValueError(f"Unknown DATASET_LENGTH_DISTRIBUTION: {distribution}")
+    max_length = min(config.DATASET_MAX_LENGTH, TELEGRAM_MAX_MESSAGE_LENGTH - SEND_SUFFIX_RESERVE)
+    return np.clip(np.rint(lengths), 1, max_length).astype(np.int64)
+
+def iter_dataset_chunks(num_rows, chunk_rows, seed=None, libraries=None):
+    """Yields lists of (library, content) rows, `chunk_rows` at a time, interleaving `libraries`.
+
+    `libraries` are `library` column values; None means every entry of LIBRARY_MESSAGE_PREFIXES.
+    """
+    libraries = list(libraries or LIBRARY_MESSAGE_PREFIXES)
+    rng = np.random.default_rng(seed)
+    pool, utf16_units = _character_pool(config.DATASET_TEXT_MIX, rng)
+    prefixes = [f"{library} " for library in libraries]
+    # Leave room at the end of the pool for the longest body (astral characters take 2 units)
+    max_start = len(pool) - TELEGRAM_MAX_MESSAGE_LENGTH - 1
+
+    for chunk_start in range(0, num_rows, chunk_rows):
+        count = min(chunk_rows, num_rows - chunk_start)
+        library_indices = (np.arange(chunk_start, chunk_start + count)) % len(prefixes)
+        body_units = np.maximum(1, _message_lengths(count, rng) - np.array([len(p) for p in prefixes])[library_indices])
+        starts = rng.integers(1, max_start, count)
+        # End index of each slice: the last character that keeps the body within its UTF-16 budget
+        ends = np.searchsorted(utf16_units, utf16_units[starts - 1] + body_units, side="right")
+        yield [(libraries[library], prefixes[library] + pool[start:end])
+               for library, start, end in zip(library_indices.tolist(), starts.tolist(), ends.tolist())]
+
+def _dataset_stats(loader, rows, libraries, payload_bytes, copy_time_s, total_time_s):
+    return {
+        "rows": rows,
+        "libraries": list(libraries or LIBRARY_MESSAGE_PREFIXES),
+        "loader": loader,
+        "text_mix": config.DATASET_TEXT_MIX,
+        "length_distribution": config.DATASET_LENGTH_DISTRIBUTION,
+        "payload_mb": round(payload_bytes / (1024 * 1024), 2),
+        "copy_time_s": round(copy_time_s, 3),
+        "total_time_s": round(total_time_s, 3), # Generation + COPY + ANALYZE
+        "rows_per_sec": round(rows / total_time_s, 1) if total_time_s > 0 else 0,
+    }
+
+def load_dataset_copy(num_rows, chunk_rows, seed=None, libraries=None):
+    """Loads generated rows with psycopg2 `COPY ... FROM STDIN` in one transaction."""
+    start_time = time.perf_counter()
+    copy_time_s = 0.0
+    payload_bytes = 0
+    loaded = 0
+    with get_sync_db_connection() as conn:
+        conn.set_client_encoding("UTF8") # The rows are sent as UTF-8 bytes
+        with conn.cursor() as cur:
+            for chunk in iter_dataset_chunks(num_rows, chunk_rows, seed, libraries):
+                payload = "".join(f"{library}\t{content}\n" for library, content in chunk).encode("utf-8")
+                payload_bytes += len(payload)
+                buffer = io.BytesIO(payload)
+                copy_start = time.perf_counter()
+                cur.copy_expert(f"COPY {config.DB_TABLE_NAME} (library, content) FROM STDIN", buffer)
+                copy_time_s += time.perf_counter() - copy_start
+                loaded += len(chunk)
+                print(f"COPY: {loaded}/{num_rows} rows loaded...")
+        conn.commit()
+        conn.autocommit = True
+        with conn.cursor() as cur:
+            cur.execute(f"ANALYZE {config.DB_TABLE_NAME};") # Fresh planner statistics for the read queries
+    return _dataset_stats("copy", loaded, libraries, payload_bytes, copy_time_s, time.perf_counter() - start_time)
+
+async def load_dataset_asyncpg(num_rows, chunk_rows, seed=None, libraries=None):
+    """Loads generated rows with asyncpg `copy_records_to_table` in one transaction."""
+    start_time = time.perf_counter()
+    copy_time_s = 0.0
+    payload_bytes = 0
+    loaded = 0
+    conn = await asyncpg.connect(config.DATABASE_URL_SYNC)
+    try:
+        async with conn.transaction():
+            for chunk in iter_dataset_chunks(num_rows, chunk_rows, seed, libraries):
+                payload_bytes += sum(len(library) + len(content.encode("utf-8")) + 2 for library, content in chunk)
+                copy_start = time.perf_counter()
+                await conn.copy_records_to_table(config.DB_TABLE_NAME, records=chunk, columns=["library", "content"])
+                copy_time_s += time.perf_counter() - copy_start
+                loaded += len(chunk)
+                print(f"copy_records_to_table: {loaded}/{num_rows} rows loaded...")
+        await conn.execute(f"ANALYZE {config.DB_TABLE_NAME};")
+    finally:
+        await conn.close()
+    return _dataset_stats("asyncpg", loaded, libraries, payload_bytes, copy_time_s, time.perf_counter() - start_time)
+
+async def generate_dataset(libraries=None):
+    """Loads DATASET_ROWS generated messages for `libraries` (all if None) with the configured loader.
+
+    Returns timing stats, or None if disabled.
+    """
+    if config.DATASET_ROWS <= 0:
+        return None
+    print(f"Generating {config.DATASET_ROWS} messages ({config.DATASET_TEXT_MIX}, {config.DATASET_LENGTH_DISTRIBUTION} lengths) "
+          f"with the {config.DATASET_LOADER} loader...")
+    if config.DATASET_LOADER == "copy":
+        stats = load_dataset_copy(config.DATASET_ROWS, config.DATASET_COPY_CHUNK_ROWS, config.DATASET_SEED, libraries)
+    elif config.DATASET_LOADER == "asyncpg":
+        stats = await load_dataset_asyncpg(config.DATASET_ROWS, config.DATASET_COPY_CHUNK_ROWS, config.DATASET_SEED, libraries)
+    else:
+        raise ValueError(f"Unknown DATASET_LOADER: {config.DATASET_LOADER}")
+    print(f"Loaded {stats['rows']} rows ({stats['payload_mb']} MB) in {stats['total_time_s']}s "
+          f"({stats['rows_per_sec']} rows/s, COPY {stats['copy_time_s']}s).")
+    return stats
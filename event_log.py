@@ -0,0 +1,154 @@
+"""Leveled, structured event log for the senders, written off the measured path.
+
+Senders log through `get_logger(__name__)`. Records go onto an in-process queue and are
+formatted and written to stdout by a QueueListener thread, so a send only pays for enqueueing
+a record (and nothing at all for levels that are disabled). Each call names an event and may
+carry fields, e.g. `log.debug("send", "Sending message %d/%d", i + 1, n, library="httpx", index=i)`;
+with LOG_FORMAT=json every record is one JSON object with its event and fields.
+
+Levels (LOG_LEVEL):
+- DEBUG: every message sent and every error detail
+- INFO (default): run lifecycle and ProgressReporter summaries every N messages or S seconds
+- WARNING / "quiet": warnings and errors only
+"""
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+import threading
+import time
+
+import config
+
+_LEVELS = {"quiet": logging.WARNING}
+
+_root_logger = logging.getLogger("benchmark")
+_queue = None
+_listener = None
+_setup_lock = threading.Lock()
+
+class _DeferredQueueHandler(logging.handlers.QueueHandler):
+    def prepare(self, record):
+        # Formatting happens on the listener thread; log arguments are plain values, so that's safe
+        return record
+
+class _TextFormatter(logging.Formatter):
+    def format(self, record):
+        message = record.getMessage()
+        if record.exc_info:
+            message = f"{message}\n{self.formatException(record.exc_info)}"
+        return message
+
+class _JsonFormatter(logging.Formatter):
+    def format(self, record):
+        event = {
+            "ts": round(record.created, 6),
+            "level": record.levelname,
+            "logger": record.name,
+            "thread": record.threadName,
+            "event": getattr(record, "event", None),
+            "message": record.getMessage(),
+            **getattr(record, "fields", {}),
+        }
+        if record.exc_info:
+            event["exception"] = self.formatException(record.exc_info)
+        return json.dumps(event, default=str, ensure_ascii=False)
+
+def _setup():
+    global _queue, _listener
+    with _setup_lock:
+        if _listener is not None:
+            return
+        level_name = config.LOG_LEVEL.lower()
+        level = _LEVELS.get(level_name) or logging.getLevelName(level_name.upper())
+        if not isinstance(level, int):
+            raise ValueError(f"Unknown LOG_LEVEL: {config.LOG_LEVEL}")
+        if config.LOG_FORMAT not in ("text", "json"):
+            raise ValueError(f"Unknown LOG_FORMAT: {config.LOG_FORMAT}")
+        output = logging.StreamHandler(sys.stdout) # isolated_runner has already pointed stdout at stderr
+        output.setFormatter(_JsonFormatter() if config.LOG_FORMAT == "json" else _TextFormatter())
+        _queue = queue.Queue()
+        _root_logger.addHandler(_DeferredQueueHandler(_queue))
+        _root_logger.setLevel(level)
+        _root_logger.propagate = False
+        _listener = logging.handlers.QueueListener(_queue, output)
+        _listener.start()
+        atexit.register(_listener.stop) # Writes out whatever is still queued
+
+def flush():
+    """Blocks until every record logged so far has been written."""
+    if _queue is not None:
+        _queue.join()
+
+class EventLogger:
+    """Logger whose calls name an event and take structured fields as keyword arguments."""
+    __slots__ = ("_logger",)
+
+    def __init__(self, logger):
+        self._logger = logger
+
+    def is_enabled_for(self, level):
+        return self._logger.isEnabledFor(level)
+
+    def log(self, level, event, msg, *args, exc_info=None, **fields):
+        if self._logger.isEnabledFor(level):
+            self._logger.log(level, msg, *args, exc_info=exc_info, extra={"event": event, "fields": fields}, stacklevel=3)
+
+    def debug(self, event, msg, *args, **fields):
+        self.log(logging.DEBUG, event, msg, *args, **fields)
+
+    def info(self, event, msg, *args, **fields):
+        self.log(logging.INFO, event, msg, *args, **fields)
+
+    def warning(self, event, msg, *args, **fields):
+        self.log(logging.WARNING, event, msg, *args, **fields)
+
+    def error(self, event, msg, *args, **fields):
+        self.log(logging.ERROR, event, msg, *args, **fields)
+
+def get_logger(name):
+    _setup()
+    return EventLogger(_root_logger.getChild(name))
+
+class ProgressReporter:
+    """Logs a progress summary every `every_n` attempts or `every_s` seconds (0 disables either)."""
+    def __init__(self, log, library_name, total, every_n, every_s):
+        self.log = log
+        self.library_name = library_name
+        self.total = total
+        self.every_n = every_n
+        self.every_s = every_s
+        self._lock = threading.Lock()
+        self._started_at = time.perf_counter()
+        self._last_report_at = self._started_at
+        self.done = 0
+        self.failed = 0
+
+    def record(self, success):
+        """Counts one attempt; safe to call from worker threads."""
+        now = time.perf_counter()
+        with self._lock:
+            self.done += 1
+            if not success:
+                self.failed += 1
+            due = (self.every_n and self.done % self.every_n == 0) or (self.every_s and now - self._last_report_at >= self.every_s)
+            if not due or self.done == self.total:
+                return
+            self._last_report_at = now
+            done, failed = self.done, self.failed
+        self._report("progress", done, failed, now)
+
+    def finish(self):
+        with self._lock:
+            done, failed = self.done, self.failed
+        self._report("run_complete", done, failed, time.perf_counter())
+
+    def _report(self, event, done, failed, now):
+        elapsed_s = now - self._started_at
+        rate = done / elapsed_s if elapsed_s > 0 else 0.0
+        self.log.info(event, "%s: %d/%d messages (%d failed) in %.1fs, %.1f msg/s",
+                      self.library_name, done, self.total, failed, elapsed_s, rate,
+                      library=self.library_name, done=done, total=self.total, failed=failed,
+                      elapsed_s=round(elapsed_s, 3), msg_per_sec=round(rate, 2))
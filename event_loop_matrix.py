@@ -0,0 +1,67 @@
+"""Event-loop backend comparison for the async senders.
+
+With EVENT_LOOP_MATRIX enabled, every selected async sender is benchmarked once per backend in
+EVENT_LOOP_BACKENDS (default: every available one, see event_loops.py), each run reported as
+its own entry keyed "<library>[<backend>]". A loop can't be swapped inside a running process, so
+every backend runs in a fresh isolated_runner worker with EVENT_LOOP set; the runs differ only
+by their loop. Each entry carries its throughput, CPU and p99 change relative to the first
+backend (the default asyncio loop unless EVENT_LOOP_BACKENDS says otherwise).
+"""
+import os
+
+import config
+import event_loops
+import isolated_runner
+from benchmark_utils import ConfigOverlay
+
+def get_backends():
+    """Configured EVENT_LOOP_BACKENDS, or every available backend."""
+    backends = config.EVENT_LOOP_BACKENDS or event_loops.available_backends()
+    unavailable = [backend for backend in backends if not event_loops.is_available(backend)]
+    if unavailable:
+        raise ValueError(f"EVENT_LOOP_BACKENDS not available here: {unavailable} (available: {event_loops.available_backends()})")
+    return backends
+
+def is_async_sender(SenderClass):
+    # get_sender_type() returns a constant in every sender; calling it on the class avoids building a
+    # sender (and the long-lived client some open in __init__) just to ask
+    return SenderClass.get_sender_type(None) == "async"
+
+def backend_overrides(backend):
+    """Config settings for one backend's run."""
+    return {
+        "EVENT_LOOP": backend,
+        "ATTEMPT_LOGS_DIRNAME": os.path.join(config.ATTEMPT_LOGS_DIRNAME, "event_loop", backend),
+    }
+
+def _percent_change(value, baseline):
+    if value is None or not baseline:
+        return None
+    return round((value - baseline) / baseline * 100, 2)
+
+async def run_event_loop_matrix(name, SenderClass):
+    """Benchmarks one async library on every backend. Returns [(library_key, summary or None), ...]."""
+    library_key = SenderClass.__name__.replace("Sender", "").lower()
+    runs = []
+    for backend in get_backends():
+        print(f"\n[{name}] Event loop: {backend}")
+        backend_config = ConfigOverlay(config, **backend_overrides(backend))
+        library_key, result_data = await isolated_runner.run_in_subprocess(SenderClass, config.NUM_MESSAGES, backend_config.as_env())
+        runs.append((backend, result_data))
+
+    baseline_backend, baseline_result = next(((backend, result_data) for backend, result_data in runs if result_data), (None, None))
+    baseline = baseline_result.get("workflow", {}) if baseline_result else {}
+    results = []
+    for backend, result_data in runs:
+        if result_data:
+            workflow = result_data.get("workflow", {})
+            result_data = dict(result_data)
+            result_data["event_loop_backend"] = backend
+            result_data["event_loop_delta_percent"] = {
+                "baseline": baseline_backend,
+                "throughput_msg_per_sec": _percent_change(workflow.get("throughput_msg_per_sec"), baseline.get("throughput_msg_per_sec")),
+                "cpu_time_percent": _percent_change(workflow.get("cpu_time_percent"), baseline.get("cpu_time_percent")),
+                "p99_total_processing_time_s": _percent_change(workflow.get("p99_total_processing_time_s"), baseline.get("p99_total_processing_time_s")),
+            }
+        results.append((f"{library_key}[{backend}]", result_data))
+    return results
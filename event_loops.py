@@ -0,0 +1,67 @@
+"""Event-loop backends for the async benchmarks.
+
+EVENT_LOOP picks the loop that main.py (and every isolated_runner worker) runs on:
+
+- "asyncio": the interpreter's default loop (a selector loop on Linux/macOS), as asyncio.run() uses
+- "uvloop": uvloop's libuv-based loop, if uvloop is installed
+- "tuned": the asyncio selector loop set up explicitly for a benchmark: the platform's best
+  selector, a default executor (used for getaddrinfo and run_in_executor) sized to the run's
+  concurrency, and eager task execution where the interpreter supports it (3.12+)
+
+The default backend runs through plain asyncio.run(). The others are created through
+asyncio.Runner's loop_factory (Python 3.11+), so no global event-loop policy changes.
+"""
+import asyncio
+import selectors
+from concurrent.futures import ThreadPoolExecutor
+
+LOOP_BACKENDS = ("asyncio", "uvloop", "tuned")
+
+_active_backend = "asyncio"
+
+def is_available(backend):
+    if backend == "uvloop":
+        try:
+            import uvloop # noqa: F401 - optional dependency
+        except ImportError:
+            return False
+        return True
+    return backend in LOOP_BACKENDS
+
+def available_backends():
+    return [backend for backend in LOOP_BACKENDS if is_available(backend)]
+
+def loop_factory(backend, concurrency):
+    """A callable creating a new, unstarted loop of `backend` (None for asyncio's default)."""
+    if backend == "asyncio":
+        return None
+    if backend == "uvloop":
+        import uvloop # Imported here so runs on the default loop don't need uvloop installed
+        return uvloop.new_event_loop
+    if backend == "tuned":
+        def new_tuned_loop():
+            loop = asyncio.SelectorEventLoop(selectors.DefaultSelector()) # epoll/kqueue where available
+            loop.set_default_executor(ThreadPoolExecutor(max_workers=max(1, concurrency), thread_name_prefix="loop_executor"))
+            if hasattr(asyncio, "eager_task_factory"):
+                loop.set_task_factory(asyncio.eager_task_factory)
+            return loop
+        return new_tuned_loop
+    raise ValueError(f"Unknown EVENT_LOOP: {backend} (choose from {list(LOOP_BACKENDS)})")
+
+def run(coro, backend, concurrency=1):
+    """asyncio.run(coro) on a loop of `backend`."""
+    global _active_backend
+    if not is_available(backend):
+        raise ValueError(f"EVENT_LOOP={backend} is not available (install uvloop for the uvloop backend).")
+    _active_backend = backend
+    if backend == "asyncio":
+        return asyncio.run(coro)
+    if not hasattr(asyncio, "Runner"):
+        raise RuntimeError(f"EVENT_LOOP={backend} needs Python 3.11+ (asyncio.Runner); use EVENT_LOOP=asyncio.")
+    with asyncio.Runner(loop_factory=loop_factory(backend, concurrency)) as runner:
+        return runner.run(coro)
+
+def loop_info():
+    """Backend and loop class of the running loop, for a run's execution info."""
+    loop = asyncio.get_running_loop()
+    return {"event_loop": _active_backend, "event_loop_class": f"{type(loop).__module__}.{type(loop).__qualname__}"}
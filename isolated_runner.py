@@ -0,0 +1,122 @@
+"""Runs a single sender's benchmark in a fresh interpreter.
+
+main.py launches this script once per library when ISOLATE_LIBRARIES_IN_SUBPROCESS is enabled,
+so RSS and CPU figures are not contaminated by allocator state or imports left behind by
+libraries benchmarked earlier. Only the requested sender module is imported.
+process_sharding.py also uses it to run several shards of one library side by side.
+
+Usage: python isolated_runner.py <sender module> <sender class> <num messages> [--wait-for-start]
+
+Benchmark logs go to stderr; the summary dict is written as JSON to stdout, which the
+parent reads through a pipe. With --wait-for-start, the worker writes a "ready" line once
+the sender is imported and constructed, then waits for a line on stdin before benchmarking.
+"""
+import sys
+
+if __name__ == "__main__":
+    # Redirect before importing config/senders so import-time warnings can't corrupt the result channel
+    _result_pipe = sys.stdout
+    sys.stdout = sys.stderr
+
+import asyncio
+import importlib
+import json
+import os
+import time
+
+import config
+import event_loops
+from database_utils import close_async_pool, close_sync_pool
+
+async def _run_async_benchmark(sender_instance, num_messages):
+    try:
+        return await sender_instance.run_benchmark_async(num_messages)
+    finally:
+        await close_async_pool()
+
+def run_isolated(module_path, class_name, num_messages, before_run=None):
+    """Imports one sender class, runs its benchmark and returns (library_key, summary).
+
+    `before_run` is called once the sender is constructed, just before the benchmark starts.
+    """
+    SenderClass = getattr(importlib.import_module(module_path), class_name)
+    sender_instance = SenderClass(
+        config.TELEGRAM_BOT_TOKEN,
+        config.TELEGRAM_CHAT_ID,
+        config.TELEGRAM_API_URL_TEMPLATE,
+        config
+    )
+    if before_run:
+        before_run()
+    if sender_instance.get_sender_type() == "async":
+        result_data = event_loops.run(_run_async_benchmark(sender_instance, num_messages), config.EVENT_LOOP,
+                                      config.MAX_CONCURRENT_REQUESTS_PER_LIBRARY)
+    else:
+        try:
+            result_data = sender_instance.run_benchmark(num_messages)
+        finally:
+            close_sync_pool()
+    return sender_instance.library_name.lower(), result_data
+
+async def _start_subprocess(SenderClass, num_messages, env_overrides=None, wait_for_start=False):
+    project_dir = os.path.dirname(os.path.abspath(__file__))
+    return await asyncio.create_subprocess_exec(
+        sys.executable, os.path.join(project_dir, "isolated_runner.py"),
+        SenderClass.__module__, SenderClass.__name__, str(num_messages),
+        *(["--wait-for-start"] if wait_for_start else []),
+        stdin=asyncio.subprocess.PIPE if wait_for_start else None,
+        stdout=asyncio.subprocess.PIPE,
+        cwd=project_dir,
+        env={**os.environ, **(env_overrides or {})}
+    )
+
+async def _collect_result(process, SenderClass, start_signal=None):
+    stdout_data, _ = await process.communicate(start_signal)
+    if process.returncode != 0:
+        raise RuntimeError(f"Isolated benchmark worker for {SenderClass.__name__} exited with code {process.returncode}.")
+    payload = json.loads(stdout_data)
+    return payload["library_key"], payload["result"]
+
+async def run_in_subprocess(SenderClass, num_messages, env_overrides=None):
+    """Parent side: runs `SenderClass` in a fresh interpreter and returns (library_key, summary).
+
+    `env_overrides` replaces config settings in the child, which reads them from its environment.
+    """
+    process = await _start_subprocess(SenderClass, num_messages, env_overrides)
+    return await _collect_result(process, SenderClass)
+
+async def run_in_subprocesses_together(SenderClass, shards):
+    """Runs `SenderClass` in one fresh interpreter per (num_messages, env_overrides) shard, all at once.
+
+    Workers are started, and only released once every one of them has imported its sender, so
+    the benchmarks overlap instead of being staggered by interpreter start-up.
+    Returns [(library_key, summary), ...] in shard order.
+    """
+    processes = []
+    try:
+        for num_messages, env_overrides in shards:
+            processes.append(await _start_subprocess(SenderClass, num_messages, env_overrides, wait_for_start=True))
+        for process in processes:
+            if (await process.stdout.readline()).strip() != b"ready":
+                raise RuntimeError(f"A benchmark worker for {SenderClass.__name__} exited before it was ready.")
+        return await asyncio.gather(*(_collect_result(process, SenderClass, b"start\n") for process in processes))
+    finally:
+        for process in processes:
+            if process.returncode is None:
+                process.kill()
+                await process.wait()
+
+def _wait_for_start():
+    # Tell the parent this worker is ready, then block until it starts all workers together
+    _result_pipe.write("ready\n")
+    _result_pipe.flush()
+    sys.stdin.readline()
+
+if __name__ == "__main__":
+    start_time = time.perf_counter()
+    wait_for_start = "--wait-for-start" in sys.argv[4:]
+    library_key, result = run_isolated(sys.argv[1], sys.argv[2], int(sys.argv[3]), _wait_for_start if wait_for_start else None)
+    print(f"Isolated worker for {library_key} finished in {time.perf_counter() - start_time:.2f}s.")
+
+    json.dump({"library_key": library_key, "result": result}, _result_pipe)
+    _result_pipe.flush()
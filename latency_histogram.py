@@ -0,0 +1,136 @@
+"""Fixed-memory, log-bucketed latency histogram in the spirit of HdrHistogram.
+
+Values are recorded as integer microseconds. Below 2**sub_bucket_bits every value has its own
+bucket; above that, each power-of-two range is split into 2**(sub_bucket_bits - 1) linear
+sub-buckets, so the relative error is at most 2**-(sub_bucket_bits - 1) (about 0.1% with the
+default 11 bits) at any magnitude. Memory is fixed by the highest trackable value, histograms
+with the same layout can be merged (across worker threads, processes or trials), and the
+sparse `to_dict()` form is what goes into the JSON report.
+"""
+import math
+import numpy as np
+
+# Percentiles reported for every histogram (label -> percentile)
+REPORTED_PERCENTILES = {
+    "p50": 50.0,
+    "p90": 90.0,
+    "p99": 99.0,
+    "p99_9": 99.9,
+    "p99_99": 99.99,
+}
+
+class LatencyHistogram:
+    def __init__(self, sub_bucket_bits=11, highest_trackable_us=3_600_000_000):
+        self.sub_bucket_bits = sub_bucket_bits
+        self.highest_trackable_us = highest_trackable_us
+        self.sub_bucket_count = 1 << sub_bucket_bits
+        self.sub_bucket_half = self.sub_bucket_count >> 1
+        max_exponent = max(0, highest_trackable_us.bit_length() - sub_bucket_bits)
+        self.counts = np.zeros(self.sub_bucket_count + max_exponent * self.sub_bucket_half, dtype=np.int64)
+        self.total_count = 0
+        self.min_us = None
+        self.max_us = None
+        self.sum_us = 0
+
+    # --- Bucket layout ---
+
+    def _indices(self, values_us):
+        """Bucket index of each value (vectorized)."""
+        values_us = np.asarray(values_us, dtype=np.int64)
+        # frexp gives v = m * 2**e with m in [0.5, 1), so e is the bit length for integers < 2**53
+        _, bit_lengths = np.frexp(values_us.astype(np.float64))
+        exponents = np.maximum(bit_lengths - self.sub_bucket_bits, 0)
+        mantissas = values_us >> exponents
+        return np.where(
+            exponents == 0,
+            values_us,
+            self.sub_bucket_count + (exponents - 1) * self.sub_bucket_half + (mantissas - self.sub_bucket_half),
+        )
+
+    def _highest_equivalent_us(self, index):
+        """Largest value that falls into bucket `index`."""
+        if index < self.sub_bucket_count:
+            return index
+        offset = index - self.sub_bucket_count
+        exponent = offset // self.sub_bucket_half + 1
+        mantissa = offset % self.sub_bucket_half + self.sub_bucket_half
+        return ((mantissa + 1) << exponent) - 1
+
+    # --- Recording and merging ---
+
+    def record_many(self, values_us):
+        """Records an array of latencies in microseconds (clamped to [0, highest_trackable_us])."""
+        values_us = np.clip(np.rint(np.asarray(values_us, dtype=np.float64)), 0, self.highest_trackable_us).astype(np.int64)
+        if values_us.size == 0:
+            return
+        np.add.at(self.counts, self._indices(values_us), 1)
+        self.total_count += int(values_us.size)
+        self.sum_us += int(values_us.sum())
+        low, high = int(values_us.min()), int(values_us.max())
+        self.min_us = low if self.min_us is None else min(self.min_us, low)
+        self.max_us = high if self.max_us is None else max(self.max_us, high)
+
+    def record_ms(self, values_ms):
+        """Convenience wrapper for millisecond inputs (the unit used by AttemptRecorder)."""
+        self.record_many(np.asarray(values_ms, dtype=np.float64) * 1000)
+
+    def merge(self, other):
+        """Adds `other`'s counts into this histogram. Both must share the same layout."""
+        if (other.sub_bucket_bits, other.highest_trackable_us) != (self.sub_bucket_bits, self.highest_trackable_us):
+            raise ValueError("Cannot merge latency histograms with different bucket layouts.")
+        self.counts += other.counts
+        self.total_count += other.total_count
+        self.sum_us += other.sum_us
+        for attr, pick in (("min_us", min), ("max_us", max)):
+            mine, theirs = getattr(self, attr), getattr(other, attr)
+            setattr(self, attr, theirs if mine is None else mine if theirs is None else pick(mine, theirs))
+        return self
+
+    # --- Queries ---
+
+    def value_at_percentile_us(self, percentile):
+        if self.total_count == 0:
+            return 0
+        target = max(1, math.ceil(percentile / 100 * self.total_count))
+        index = int(np.searchsorted(np.cumsum(self.counts), target))
+        return min(self._highest_equivalent_us(index), self.max_us)
+
+    def summary_s(self):
+        """Count, mean, min, max and the REPORTED_PERCENTILES, in seconds."""
+        summary = {"count": self.total_count}
+        if self.total_count == 0:
+            summary.update({"mean": 0, "min": 0, "max": 0, **{label: 0 for label in REPORTED_PERCENTILES}})
+            return summary
+        summary["mean"] = round(self.sum_us / self.total_count / 1e6, 6)
+        summary["min"] = round(self.min_us / 1e6, 6)
+        summary["max"] = round(self.max_us / 1e6, 6)
+        for label, percentile in REPORTED_PERCENTILES.items():
+            summary[label] = round(self.value_at_percentile_us(percentile) / 1e6, 6)
+        return summary
+
+    # --- Serialization ---
+
+    def to_dict(self):
+        """Sparse, JSON-serializable form (only non-empty buckets are listed)."""
+        nonzero = np.flatnonzero(self.counts)
+        return {
+            "unit": "us",
+            "sub_bucket_bits": self.sub_bucket_bits,
+            "highest_trackable_us": self.highest_trackable_us,
+            "total_count": self.total_count,
+            "sum_us": self.sum_us,
+            "min_us": self.min_us,
+            "max_us": self.max_us,
+            "bucket_indices": nonzero.tolist(),
+            "bucket_counts": self.counts[nonzero].tolist(),
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        histogram = cls(sub_bucket_bits=data["sub_bucket_bits"], highest_trackable_us=data["highest_trackable_us"])
+        histogram.counts[np.asarray(data["bucket_indices"], dtype=np.int64)] = np.asarray(data["bucket_counts"], dtype=np.int64)
+        histogram.total_count = data["total_count"]
+        histogram.sum_us = data["sum_us"]
+        histogram.min_us = data["min_us"]
+        histogram.max_us = data["max_us"]
+        return histogram
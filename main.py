@@ -1,4 +1,3 @@
-import asyncio
 import datetime
 import platform
 import time
@@ -6,26 +5,85 @@ import sys # For error handling
 
 # Project specific imports
 import config
-from senders.httpx_sender import HttpxSender
-from senders.aiohttp_sender import AiohttpSender
-from senders.requests_sender import RequestsSender
-from senders.urllib3_sender import Urllib3Sender
-from senders.uplink_sender import UplinkSender
-from senders.ptb_sender import PTBSender
-from senders.pytelegrambotapi_sender import PyTelegramBotAPISender
+from senders.registry import SENDER_CLASS_PATHS, library_column_value, load_sender_class, measure_import_cost
 from reporting import json_reporter, md_reporter
-from database_utils import setup_database, close_async_pool # Import DB utils
-
-# Configuration
-SENDER_CLASSES = {
-    "httpx": HttpxSender,
-    "aiohttp": AiohttpSender,
-    "requests": RequestsSender,
-    "urllib3": Urllib3Sender,
-    "uplink": UplinkSender,
-    "python-telegram-bot": PTBSender,
-    "pytelegrambotapi": PyTelegramBotAPISender,
-}
+from database_utils import setup_database, close_async_pool, close_sync_pool, capture_query_plans # Import DB utils
+import mock_telegram_server
+import isolated_runner
+import saturation_sweep
+import protocol_matrix
+import event_loops
+import event_loop_matrix
+import process_sharding
+import dataset_generator
+import trials
+
+async def run_library_benchmark(name, SenderClass):
+    """Runs one library's benchmark in this process. Returns (library_key, summary or None)."""
+    # Instantiate the sender
+    sender_instance = SenderClass(
+        config.TELEGRAM_BOT_TOKEN, 
+        config.TELEGRAM_CHAT_ID, 
+        config.TELEGRAM_API_URL_TEMPLATE,
+        config  # Pass the config module itself
+    )
+
+    result_data = None
+    if sender_instance.get_sender_type() == "async": # Use instance to call get_sender_type
+        try:
+            result_data = await sender_instance.run_benchmark_async(config.NUM_MESSAGES)
+        except NotImplementedError:
+            print(f"{name} async benchmark not implemented, skipping.")
+        except Exception as e:
+            print(f"Error during async benchmark for {name}: {e}")
+    else:  # sync
+        try:
+            result_data = sender_instance.run_benchmark(config.NUM_MESSAGES)
+        except NotImplementedError:
+            print(f"{name} sync benchmark not implemented, skipping.")
+        except Exception as e:
+            print(f"Error during sync benchmark for {name}: {e}")
+    return sender_instance.library_name.lower(), result_data
+
+async def run_library_benchmark_isolated(name, SenderClass):
+    """Runs one library's benchmark in a fresh subprocess so its memory/CPU figures start clean."""
+    try:
+        return await isolated_runner.run_in_subprocess(SenderClass, config.NUM_MESSAGES)
+    except Exception as e:
+        print(f"Error during isolated benchmark for {name}: {e}")
+        return name, None
+
+async def run_library_sweep(name, SenderClass):
+    """Runs a saturation sweep for one library (see saturation_sweep.py)."""
+    try:
+        return await saturation_sweep.run_saturation_sweep(name, SenderClass)
+    except Exception as e:
+        print(f"Error during saturation sweep for {name}: {e}")
+        return name, None
+
+async def run_library_protocol_matrix(name, SenderClass):
+    """Benchmarks one library once per HTTP protocol mode (see protocol_matrix.py)."""
+    try:
+        return await protocol_matrix.run_protocol_matrix(name, SenderClass)
+    except Exception as e:
+        print(f"Error during protocol matrix for {name}: {e}")
+        return [(name, None)]
+
+async def run_library_event_loop_matrix(name, SenderClass):
+    """Benchmarks one async library once per event-loop backend (see event_loop_matrix.py)."""
+    try:
+        return await event_loop_matrix.run_event_loop_matrix(name, SenderClass)
+    except Exception as e:
+        print(f"Error during event loop matrix for {name}: {e}")
+        return [(name, None)]
+
+async def run_library_process_scaling(name, SenderClass):
+    """Runs one library across several worker processes at each PROCESS_SHARDS count (see process_sharding.py)."""
+    try:
+        return await process_sharding.run_process_scaling(name, SenderClass)
+    except Exception as e:
+        print(f"Error during multi-process benchmark for {name}: {e}")
+        return name, None
 
 async def main():
     start_script_time = time.perf_counter()
@@ -34,6 +92,10 @@ async def main():
     # --- Database Setup ---
     try:
         setup_database() # Initialize schema and populate if needed
+        # Bulk rows (if DATASET_ROWS > 0), only for the libraries that will read them
+        dataset_libraries = [library_column_value(name) for name in config.LIBRARIES_TO_TEST if name in SENDER_CLASS_PATHS]
+        dataset_info = await dataset_generator.generate_dataset(dataset_libraries or None)
+        query_plans = capture_query_plans() if config.CAPTURE_QUERY_PLANS else None
     except Exception as e:
         print(f"Failed to setup database. Exiting. Error: {e}")
         sys.exit(1) # Exit if DB setup fails
@@ -45,52 +107,82 @@ async def main():
         return
 
     # Select senders to run
-    senders_to_run_names = config.LIBRARIES_TO_TEST if config.LIBRARIES_TO_TEST else SENDER_CLASSES.keys()
-    selected_senders = {name: SENDER_CLASSES[name] for name in senders_to_run_names if name in SENDER_CLASSES}
+    senders_to_run_names = config.LIBRARIES_TO_TEST if config.LIBRARIES_TO_TEST else SENDER_CLASS_PATHS.keys()
+    unknown_names = [name for name in senders_to_run_names if name not in SENDER_CLASS_PATHS]
+    if unknown_names:
+        print(f"Skipping unknown libraries: {unknown_names}")
+    # Only the selected senders (and their HTTP libraries) are imported
+    selected_senders = {name: load_sender_class(name) for name in senders_to_run_names if name in SENDER_CLASS_PATHS}
 
     if not selected_senders:
         print("No libraries selected or specified to test. Exiting.")
-        print(f"Available libraries: {list(SENDER_CLASSES.keys())}")
+        print(f"Available libraries: {list(SENDER_CLASS_PATHS.keys())}")
         print(f"Configured to test: {config.LIBRARIES_TO_TEST}")
         return
     
     print(f"Selected libraries for benchmark: {list(selected_senders.keys())}")
 
+    # --- Local Telegram API stand-in ---
+    mock_server_process = None
+    if config.USE_MOCK_TELEGRAM_SERVER:
+        print(f"Starting local mock Telegram Bot API at {config.TELEGRAM_API_BASE_URL}...")
+        mock_server_process = mock_telegram_server.start_mock_server_subprocess()
+    # ----------------------------------
+
     # Store results in a dictionary keyed by library name
     benchmark_results_by_library = {}
+    trial_results_by_library = {} # library_key -> [(trial, result_data), ...]
+    import_costs = {}
+
+    try:
+        for trial in range(config.TRIALS):
+            # Rotated each trial so drift over the session doesn't always hit the same library
+            trial_names = trials.trial_order(selected_senders, trial)
+            if config.TRIALS > 1:
+                print(f"\n=== Trial {trial + 1}/{config.TRIALS}: {', '.join(trial_names)} ===")
+            for name in trial_names:
+                SenderClass = selected_senders[name]
+                print(f"\n--- Starting benchmark for {name} ---") # Use name for printing
+
+                # Cold-start cost of choosing this library, measured in a fresh interpreter before its first run
+                import_cost = import_costs.get(name)
+                if name not in import_costs:
+                    import_cost = import_costs[name] = measure_import_cost(name) if config.MEASURE_IMPORT_COST else None
+                    if import_cost:
+                        print(f"[{name}] Import: {import_cost['import_time_s']}s, +{import_cost['import_memory_mb']} MB RSS, "
+                              f"{import_cost['modules_imported']} modules")
+
+                if config.HTTP_PROTOCOL_MATRIX and SenderClass.supports_http2:
+                    # One entry per protocol mode, e.g. "httpx[http1]", "httpx[http2]"
+                    library_results = await run_library_protocol_matrix(name, SenderClass)
+                elif config.EVENT_LOOP_MATRIX and event_loop_matrix.is_async_sender(SenderClass):
+                    # One entry per backend, e.g. "aiohttp[asyncio]", "aiohttp[uvloop]"
+                    library_results = await run_library_event_loop_matrix(name, SenderClass)
+                elif config.SATURATION_SWEEP:
+                    library_results = [await run_library_sweep(name, SenderClass)]
+                elif config.PROCESS_SHARDS:
+                    library_results = [await run_library_process_scaling(name, SenderClass)]
+                elif config.ISOLATE_LIBRARIES_IN_SUBPROCESS:
+                    library_results = [await run_library_benchmark_isolated(name, SenderClass)]
+                else:
+                    library_results = [await run_library_benchmark(name, SenderClass)]
+
+                for library_key, result_data in library_results:
+                    if result_data:
+                        if import_cost:
+                            result_data = {**result_data, "import_cost": import_cost}
+                        if config.TRIALS > 1:
+                            result_data = trials.archive_attempt_logs(result_data, trial)
+                        # Use the instance's library_name for storing, which should match 'name'
+                        trial_results_by_library.setdefault(library_key, []).append((trial, result_data))
+
+                print(f"--- Finished benchmark for {name} ---")
+    finally:
+        mock_telegram_server.stop_mock_server_subprocess(mock_server_process)
 
-    for name, SenderClass in selected_senders.items(): # Iterate over items (name, class)
-        print(f"\n--- Starting benchmark for {name} ---") # Use name for printing
-        
-        # Instantiate the sender
-        sender_instance = SenderClass(
-            config.TELEGRAM_BOT_TOKEN, 
-            config.TELEGRAM_CHAT_ID, 
-            config.TELEGRAM_API_URL_TEMPLATE,
-            config  # Pass the config module itself
-        )
-
-        result_data = None
-        if sender_instance.get_sender_type() == "async": # Use instance to call get_sender_type
-            try:
-                result_data = await sender_instance.run_benchmark_async(config.NUM_MESSAGES)
-            except NotImplementedError:
-                print(f"{name} async benchmark not implemented, skipping.")
-            except Exception as e:
-                print(f"Error during async benchmark for {name}: {e}")
-        else:  # sync
-            try:
-                result_data = sender_instance.run_benchmark(config.NUM_MESSAGES)
-            except NotImplementedError:
-                print(f"{name} sync benchmark not implemented, skipping.")
-            except Exception as e:
-                print(f"Error during sync benchmark for {name}: {e}")
-        
-        if result_data:
-            # Use the instance's library_name for storing, which should match 'name'
-            benchmark_results_by_library[sender_instance.library_name.lower()] = result_data 
-        
-        print(f"--- Finished benchmark for {name} ---")
+    for library_key, trial_results in trial_results_by_library.items():
+        # With TRIALS > 1: the median trial, ranked metrics averaged over all trials, per-trial values under "trials"
+        benchmark_results_by_library[library_key] = trials.combine_trials(trial_results) if config.TRIALS > 1 else trial_results[0][1]
 
     # Prepare data for reporting
     # Extract library versions for the report details
@@ -104,11 +196,64 @@ async def main():
             "python_version": platform.python_version(),
             "platform": platform.platform(),
             "libraries_versions": lib_versions_for_report, # Using extracted versions
+            "query_plans": query_plans, # EXPLAIN ANALYZE of the hot DB queries, captured after setup
             "parameters": {
                 "num_messages_per_library": config.NUM_MESSAGES,
+                "max_concurrent_requests_per_library": config.MAX_CONCURRENT_REQUESTS_PER_LIBRARY,
+                "sync_execution_mode": config.SYNC_EXECUTION_MODE,
+                "sync_thread_workers": config.SYNC_THREAD_WORKERS,
+                "isolated_subprocess_per_library": config.ISOLATE_LIBRARIES_IN_SUBPROCESS,
+                "resource_sample_interval_s": config.RESOURCE_SAMPLE_INTERVAL_S,
+                "message_source": config.MESSAGE_SOURCE,
+                "prefetch_batch_size": config.PREFETCH_BATCH_SIZE if config.MESSAGE_SOURCE == "prefetch" else None,
+                "outbox_claim_batch_size": config.OUTBOX_CLAIM_BATCH_SIZE if config.MESSAGE_SOURCE == "outbox" else None,
+                "load_model": config.LOAD_MODEL,
+                "saturation_sweep": {
+                    "dimension": config.SWEEP_DIMENSION,
+                    "levels": saturation_sweep.get_sweep_levels(),
+                    "messages_per_step": config.SWEEP_MESSAGES_PER_STEP,
+                    "slo_p99_total_processing_time_s": config.SWEEP_SLO_P99_S,
+                    "slo_max_error_rate": config.SWEEP_SLO_MAX_ERROR_RATE,
+                } if config.SATURATION_SWEEP else None,
+                "process_shards": process_sharding.get_process_counts() if config.PROCESS_SHARDS else None,
+                "open_loop": {
+                    "arrival": config.OPEN_LOOP_ARRIVAL,
+                    "rate_msg_per_sec": config.OPEN_LOOP_RATE_MSG_PER_SEC,
+                    "ramp_start_rate_msg_per_sec": config.OPEN_LOOP_RAMP_START_RATE_MSG_PER_SEC,
+                    "seed": config.OPEN_LOOP_SEED,
+                } if config.LOAD_MODEL == "open" else None,
                 "telegram_api_url": config.TELEGRAM_API_URL_TEMPLATE.format(token="[REDACTED]"),
                 "database_backend": "PostgreSQL", # Added DB info
-                "db_host": config.DB_HOST # Added DB info
+                "db_host": config.DB_HOST, # Added DB info
+                "db_prepared_statements": config.DB_PREPARED_STATEMENTS,
+                "async_db_pool_size": config.ASYNC_DB_POOL_SIZE or "auto",
+                "async_db_statement_cache_size": config.ASYNC_DB_STATEMENT_CACHE_SIZE,
+                "httpx_http_version": config.HTTPX_HTTP_VERSION,
+                "httpx_sync_http_version": config.HTTPX_SYNC_HTTP_VERSION,
+                "event_loop": config.EVENT_LOOP,
+                "event_loop_matrix": event_loop_matrix.get_backends() if config.EVENT_LOOP_MATRIX else None,
+                "http_protocol_matrix": protocol_matrix.get_protocol_modes() if config.HTTP_PROTOCOL_MATRIX else None,
+                "sync_db_pool_size": (config.SYNC_DB_POOL_SIZE or "auto") if config.SYNC_DB_POOL else None,
+                "measure_import_cost": config.MEASURE_IMPORT_COST,
+                "log_level": config.LOG_LEVEL,
+                "trials": {
+                    "count": config.TRIALS,
+                    "order": "rotated",
+                    "significance_alpha": config.SIGNIFICANCE_ALPHA,
+                    "bootstrap_resamples": config.BOOTSTRAP_RESAMPLES,
+                } if config.TRIALS > 1 else None,
+                "warmup": {"messages": config.WARMUP_MESSAGES, "seconds": config.WARMUP_SECONDS}
+                          if config.WARMUP_MESSAGES or config.WARMUP_SECONDS else None,
+                "time_window_s": config.TIME_WINDOW_S,
+                "dataset": dataset_info, # Bulk-generated rows and load timing (None if only the seed rows were used)
+                "mock_telegram_server": {
+                    "latency_distribution": config.MOCK_LATENCY_DISTRIBUTION,
+                    "latency_mean_ms": config.MOCK_LATENCY_MEAN_MS,
+                    "latency_stddev_ms": config.MOCK_LATENCY_STDDEV_MS,
+                    "error_rate": config.MOCK_ERROR_RATE,
+                    "rate_limit_rate": config.MOCK_RATE_LIMIT_RATE,
+                    "http2_offered": config.MOCK_SERVER_HTTP2,
+                } if config.USE_MOCK_TELEGRAM_SERVER else None
             }
         },
         "libraries": benchmark_results_by_library, # Main results structured by library
@@ -172,9 +317,14 @@ async def main():
                     "success_rate": sorted([ (lib_name, data["success_rate_percent"]) for lib_name, data in valid_results_for_summary], key=lambda x: x[1], reverse=True), # Keep this key for data, plot lookup uses different key
                     "avg_response_size_bytes": sorted([(lib_name, data["avg_response_size_bytes"]) for lib_name, data in valid_results_for_summary if data.get('avg_response_size_bytes') is not None], key=lambda x: x[1]), 
                     "memory_increase_mb": sorted([ (name, data["memory_increase_mb"]) for name, data in valid_for_memory], key=lambda x: x[1]) if valid_for_memory else [], # Standardized key
-                    "cpu_time_percent": sorted([ (name, data["cpu_time_percent"]) for name, data in valid_for_cpu], key=lambda x: x[1]) if valid_for_cpu else [] # Standardized key
+                    "cpu_time_percent": sorted([ (name, data["cpu_time_percent"]) for name, data in valid_for_cpu], key=lambda x: x[1]) if valid_for_cpu else [], # Standardized key
+                    "peak_rss_mb": sorted([ (name, lib_data["workflow"]["peak_rss_mb"]) for name, lib_data in benchmark_results_by_library.items() if lib_data.get("workflow", {}).get("peak_rss_mb") is not None], key=lambda x: x[1])
                 }
             }
+            if config.TRIALS > 1:
+                # Which orderings in the rankings hold up against the trial-to-trial variance
+                overall_summary_content["ranking_significance"] = trials.rank_significance(
+                    benchmark_results_by_library, overall_summary_content["rankings"])
             benchmark_data_for_reports["overall_summary"] = overall_summary_content
 
     # Generate reports
@@ -187,6 +337,7 @@ async def main():
 
     # --- Close async DB pool --- 
     await close_async_pool() # Close pool before main exits
+    close_sync_pool()
     # --------------------------
 
 if __name__ == "__main__":
@@ -195,4 +346,4 @@ if __name__ == "__main__":
     #     asyncio.run(main())
     # finally:
     #     asyncio.run(close_async_pool()) # Close the pool on exit
-    asyncio.run(main()) 
\ No newline at end of file
+    event_loops.run(main(), config.EVENT_LOOP, config.MAX_CONCURRENT_REQUESTS_PER_LIBRARY)
\ No newline at end of file
@@ -0,0 +1,244 @@
+"""A local stand-in for the Telegram Bot API used for offline, reproducible benchmarks.
+
+Serves `sendMessage` (and `getMe`, which python-telegram-bot calls on initialize) with
+Telegram-shaped JSON bodies, a configurable latency distribution and optional
+5xx / 429 fault injection. Runs on Hypercorn, which speaks HTTP/1.1 and HTTP/2
+(h2c prior knowledge on plain TCP, ALPN when a certificate is configured).
+
+Run standalone with `python mock_telegram_server.py`, or set USE_MOCK_TELEGRAM_SERVER=true
+and main.py will start it in a subprocess and point every sender at it.
+"""
+import asyncio
+import itertools
+import json
+import math
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+from email.parser import BytesParser
+from email.policy import HTTP as HTTP_POLICY
+from urllib.parse import parse_qsl
+
+import config
+
+MOCK_BOT_ID = 7000000001
+MOCK_BOT_USER = {
+    "id": MOCK_BOT_ID,
+    "is_bot": True,
+    "first_name": "Benchmark Mock Bot",
+    "username": "benchmark_mock_bot",
+}
+
+_message_ids = itertools.count(1)
+
+# --- Latency and fault injection ---
+
+def sample_latency_s():
+    """Draws one response delay (seconds) from the configured distribution."""
+    mean_ms = config.MOCK_LATENCY_MEAN_MS
+    stddev_ms = config.MOCK_LATENCY_STDDEV_MS
+    distribution = config.MOCK_LATENCY_DISTRIBUTION
+    if distribution == "constant":
+        delay_ms = mean_ms
+    elif distribution == "uniform":
+        delay_ms = random.uniform(mean_ms - stddev_ms, mean_ms + stddev_ms)
+    elif distribution == "normal":
+        delay_ms = random.gauss(mean_ms, stddev_ms)
+    elif distribution == "lognormal":
+        # Parameterize the underlying normal so the lognormal has the requested mean/stddev
+        if mean_ms <= 0:
+            delay_ms = 0
+        else:
+            sigma_sq = math.log(1 + (stddev_ms / mean_ms) ** 2)
+            delay_ms = random.lognormvariate(math.log(mean_ms) - sigma_sq / 2, math.sqrt(sigma_sq))
+    elif distribution == "exponential":
+        delay_ms = random.expovariate(1 / mean_ms) if mean_ms > 0 else 0
+    else:
+        raise ValueError(f"Unknown MOCK_LATENCY_DISTRIBUTION: {distribution}")
+    return max(0.0, delay_ms) / 1000
+
+def _pick_fault():
+    """Returns 429, 500 or None according to the configured injection rates."""
+    roll = random.random()
+    if roll < config.MOCK_RATE_LIMIT_RATE:
+        return 429
+    if roll < config.MOCK_RATE_LIMIT_RATE + config.MOCK_ERROR_RATE:
+        return 500
+    return None
+
+# --- Request parsing and Telegram-shaped responses ---
+
+def _parse_params(content_type, body, query_string):
+    """Extracts API parameters from urlencoded, JSON or multipart bodies (and the query string)."""
+    params = dict(parse_qsl(query_string.decode("latin-1")))
+    if not body:
+        return params
+    if content_type.startswith("application/json"):
+        try:
+            params.update(json.loads(body))
+        except ValueError:
+            pass
+    elif content_type.startswith("multipart/form-data"):
+        message = BytesParser(policy=HTTP_POLICY).parsebytes(
+            f"Content-Type: {content_type}\r\n\r\n".encode("latin-1") + body
+        )
+        for part in message.iter_parts():
+            name = part.get_param("name", header="content-disposition")
+            if name:
+                # Form parts rarely declare a charset; clients send UTF-8
+                params[name] = part.get_payload(decode=True).decode("utf-8", errors="replace")
+    else:
+        params.update(parse_qsl(body.decode("utf-8", errors="replace")))
+    return params
+
+def _chat_from_id(chat_id):
+    try:
+        return {"id": int(chat_id), "first_name": "Benchmark", "type": "private"}
+    except (TypeError, ValueError):
+        # Channel usernames such as "@my_channel"
+        return {"id": -1000000000001, "title": str(chat_id), "username": str(chat_id).lstrip("@"), "type": "channel"}
+
+def build_response(api_method, params):
+    """Returns (status, payload) for a successful call to `api_method`."""
+    if api_method == "sendMessage":
+        return 200, {
+            "ok": True,
+            "result": {
+                "message_id": next(_message_ids),
+                "from": MOCK_BOT_USER,
+                "chat": _chat_from_id(params.get("chat_id")),
+                "date": int(time.time()),
+                "text": str(params.get("text", "")),
+            },
+        }
+    if api_method == "getMe":
+        return 200, {
+            "ok": True,
+            "result": {
+                **MOCK_BOT_USER,
+                "can_join_groups": True,
+                "can_read_all_group_messages": False,
+                "supports_inline_queries": False,
+            },
+        }
+    return 404, {"ok": False, "error_code": 404, "description": "Not Found: method not found"}
+
+def build_fault_response(status):
+    """Returns (status, payload) for an injected failure, matching Telegram's error bodies."""
+    if status == 429:
+        retry_after = config.MOCK_RETRY_AFTER_S
+        return 429, {
+            "ok": False,
+            "error_code": 429,
+            "description": f"Too Many Requests: retry after {retry_after}",
+            "parameters": {"retry_after": retry_after},
+        }
+    return 500, {"ok": False, "error_code": 500, "description": "Internal Server Error"}
+
+# --- ASGI application ---
+
+async def _read_body(receive):
+    body = b""
+    more_body = True
+    while more_body:
+        message = await receive()
+        body += message.get("body", b"")
+        more_body = message.get("more_body", False)
+    return body
+
+async def app(scope, receive, send):
+    """ASGI entry point serving /bot<token>/<method>."""
+    if scope["type"] == "lifespan":
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+    if scope["type"] != "http":
+        return
+
+    headers = dict(scope["headers"])
+    content_type = headers.get(b"content-type", b"").decode("latin-1")
+    body = await _read_body(receive)
+    api_method = scope["path"].rstrip("/").rsplit("/", 1)[-1]
+
+    await asyncio.sleep(sample_latency_s())
+
+    fault = _pick_fault()
+    if fault:
+        status, payload = build_fault_response(fault)
+    else:
+        status, payload = build_response(api_method, _parse_params(content_type, body, scope.get("query_string", b"")))
+
+    response_body = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(response_body)).encode("latin-1")),
+            (b"server", b"nginx/1.18.0"), # What api.telegram.org reports
+        ],
+    })
+    await send({"type": "http.response.body", "body": response_body})
+
+# --- Server lifecycle ---
+
+def run_server():
+    """Serves the mock API until interrupted (blocking)."""
+    from hypercorn.asyncio import serve # Imported here so main.py can launch the server without hypercorn installed in-process
+    from hypercorn.config import Config as HypercornConfig
+
+    hypercorn_config = HypercornConfig()
+    hypercorn_config.bind = [f"{config.MOCK_SERVER_HOST}:{config.MOCK_SERVER_PORT}"]
+    hypercorn_config.accesslog = None
+    hypercorn_config.keep_alive_timeout = 75
+    if config.MOCK_SERVER_CERTFILE:
+        hypercorn_config.certfile = config.MOCK_SERVER_CERTFILE
+        hypercorn_config.keyfile = config.MOCK_SERVER_KEYFILE
+    # ALPN offer; cleartext clients can still use h2c with prior knowledge
+    hypercorn_config.alpn_protocols = ["h2", "http/1.1"] if config.MOCK_SERVER_HTTP2 else ["http/1.1"]
+
+    scheme = "https" if config.MOCK_SERVER_CERTFILE else "http"
+    print(f"Mock Telegram Bot API listening on {scheme}://{config.MOCK_SERVER_HOST}:{config.MOCK_SERVER_PORT} "
+          f"(latency: {config.MOCK_LATENCY_DISTRIBUTION} {config.MOCK_LATENCY_MEAN_MS}±{config.MOCK_LATENCY_STDDEV_MS} ms, "
+          f"5xx rate: {config.MOCK_ERROR_RATE}, 429 rate: {config.MOCK_RATE_LIMIT_RATE})")
+    asyncio.run(serve(app, hypercorn_config))
+
+def start_mock_server_subprocess(startup_timeout_s=15.0):
+    """Starts the mock server in a separate process and waits until it accepts connections.
+
+    A separate process keeps the server's CPU and memory out of the benchmark's ResourceMonitor.
+    """
+    project_dir = os.path.dirname(os.path.abspath(__file__))
+    process = subprocess.Popen([sys.executable, os.path.join(project_dir, "mock_telegram_server.py")], cwd=project_dir)
+    deadline = time.monotonic() + startup_timeout_s
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Mock Telegram server exited during startup (code {process.returncode}).")
+        try:
+            with socket.create_connection((config.MOCK_SERVER_HOST, config.MOCK_SERVER_PORT), timeout=0.5):
+                return process
+        except OSError:
+            time.sleep(0.1)
+    process.terminate()
+    raise RuntimeError(f"Mock Telegram server did not start listening within {startup_timeout_s}s.")
+
+def stop_mock_server_subprocess(process):
+    if process and process.poll() is None:
+        process.terminate()
+        try:
+            process.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+if __name__ == "__main__":
+    try:
+        run_server()
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,180 @@
+"""Multi-process load generation: one library driven by several worker processes at once.
+
+A single process runs one event loop (or one GIL-bound thread pool), so at high concurrency the
+harness itself (JSON, TLS, logging) can become the bottleneck. With PROCESS_SHARDS set, every
+selected library is run at each listed process count instead: NUM_MESSAGES is split across that
+many isolated_runner workers, each with its own event loop or thread pool, DB pool and
+concurrency, started together once all of them are ready.
+
+The shards' latency histograms are merged and their counts and resource figures added up into
+one summary per process count. Scaling efficiency compares throughput per process with the
+smallest process count run (include 1 for per-core efficiency): 1.0 means linear scaling.
+The library's headline numbers are those of the largest process count.
+"""
+import os
+from collections import Counter
+
+import config
+import isolated_runner
+from benchmark_utils import ConfigOverlay, TIMELINE_SERIES
+from latency_histogram import LatencyHistogram
+
+# Workflow fields added up across shards (each process's own usage; peaks need not coincide)
+_SUMMED_FIELDS = {
+    "successful_runs", "failed_runs", "total_runs", "warmup_attempts", "new_connections", "reused_connections", "concurrency",
+    "cpu_time_percent", "memory_increase_mb", "db_pool_size", "db_fetch_batches", "db_fetch_time_total_s",
+    "offered_rate_msg_per_sec", "target_rate_msg_per_sec",
+    *(f"{stat}_{series}" for series in TIMELINE_SERIES for stat in ("peak", "avg", "p95")),
+}
+
+def get_process_counts():
+    """Configured PROCESS_SHARDS, ascending."""
+    return sorted({max(1, int(count)) for count in config.PROCESS_SHARDS})
+
+def shard_sizes(num_messages, num_processes):
+    """NUM_MESSAGES split as evenly as possible; processes left without messages are dropped."""
+    base, extra = divmod(num_messages, num_processes)
+    return [base + (1 if shard < extra else 0) for shard in range(num_processes) if base or shard < extra]
+
+def shard_overrides(num_processes, shard):
+    """Config settings for one shard: its own attempt log, and its share of an open-loop rate."""
+    overrides = {"ATTEMPT_LOGS_DIRNAME": os.path.join(config.ATTEMPT_LOGS_DIRNAME, "shards", f"{num_processes}p", f"shard_{shard}")}
+    if config.LOAD_MODEL == "open":
+        overrides.update({
+            "OPEN_LOOP_RATE_MSG_PER_SEC": config.OPEN_LOOP_RATE_MSG_PER_SEC / num_processes,
+            "OPEN_LOOP_RAMP_START_RATE_MSG_PER_SEC": config.OPEN_LOOP_RAMP_START_RATE_MSG_PER_SEC / num_processes,
+            "OPEN_LOOP_SEED": config.OPEN_LOOP_SEED + shard, # Independent arrival sequences
+        })
+    return overrides
+
+def _weighted_mean(values_and_weights):
+    pairs = [(value, weight) for value, weight in values_and_weights if value is not None and weight]
+    total_weight = sum(weight for _, weight in pairs)
+    return sum(value * weight for value, weight in pairs) / total_weight if total_weight else None
+
+def merge_shard_summaries(summaries):
+    """Combines the summaries of shards that ran side by side into one summary."""
+    workflows = [summary.get("workflow", {}) for summary in summaries]
+    weights = [workflow.get("successful_runs", 0) for workflow in workflows]
+    merged_workflow = {}
+    for key in dict.fromkeys(key for workflow in workflows for key in workflow):
+        values = [workflow.get(key) for workflow in workflows]
+        present = [value for value in values if value is not None]
+        if not present:
+            merged_workflow[key] = None
+        elif key in _SUMMED_FIELDS:
+            merged_workflow[key] = round(sum(present), 5)
+        elif isinstance(present[0], dict):
+            merged_workflow[key] = dict(sum((Counter(value) for value in present), Counter())) # e.g. negotiated_http_versions
+        elif isinstance(present[0], bool) or not isinstance(present[0], (int, float)):
+            merged_workflow[key] = present[0]
+        elif key.startswith(("avg_", "amortized_")):
+            merged_workflow[key] = round(_weighted_mean(zip(values, weights)) or 0, 6)
+        else:
+            # Per-shard percentiles that have no histogram (e.g. connection phases): the worst shard
+            merged_workflow[key] = max(present)
+
+    # Latency phases: exact means and pooled std, percentiles from the merged histograms
+    histograms = {}
+    for summary in summaries:
+        for phase, histogram_dict in (summary.get("latency_histograms") or {}).items():
+            histogram = LatencyHistogram.from_dict(histogram_dict)
+            histograms[phase] = histograms[phase].merge(histogram) if phase in histograms else histogram
+    total_successful = sum(weights)
+    for phase, histogram in histograms.items():
+        phase_summary = histogram.summary_s()
+        for label in ("p50", "p90", "p99", "p99_9", "p99_99", "max"):
+            merged_workflow[f"{label}_{phase}_s"] = phase_summary[label]
+        merged_workflow[f"p95_{phase}_s"] = round(histogram.value_at_percentile_us(95.0) / 1e6, 6)
+        mean_key, std_key = f"avg_{phase}_s", f"std_{phase}_s"
+        if std_key in merged_workflow and total_successful:
+            mean = merged_workflow[mean_key]
+            variance = sum(weight * ((workflow.get(std_key) or 0) ** 2 + ((workflow.get(mean_key) or 0) - mean) ** 2)
+                           for workflow, weight in zip(workflows, weights)) / total_successful
+            merged_workflow[std_key] = round(variance ** 0.5, 5)
+
+    # The shards started together, so the run lasted as long as the slowest one
+    duration_s = max((workflow.get("total_benchmark_duration_s") or 0 for workflow in workflows), default=0)
+    steady_duration_s = max((workflow.get("steady_state_duration_s") or 0 for workflow in workflows), default=0)
+    total_runs = merged_workflow.get("total_runs") or 0
+    new_connections = merged_workflow.get("new_connections") or 0
+    reused_connections = merged_workflow.get("reused_connections") or 0
+    merged_workflow.update({
+        "total_benchmark_duration_s": round(duration_s, 4),
+        "throughput_msg_per_sec": round(total_runs / (steady_duration_s or duration_s), 2) if (steady_duration_s or duration_s) > 0 else 0,
+        "success_rate_percent": round(total_successful / total_runs * 100, 2) if total_runs else 0,
+        "connection_reuse_percent": round(reused_connections / (new_connections + reused_connections) * 100, 2)
+                                    if new_connections + reused_connections else merged_workflow.get("connection_reuse_percent"),
+        "requests_per_connection": round((new_connections + reused_connections) / new_connections, 2) if new_connections else None,
+        "processes": len(summaries),
+    })
+
+    return {
+        "library": summaries[0].get("library"),
+        "version": summaries[0].get("version"),
+        "type": summaries[0].get("type"),
+        "run_details_file": summaries[0].get("run_details_file"),
+        "run_details_files": [summary.get("run_details_file") for summary in summaries],
+        "resource_timeline": None, # Per-process timelines can't be meaningfully overlaid
+        "time_windows": None,
+        "latency_histograms": {phase: histogram.to_dict() for phase, histogram in histograms.items()},
+        "workflow": merged_workflow,
+        "shards": [{
+            "messages": workflow.get("total_runs"),
+            "throughput_msg_per_sec": workflow.get("throughput_msg_per_sec"),
+            "total_benchmark_duration_s": workflow.get("total_benchmark_duration_s"),
+            "p99_total_processing_time_s": workflow.get("p99_total_processing_time_s"),
+            "cpu_time_percent": workflow.get("cpu_time_percent"),
+            "peak_rss_mb": workflow.get("peak_rss_mb"),
+        } for workflow in workflows],
+    }
+
+async def run_process_scaling(name, SenderClass):
+    """Runs one library at every PROCESS_SHARDS process count. Returns (library_key, summary at the largest count)."""
+    if config.MESSAGE_SOURCE == "outbox":
+        raise ValueError("MESSAGE_SOURCE=outbox can't be sharded: every shard would re-seed the library's outbox.")
+    library_key = SenderClass.__name__.replace("Sender", "").lower()
+    steps = []
+    merged_summaries = []
+    for num_processes in get_process_counts():
+        sizes = shard_sizes(config.NUM_MESSAGES, num_processes)
+        print(f"\n[{name}] {len(sizes)} worker processes, {config.NUM_MESSAGES} messages")
+        shards = [(size, ConfigOverlay(config, **shard_overrides(num_processes, shard)).as_env()) for shard, size in enumerate(sizes)]
+        shard_results = await isolated_runner.run_in_subprocesses_together(SenderClass, shards)
+        summaries = [result_data for _, result_data in shard_results if result_data]
+        if not summaries:
+            print(f"[{name}] No shard returned results at {num_processes} processes.")
+            continue
+        library_key = shard_results[0][0]
+        merged = merge_shard_summaries(summaries)
+        workflow = merged["workflow"]
+        steps.append({
+            "processes": len(sizes),
+            "throughput_msg_per_sec": workflow["throughput_msg_per_sec"],
+            "throughput_per_process_msg_per_sec": round(workflow["throughput_msg_per_sec"] / len(sizes), 2),
+            "p50_total_processing_time_s": workflow.get("p50_total_processing_time_s"),
+            "p99_total_processing_time_s": workflow.get("p99_total_processing_time_s"),
+            "success_rate_percent": workflow.get("success_rate_percent"),
+            "cpu_time_percent": workflow.get("cpu_time_percent"),
+            "peak_rss_mb": workflow.get("peak_rss_mb"),
+        })
+        merged_summaries.append(merged)
+        print(f"[{name}] {len(sizes)} processes: {workflow['throughput_msg_per_sec']} msg/s, "
+              f"p99 {workflow.get('p99_total_processing_time_s')}s")
+
+    if not merged_summaries:
+        return library_key, None
+    baseline = steps[0]
+    for step in steps:
+        # Throughput per process relative to the smallest process count; 1.0 = linear scaling
+        step["scaling_efficiency"] = round(step["throughput_per_process_msg_per_sec"] / baseline["throughput_per_process_msg_per_sec"], 3) \
+            if baseline["throughput_per_process_msg_per_sec"] else None
+
+    result_data = dict(merged_summaries[-1])
+    result_data["process_scaling"] = {
+        "baseline_processes": baseline["processes"],
+        "messages": config.NUM_MESSAGES,
+        "cpu_count": os.cpu_count(),
+        "steps": steps,
+    }
+    return library_key, result_data
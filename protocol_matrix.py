@@ -0,0 +1,65 @@
+"""HTTP/1.1 vs HTTP/2 comparison for senders that can speak both (httpx).
+
+With HTTP_PROTOCOL_MATRIX enabled, every selected sender class with `supports_http2` is
+benchmarked once per protocol mode instead of once, and each run is reported as its own entry,
+keyed "<library>[<mode>]". Everything else (message count, concurrency, load model) is the same
+across modes, so latency, throughput and the connection figures from connection_timing
+(connections opened, requests per connection) differ only by protocol.
+
+Like the saturation sweep, sender classes are reused unchanged: each mode hands them a
+ConfigOverlay (or the same settings as environment variables for subprocess runs).
+"""
+import os
+
+import config
+import isolated_runner
+from benchmark_utils import ConfigOverlay
+
+PROTOCOL_MODES = {
+    "http1": {"HTTPX_HTTP_VERSION": "1.1", "HTTPX_SYNC_HTTP_VERSION": "1.1", "HTTPX_MAX_CONNECTIONS": 0}, # One connection per in-flight request
+    "http2": {"HTTPX_HTTP_VERSION": "2", "HTTPX_SYNC_HTTP_VERSION": "2", "HTTPX_MAX_CONNECTIONS": 0}, # httpx opens more connections only as needed
+    "http2_single": {"HTTPX_HTTP_VERSION": "2", "HTTPX_SYNC_HTTP_VERSION": "2", "HTTPX_MAX_CONNECTIONS": 1}, # Every request multiplexed over one connection
+}
+
+def get_protocol_modes():
+    """Configured HTTP_PROTOCOL_MODES, or all PROTOCOL_MODES."""
+    modes = config.HTTP_PROTOCOL_MODES or list(PROTOCOL_MODES)
+    unknown = [mode for mode in modes if mode not in PROTOCOL_MODES]
+    if unknown:
+        raise ValueError(f"Unknown HTTP_PROTOCOL_MODES: {unknown} (choose from {list(PROTOCOL_MODES)})")
+    return modes
+
+def mode_overrides(mode):
+    """Config settings for one protocol mode."""
+    return {
+        **PROTOCOL_MODES[mode],
+        "ATTEMPT_LOGS_DIRNAME": os.path.join(config.ATTEMPT_LOGS_DIRNAME, "protocol", mode),
+    }
+
+async def _run_mode_in_process(SenderClass, mode_config, num_messages):
+    sender_instance = SenderClass(
+        config.TELEGRAM_BOT_TOKEN,
+        config.TELEGRAM_CHAT_ID,
+        config.TELEGRAM_API_URL_TEMPLATE,
+        mode_config
+    )
+    if sender_instance.get_sender_type() == "async":
+        return await sender_instance.run_benchmark_async(num_messages)
+    return sender_instance.run_benchmark(num_messages)
+
+async def run_protocol_matrix(name, SenderClass):
+    """Benchmarks one library in every protocol mode. Returns [(library_key, summary or None), ...]."""
+    library_key = SenderClass.__name__.replace("Sender", "").lower()
+    results = []
+    for mode in get_protocol_modes():
+        print(f"\n[{name}] Protocol mode: {mode}")
+        mode_config = ConfigOverlay(config, **mode_overrides(mode))
+        if config.ISOLATE_LIBRARIES_IN_SUBPROCESS:
+            library_key, result_data = await isolated_runner.run_in_subprocess(SenderClass, config.NUM_MESSAGES, mode_config.as_env())
+        else:
+            result_data = await _run_mode_in_process(SenderClass, mode_config, config.NUM_MESSAGES)
+        if result_data:
+            result_data = dict(result_data)
+            result_data["protocol_mode"] = mode
+        results.append((f"{library_key}[{mode}]", result_data))
+    return results
@@ -1,6 +1,5 @@
 import os
 import datetime
-from .plot_generator import generate_plots # Import the new plot generator
 import config # To get REPORTS_DIR for plot paths if needed, or pass output_dir
 from datetime import timezone, timedelta
 
@@ -15,6 +14,7 @@ def generate_report(report_data, output_dir, filename):
     # generate_plots expects the full report_data to extract library details and benchmark_details
     # It will save plots into the same output_dir
     # The paths returned by generate_plots are relative to output_dir (basenames)
+    from .plot_generator import generate_plots # Imported here so matplotlib only loads once there is a report to plot
     plot_filenames = generate_plots(report_data, output_dir)
 
     # Extract necessary data for MD generation
@@ -42,6 +42,35 @@ def generate_report(report_data, output_dir, filename):
         
     md_content.append(f"- **Date:** {formatted_time}")
     md_content.append(f"- **Number of Messages per Library:** {details.get('parameters', {}).get('num_messages_per_library', 'N/A')}")
+    md_content.append(f"- **Telegram API Endpoint:** {details.get('parameters', {}).get('telegram_api_url', 'N/A')}")
+    if details.get('parameters', {}).get('mock_telegram_server'):
+        mock_params = details['parameters']['mock_telegram_server']
+        md_content.append(f"- **Mock Server:** local stand-in, {mock_params.get('latency_distribution')} latency "
+                          f"(mean {mock_params.get('latency_mean_ms')} ms, std {mock_params.get('latency_stddev_ms')} ms), "
+                          f"5xx rate {mock_params.get('error_rate')}, 429 rate {mock_params.get('rate_limit_rate')}")
+    open_loop_params = details.get('parameters', {}).get('open_loop')
+    if open_loop_params:
+        md_content.append(f"- **Load Model:** open loop, {open_loop_params.get('arrival')} arrivals at "
+                          f"{open_loop_params.get('rate_msg_per_sec')} msg/s (latency measured from intended send time)")
+    else:
+        md_content.append("- **Load Model:** closed loop (each worker sends its next message when the previous one completes)")
+    if details.get('parameters', {}).get('message_source') == "prefetch":
+        amortized = ", ".join(f"{lib_name} {lib_data.get('workflow', {}).get('amortized_db_fetch_time_per_message_ms', 0):.3f} ms"
+                              for lib_name, lib_data in libraries.items())
+        md_content.append(f"- **Message Source:** batched prefetch ({details['parameters'].get('prefetch_batch_size')} rows per fetch); "
+                          f"amortized DB fetch cost per message: {amortized}")
+        if not details['parameters'].get('dataset'):
+            md_content.append("  - Only the seed rows were loaded (no `DATASET_ROWS`), so every fetch returned a single row and nothing was batched")
+    if details.get('parameters', {}).get('message_source') == "outbox":
+        amortized = ", ".join(f"{lib_name} {lib_data.get('workflow', {}).get('amortized_db_time_per_message_ms', 0):.3f} ms"
+                              for lib_name, lib_data in libraries.items())
+        md_content.append(f"- **Message Source:** outbox drain (claim {details['parameters'].get('outbox_claim_batch_size')} rows with "
+                          f"FOR UPDATE SKIP LOCKED, bulk UPDATE as sent); amortized claim + write cost per message: {amortized}")
+    dataset = details.get('parameters', {}).get('dataset')
+    if dataset:
+        md_content.append(f"- **Dataset:** {dataset.get('rows'):,} generated messages ({dataset.get('payload_mb')} MB, "
+                          f"{dataset.get('text_mix')} text, {dataset.get('length_distribution')} lengths), loaded via "
+                          f"{dataset.get('loader')} in {dataset.get('total_time_s')}s ({dataset.get('rows_per_sec'):,} rows/s)")
     lib_names_str = ", ".join(libraries.keys())
     md_content.append(f"- **Libraries Tested:** {lib_names_str if lib_names_str else 'None'}")
     md_content.append(f"- **Python Version:** {details.get('python_version', 'N/A')}")
@@ -66,6 +95,16 @@ def generate_report(report_data, output_dir, filename):
     # --- Summary of Best Performers with bullets instead of nested headings ---
     md_content.append("## Summary of Best Performers")
     
+    # With repeated trials: whether a "best" holds up against the trial-to-trial noise
+    def tie_note(ranking_key):
+        ranking_significance = summary_overall.get("ranking_significance", {}).get(ranking_key)
+        if not ranking_significance:
+            return ""
+        if not ranking_significance["tied_with_leader"]:
+            return " - significant over every other library"
+        tied = ", ".join(ranking_significance["tied_with_leader"]).replace("ptb", "python-telegram-bot")
+        return f" - statistically tied with {tied}"
+
     # Performance metrics summary - no level 3 heading, just bold text
     md_content.append("**Performance Metrics:**")
     
@@ -85,12 +124,14 @@ def generate_report(report_data, output_dir, filename):
     # Total Processing Time
     fastest_lib = summary_overall.get('fastest_avg_total_processing_time_library', 'N/A')
     fastest_lib = fastest_lib.replace("ptb", "python-telegram-bot")
-    md_content.append(f"- **Total Processing Time:** {summary_overall.get('fastest_avg_total_processing_time_s', 0):.4f}s ({fastest_lib})")
+    md_content.append(f"- **Total Processing Time:** {summary_overall.get('fastest_avg_total_processing_time_s', 0):.4f}s ({fastest_lib})"
+                      + tie_note("avg_total_processing_time_s"))
     
     # Throughput
     highest_throughput_lib = summary_overall.get('highest_throughput_library', 'N/A')
     highest_throughput_lib = highest_throughput_lib.replace("ptb", "python-telegram-bot")
-    md_content.append(f"- **Throughput:** {summary_overall.get('highest_throughput_msg_per_sec', 0):.2f} msg/s ({highest_throughput_lib})")
+    md_content.append(f"- **Throughput:** {summary_overall.get('highest_throughput_msg_per_sec', 0):.2f} msg/s ({highest_throughput_lib})"
+                      + tie_note("throughput_msg_per_sec"))
     
     # HTTP Send Time
     fastest_http_lib = summary_overall.get('fastest_avg_http_send_time_library', 'N/A')
@@ -148,6 +189,7 @@ def generate_report(report_data, output_dir, filename):
         "Std Dev Total (s)",
         "CPU Usage (%)",
         "Memory (MB)",
+        "Peak RSS (MB)",
         "Avg HTTP Time (s)",
         "Avg DB Read (s)",
         "Avg Response Size (B)"
@@ -170,6 +212,7 @@ def generate_report(report_data, output_dir, filename):
             f"{workflow.get('std_total_processing_time_s', 0):.4f}",
             f"{workflow.get('cpu_time_percent', 0):.2f}",
             f"{workflow.get('memory_increase_mb', 0):.2f}",
+            f"{workflow.get('peak_rss_mb') or 0:.2f}",
             f"{workflow.get('avg_http_send_time_s', 0):.4f}",
             f"{workflow.get('avg_db_read_time_s', 0):.5f}",
             f"{workflow.get('avg_response_size_bytes', 0):.1f}"
@@ -178,6 +221,223 @@ def generate_report(report_data, output_dir, filename):
     
     md_content.append("\n---\n")
 
+    # --- Tail Latency Table (from the HDR-style histograms) ---
+    md_content.append("## Tail Latency")
+    md_content.append("Total processing time (DB + HTTP) percentiles from each library's latency histogram:")
+    spectrum_labels = [("p50", "p50"), ("p90", "p90"), ("p99", "p99"), ("p99_9", "p99.9"), ("p99_99", "p99.99"), ("max", "Max")]
+    md_content.append("\n| Library | " + " | ".join(f"{title} (s)" for _, title in spectrum_labels) + " | p99 Queue Delay (s) | p99 Pool Acquire (s) |")
+    md_content.append("| " + " | ".join(["---"] * (len(spectrum_labels) + 3)) + " |")
+    for lib_name, lib_data in libraries.items():
+        display_lib_name = lib_name.replace("ptb", "python-telegram-bot")
+        workflow = lib_data.get("workflow", {})
+        row = [display_lib_name]
+        for label, _ in spectrum_labels:
+            key = "p99_total_processing_time_s" if label == "p99" else f"{label}_total_processing_time_s"
+            row.append(f"{workflow.get(key) or 0:.4f}")
+        row.append(f"{workflow.get('p99_queue_delay_s') or 0:.4f}") # Non-zero only under open-loop load
+        row.append(f"{workflow.get('p99_pool_acquire_wait_s') or 0:.4f}") # Non-zero once requests outnumber pooled connections
+        md_content.append("| " + " | ".join(row) + " |")
+    md_content.append("\n---\n")
+
+    # --- Cold Start vs Steady State (runs with a warm-up) ---
+    warmup = details.get('parameters', {}).get('warmup')
+    if warmup:
+        md_content.append("## Cold Start vs Steady State")
+        md_content.append(f"The first {warmup.get('messages')} messages and anything started in the first {warmup.get('seconds')}s of each run "
+                          "were warm-up: executed, but excluded from every other table. Steady-state throughput counts only the time after "
+                          "the warm-up.")
+        md_content.append("\n| Library | First Message (s) | Warm-up Messages | Warm-up Avg (s) | Warm-up p99 (s) | Steady Avg (s) | Steady p99 (s) | Steady Throughput (msg/s) |")
+        md_content.append("| " + " | ".join(["---"] * 8) + " |")
+        for lib_name, lib_data in libraries.items():
+            display_lib_name = lib_name.replace("ptb", "python-telegram-bot")
+            workflow = lib_data.get("workflow", {})
+            def format_seconds(value):
+                return f"{value:.4f}" if value is not None else "-"
+            row = [
+                display_lib_name,
+                format_seconds(workflow.get('first_attempt_total_time_s')),
+                str(workflow.get('warmup_attempts') or 0),
+                format_seconds(workflow.get('warmup_avg_total_processing_time_s')),
+                format_seconds(workflow.get('warmup_p99_total_processing_time_s')),
+                format_seconds(workflow.get('avg_total_processing_time_s')),
+                format_seconds(workflow.get('p99_total_processing_time_s')),
+                f"{workflow.get('throughput_msg_per_sec', 0):.2f}",
+            ]
+            md_content.append("| " + " | ".join(row) + " |")
+        md_content.append("\n---\n")
+
+    # --- Repeated Trials: confidence intervals and ranking significance ---
+    trials_parameters = details.get('parameters', {}).get('trials')
+    if trials_parameters:
+        md_content.append("## Repeated Trials")
+        md_content.append(f"Every library was run {trials_parameters.get('count')} times, the library order rotated each trial. "
+                          "Figures are the mean over trials with a bootstrap 95% confidence interval.")
+        trial_columns = [("throughput_msg_per_sec", "Throughput (msg/s)", ".2f"), ("avg_total_processing_time_s", "Avg Total Time (s)", ".4f"),
+                         ("cpu_time_percent", "CPU (%)", ".2f"), ("peak_rss_mb", "Peak RSS (MB)", ".1f")]
+        md_content.append("\n| Library | Trials | " + " | ".join(title for _, title, _ in trial_columns) + " |")
+        md_content.append("| " + " | ".join(["---"] * (len(trial_columns) + 2)) + " |")
+        for lib_name, lib_data in libraries.items():
+            trial_metrics = (lib_data.get("trials") or {}).get("metrics", {})
+            row = [lib_name.replace("ptb", "python-telegram-bot"), str((lib_data.get("trials") or {}).get("count", 1))]
+            for metric, _, spec in trial_columns:
+                stats = trial_metrics.get(metric)
+                if not stats:
+                    row.append("-")
+                elif stats.get("ci95_low") is None:
+                    row.append(f"{stats['mean']:{spec}}")
+                else:
+                    row.append(f"{stats['mean']:{spec}} [{stats['ci95_low']:{spec}}, {stats['ci95_high']:{spec}}]")
+            md_content.append("| " + " | ".join(row) + " |")
+
+        significance = summary_overall.get("ranking_significance", {})
+        if significance:
+            md_content.append(f"\nEvery pair in the throughput and total-time rankings, tested with a two-sided Mann-Whitney U test over "
+                              f"the per-trial values (significant at p < {trials_parameters.get('significance_alpha')}). "
+                              "Pairs that are not significant are ties: the run-to-run noise is as large as the difference.")
+            md_content.append("\n| Ranking | Better | Worse | Difference (%) | 95% CI of Difference (%) | p-value | Significant |")
+            md_content.append("| " + " | ".join(["---"] * 7) + " |")
+            for ranking_key, title in (("throughput_msg_per_sec", "Throughput"), ("avg_total_processing_time_s", "Avg Total Time")):
+                for pair in significance.get(ranking_key, {}).get("pairs", []):
+                    difference = f"{pair['difference_percent']:+.2f}" if pair.get("difference_percent") is not None else "-"
+                    ci_percent = pair.get("ci95_difference_percent")
+                    ci = f"[{ci_percent[0]:+.2f}, {ci_percent[1]:+.2f}]" if ci_percent else "-"
+                    md_content.append(f"| {title} | {pair['better'].replace('ptb', 'python-telegram-bot')} | "
+                                      f"{pair['worse'].replace('ptb', 'python-telegram-bot')} | {difference} | "
+                                      f"{ci} | {pair['p_value']:.4f} | {'yes' if pair['significant'] else 'no (tie)'} |")
+        md_content.append("\n---\n")
+
+    # --- Connection Phases Table (libraries with connection_timing hooks) ---
+    phase_columns = [("dns", "DNS"), ("connect", "Connect"), ("tls", "TLS"), ("request_write", "Request Write"),
+                     ("ttfb", "TTFB"), ("body_read", "Body Read")]
+    traced_libraries = {lib_name: lib_data.get("workflow", {}) for lib_name, lib_data in libraries.items()
+                        if lib_data.get("workflow", {}).get("connection_reuse_percent") is not None}
+    if traced_libraries:
+        md_content.append("## Connection Phases")
+        md_content.append("Average time per request phase (ms). DNS, connect and TLS are averaged over requests that opened a new "
+                          "connection; \"-\" means the library doesn't expose that phase.")
+        md_content.append("\n| Library | Reused Connections (%) | New Connections | " + " | ".join(title for _, title in phase_columns) + " |")
+        md_content.append("| " + " | ".join(["---"] * (len(phase_columns) + 3)) + " |")
+        for lib_name, workflow in traced_libraries.items():
+            display_lib_name = lib_name.replace("ptb", "python-telegram-bot")
+            row = [display_lib_name, f"{workflow['connection_reuse_percent']:.1f}", str(workflow.get("new_connections", 0))]
+            for phase, _ in phase_columns:
+                value = workflow.get(f"avg_{phase}_s")
+                row.append(f"{value * 1000:.2f}" if value is not None else "-")
+            md_content.append("| " + " | ".join(row) + " |")
+        md_content.append("\n---\n")
+
+    # --- HTTP Protocol Comparison (protocol_matrix runs) ---
+    protocol_runs = {lib_name: lib_data for lib_name, lib_data in libraries.items() if lib_data.get("protocol_mode")}
+    if protocol_runs:
+        md_content.append("## HTTP Protocol Comparison")
+        md_content.append("The same library run once per protocol mode, with everything else unchanged. "
+                          "Requests per connection is the number of requests (HTTP/2: streams) carried by each opened connection.")
+        md_content.append("\n| Run | Negotiated | Max Connections | Connections Opened | Requests / Connection | Throughput (msg/s) | p50 (s) | p99 (s) |")
+        md_content.append("| --- | --- | --- | --- | --- | --- | --- | --- |")
+        for lib_name, lib_data in protocol_runs.items():
+            workflow = lib_data.get("workflow", {})
+            negotiated = ", ".join(f"{version} ×{count}" for version, count in (workflow.get("negotiated_http_versions") or {}).items()) or "-"
+            requests_per_connection = workflow.get("requests_per_connection")
+            md_content.append(f"| {lib_name} | {negotiated} | {workflow.get('http_max_connections', '-')} | {workflow.get('new_connections', '-')} | "
+                              f"{requests_per_connection if requests_per_connection is not None else '-'} | "
+                              f"{workflow.get('throughput_msg_per_sec', 0):.2f} | {workflow.get('p50_total_processing_time_s') or 0:.4f} | "
+                              f"{workflow.get('p99_total_processing_time_s') or 0:.4f} |")
+        md_content.append("\n---\n")
+
+    # --- Event Loop Comparison (event_loop_matrix runs) ---
+    loop_runs = {lib_name: lib_data for lib_name, lib_data in libraries.items() if lib_data.get("event_loop_backend")}
+    if loop_runs:
+        def format_delta(value):
+            return f"{value:+.1f}%" if value is not None else "-"
+        md_content.append("## Event Loop Backends")
+        md_content.append("Each async library run once per event-loop backend, in a fresh process, with everything else unchanged. "
+                          "Changes are relative to the first backend run for the same library.")
+        md_content.append("\n| Run | Loop | Throughput (msg/s) | Δ Throughput | CPU (%) | Δ CPU | p99 (s) | Δ p99 |")
+        md_content.append("| --- | --- | --- | --- | --- | --- | --- | --- |")
+        for lib_name, lib_data in loop_runs.items():
+            workflow = lib_data.get("workflow", {})
+            delta = lib_data.get("event_loop_delta_percent") or {}
+            md_content.append(f"| {lib_name.replace('ptb', 'python-telegram-bot')} | {lib_data['event_loop_backend']} | "
+                              f"{workflow.get('throughput_msg_per_sec', 0):.2f} | {format_delta(delta.get('throughput_msg_per_sec'))} | "
+                              f"{workflow.get('cpu_time_percent') or 0:.1f} | {format_delta(delta.get('cpu_time_percent'))} | "
+                              f"{workflow.get('p99_total_processing_time_s') or 0:.4f} | {format_delta(delta.get('p99_total_processing_time_s'))} |")
+        md_content.append("\n---\n")
+
+    # --- Import / Startup Cost Table ---
+    import_costs = {lib_name: lib_data["import_cost"] for lib_name, lib_data in libraries.items() if lib_data.get("import_cost")}
+    if import_costs:
+        base_import_time_s = next(iter(import_costs.values())).get("base_import_time_s")
+        md_content.append("## Import / Startup Cost")
+        md_content.append("Cold import of each sender module in a fresh interpreter, on top of the shared sender base "
+                          f"(config, NumPy, psutil, DB drivers: {base_import_time_s}s). This is what choosing the library adds to a "
+                          "process's start-up, e.g. a serverless cold start.")
+        md_content.append("\n| Library | Import Time (s) | Import Memory (MB) | Modules Imported |")
+        md_content.append("| --- | --- | --- | --- |")
+        for lib_name, import_cost in import_costs.items():
+            display_lib_name = lib_name.replace("ptb", "python-telegram-bot")
+            md_content.append(f"| {display_lib_name} | {import_cost['import_time_s']:.4f} | {import_cost['import_memory_mb']:.2f} | "
+                              f"{import_cost['modules_imported']} |")
+        md_content.append("\n---\n")
+
+    # --- Saturation Sweep Table ---
+    swept_libraries = {lib_name: lib_data["saturation_sweep"] for lib_name, lib_data in libraries.items() if lib_data.get("saturation_sweep")}
+    if swept_libraries:
+        first_sweep = next(iter(swept_libraries.values()))
+        dimension = first_sweep.get("dimension", "concurrency")
+        slo = first_sweep.get("slo", {})
+        md_content.append("## Saturation Sweep")
+        md_content.append(f"Each library was re-run at increasing {dimension} levels ({first_sweep.get('messages_per_step')} messages per step) "
+                          f"until p99 total time exceeded {slo.get('p99_total_processing_time_s')}s or the error rate exceeded "
+                          f"{slo.get('max_error_rate', 0):.2%}. The saturation point is the last level that met the SLO; "
+                          "the other tables in this report use that step's results.")
+        md_content.append(f"\n| Library | Max Sustainable {dimension.title()} | Throughput (msg/s) | p99 at Saturation (s) | Stopped Because |")
+        md_content.append("| --- | --- | --- | --- | --- |")
+        for lib_name, sweep in swept_libraries.items():
+            display_lib_name = lib_name.replace("ptb", "python-telegram-bot")
+            point = sweep.get("saturation_point")
+            if point:
+                md_content.append(f"| {display_lib_name} | {point['level']:g} | {point.get('throughput_msg_per_sec') or 0:.2f} | "
+                                  f"{point.get('p99_total_processing_time_s') or 0:.4f} | {sweep.get('stopped_reason')} |")
+            else:
+                md_content.append(f"| {display_lib_name} | none | - | - | {sweep.get('stopped_reason')} |")
+        md_content.append("\n---\n")
+
+    # --- Multi-Process Scaling Table ---
+    scaled_libraries = {lib_name: lib_data["process_scaling"] for lib_name, lib_data in libraries.items() if lib_data.get("process_scaling")}
+    if scaled_libraries:
+        first_scaling = next(iter(scaled_libraries.values()))
+        md_content.append("## Multi-Process Scaling")
+        md_content.append(f"{first_scaling.get('messages')} messages split across N worker processes running side by side "
+                          f"({first_scaling.get('cpu_count')} CPUs), each with its own event loop or thread pool and DB pool. "
+                          f"Efficiency is throughput per process relative to the {first_scaling.get('baseline_processes')}-process run "
+                          "(1.0 = linear scaling). The other tables use the largest process count.")
+        md_content.append("\n| Library | Processes | Throughput (msg/s) | Per Process (msg/s) | Efficiency | p50 (s) | p99 (s) | CPU (%) |")
+        md_content.append("| --- | --- | --- | --- | --- | --- | --- | --- |")
+        for lib_name, scaling in scaled_libraries.items():
+            display_lib_name = lib_name.replace("ptb", "python-telegram-bot")
+            for step in scaling.get("steps", []):
+                efficiency = step.get("scaling_efficiency")
+                md_content.append(f"| {display_lib_name} | {step['processes']} | {step['throughput_msg_per_sec']:.2f} | "
+                                  f"{step['throughput_per_process_msg_per_sec']:.2f} | {f'{efficiency:.2f}' if efficiency is not None else '-'} | "
+                                  f"{step.get('p50_total_processing_time_s') or 0:.4f} | {step.get('p99_total_processing_time_s') or 0:.4f} | "
+                                  f"{step.get('cpu_time_percent') or 0:.1f} |")
+        md_content.append("\n---\n")
+
+    # --- Database Query Plans ---
+    query_plans = details.get("query_plans")
+    if query_plans:
+        md_content.append("## Database Query Plans")
+        md_content.append(f"`EXPLAIN (ANALYZE, BUFFERS)` of the hot queries for `{query_plans.get('library')}`, captured after setup "
+                          f"(table: ~{query_plans.get('table_rows_estimate', 0):,} rows, {query_plans.get('table_size_mb')} MB).")
+        for name, plan in query_plans.get("queries", {}).items():
+            md_content.append(f"\n### {name.replace('_', ' ').title()}")
+            md_content.append(f"`{plan.get('query')}` - {plan.get('execution_time_ms')} ms, "
+                              f"{'index' if plan.get('uses_index') else 'no index'}")
+            md_content.append("```text")
+            md_content.extend(plan.get("plan", []))
+            md_content.append("```")
+        md_content.append("\n---\n")
+
     # --- Visualizations: Reordered with Performance and Resource Usage as main sections ---
     
     # Helper function to add section with plot
@@ -207,6 +467,12 @@ def generate_report(report_data, output_dir, filename):
     add_plot_section("std_total_processing_time_s", "Processing Time Consistency", 
                      "Standard deviation of total processing time. Lower indicates more predictable performance.")
     
+    add_plot_section("saturation_curve", "Saturation Curve",
+                     "Achieved throughput against p99 latency for every sweep step. The curve's knee is where a library stops scaling.")
+    
+    add_plot_section("latency_percentiles", "Latency by Percentile",
+                     "Total processing time across the percentile spectrum, out to p99.99. Flat curves mean predictable tails.")
+    
     # HTTP metrics
     add_plot_section("avg_http_send_time_s", "HTTP Send Time",
                      "Average time for the Telegram API request only. Lower is better.")
@@ -221,6 +487,12 @@ def generate_report(report_data, output_dir, filename):
     add_plot_section("avg_response_size_bytes", "Response Size",
                      "Average size of the response from Telegram API. Smaller indicates less overhead.")
     
+    # Throughput and latency per time window: warm-up and drift over the run
+    add_plot_section("time_windows_throughput", "Throughput Over Time",
+                     f"Messages completed per second in consecutive {details.get('parameters', {}).get('time_window_s')}s windows, warm-up included.")
+    add_plot_section("time_windows_p99", "p99 Latency Over Time",
+                     "p99 total processing time of the messages completed in each window. A falling start is the warm-up; a rising end is drift.")
+    
     # Resource Usage section with CPU first
     md_content.append("## Resource Usage")
     
@@ -231,6 +503,14 @@ def generate_report(report_data, output_dir, filename):
     # Memory Usage
     add_plot_section("memory_increase_mb", "Memory Usage",
                      "Increase in Python process RAM from start to end of the benchmark. Lower is better.")
+    add_plot_section("peak_rss_mb", "Peak Memory",
+                     "Highest RSS sampled while the benchmark was running, including transient bursts. Lower is better.")
+    add_plot_section("timeline_rss_mb", "Memory Over Time",
+                     "RSS sampled in the background during each library's run.")
+    add_plot_section("timeline_cpu_percent", "CPU Over Time",
+                     "Process CPU percentage between consecutive samples.")
+    add_plot_section("timeline_sockets", "Open Sockets Over Time",
+                     "Number of open inet sockets, showing connection pool growth and reuse.")
     
     md_content.append("\n---\n")
     
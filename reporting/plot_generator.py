@@ -3,6 +3,7 @@ import matplotlib
 matplotlib.use('Agg') # Use a non-interactive backend for environments without a display
 import matplotlib.pyplot as plt
 import numpy as np
+from latency_histogram import LatencyHistogram
 
 # Project specific imports - for accessing config like REPORTS_DIR if needed directly
 # import config # Not strictly needed if output_dir is always passed
@@ -115,6 +116,7 @@ def generate_plots(report_data, output_dir):
     resource_metrics_to_plot = [
         ("memory_increase_mb", "Memory Usage", "Memory Increase (MB)", "plot_memory_increase.png", ".2f", " MB"),
         ("cpu_time_percent", "CPU Usage", "CPU Usage (%)", "plot_cpu_usage.png", ".2f", "%"),
+        ("peak_rss_mb", "Peak Memory (RSS)", "Peak RSS (MB)", "plot_peak_rss.png", ".2f", " MB"),
     ]
 
     for metric_key, base_title, ylabel, filename, fmt_spec, unit in resource_metrics_to_plot:
@@ -135,6 +137,120 @@ def generate_plots(report_data, output_dir):
         # else:
         #     print(f"Skipping {filename}: No non-zero data for {metric_key}.")
 
+    # --- Resource Timeline Plots (sampled during each run) ---
+    timeline_series_to_plot = [
+        ("rss_mb", "RSS Over Time", "RSS (MB)", "plot_rss_timeline.png"),
+        ("cpu_percent", "CPU Usage Over Time", "CPU (%)", "plot_cpu_timeline.png"),
+        ("sockets", "Open Sockets Over Time", "Sockets", "plot_sockets_timeline.png"),
+    ]
+
+    for series_key, title, ylabel, filename in timeline_series_to_plot:
+        timelines = {lib_name: libraries_data.get(lib_name, {}).get('resource_timeline') or {} for lib_name in library_names}
+        timelines = {lib_name: tl for lib_name, tl in timelines.items() if tl.get('t_s') and tl.get(series_key)}
+        if timelines:
+            fig, ax = plt.subplots(figsize=(12, 6))
+            for lib_name, tl in timelines.items():
+                ax.plot(tl['t_s'], tl[series_key], label=lib_name, linewidth=1.2)
+            ax.set_xlabel('Time since start of run (s)')
+            ax.set_ylabel(ylabel)
+            ax.set_title(title)
+            ax.legend()
+            ax.grid(True, alpha=0.3)
+            fig.tight_layout()
+            path = os.path.join(output_dir, filename)
+            plt.savefig(path)
+            plot_paths[f"timeline_{series_key}"] = os.path.basename(path)
+            plt.close(fig)
+            print(f"Generated plot: {path}")
+        else:
+            print(f"Skipping {filename}: No sampled timeline data.")
+
+    # --- Per-window throughput and latency (warm-up and drift) ---
+    window_series_to_plot = [
+        ("throughput_msg_per_sec", "Throughput Over Time", "Throughput (msg/s)", "plot_throughput_timeline.png", "time_windows_throughput"),
+        ("p99_total_processing_time_s", "p99 Total Processing Time Over Time", "p99 Total Time (s)", "plot_p99_timeline.png", "time_windows_p99"),
+    ]
+
+    for series_key, title, ylabel, filename, plot_key in window_series_to_plot:
+        windows_by_lib = {lib_name: libraries_data.get(lib_name, {}).get('time_windows') or [] for lib_name in library_names}
+        windows_by_lib = {lib_name: windows for lib_name, windows in windows_by_lib.items() if len(windows) > 1}
+        if windows_by_lib:
+            fig, ax = plt.subplots(figsize=(12, 6))
+            for lib_name, windows in windows_by_lib.items():
+                points = [(window['t_s'], window[series_key]) for window in windows if window.get(series_key) is not None]
+                ax.plot([t for t, _ in points], [value for _, value in points], label=lib_name, linewidth=1.2, marker='.')
+                warmup_end = max((window['t_s'] for window in windows if window.get('warmup')), default=None)
+                if warmup_end is not None:
+                    ax.axvline(warmup_end, color=ax.lines[-1].get_color(), linestyle=':', alpha=0.6)
+            ax.set_xlabel('Time since start of run (s)')
+            ax.set_ylabel(ylabel)
+            ax.set_title(title + " (dotted: last window with warm-up messages)")
+            ax.legend()
+            ax.grid(True, alpha=0.3)
+            fig.tight_layout()
+            path = os.path.join(output_dir, filename)
+            plt.savefig(path)
+            plot_paths[plot_key] = os.path.basename(path)
+            plt.close(fig)
+            print(f"Generated plot: {path}")
+        else:
+            print(f"Skipping {filename}: No per-window data.")
+
+    # --- Latency Percentile Spectrum (HDR-style, from the serialized histograms) ---
+    spectrum_percentiles = [50, 75, 90, 95, 99, 99.5, 99.9, 99.95, 99.99]
+    histograms = {lib_name: (libraries_data.get(lib_name, {}).get('latency_histograms') or {}).get('total_processing_time') for lib_name in library_names}
+    histograms = {lib_name: LatencyHistogram.from_dict(h) for lib_name, h in histograms.items() if h and h.get('total_count')}
+    if histograms:
+        fig, ax = plt.subplots(figsize=(12, 6))
+        x_positions = [1 / (1 - q / 100) for q in spectrum_percentiles] # Spreads out the tail
+        for lib_name, histogram in histograms.items():
+            values_s = [histogram.value_at_percentile_us(q) / 1e6 for q in spectrum_percentiles]
+            ax.plot(x_positions, values_s, marker='o', markersize=3, label=lib_name)
+        ax.set_xscale('log')
+        ax.set_xticks(x_positions)
+        ax.set_xticklabels([f"p{q:g}" for q in spectrum_percentiles])
+        ax.set_ylabel('Total Processing Time (seconds)')
+        ax.set_title('Latency by Percentile (Lower is Better)')
+        ax.legend()
+        ax.grid(True, alpha=0.3)
+        fig.tight_layout()
+        path = os.path.join(output_dir, 'plot_latency_percentiles.png')
+        plt.savefig(path)
+        plot_paths['latency_percentiles'] = os.path.basename(path)
+        plt.close(fig)
+        print(f"Generated plot: {path}")
+    else:
+        print("Skipping plot_latency_percentiles.png: No latency histograms.")
+
+    # --- Saturation Sweep: throughput vs p99 latency, one point per sweep step ---
+    sweeps = {lib_name: libraries_data.get(lib_name, {}).get('saturation_sweep') for lib_name in library_names}
+    sweeps = {lib_name: sweep for lib_name, sweep in sweeps.items() if sweep and sweep.get('steps')}
+    if sweeps:
+        fig, ax = plt.subplots(figsize=(12, 6))
+        for lib_name, sweep in sweeps.items():
+            steps = [step for step in sweep['steps'] if step.get('throughput_msg_per_sec') is not None]
+            line, = ax.plot([step['throughput_msg_per_sec'] for step in steps],
+                            [step['p99_total_processing_time_s'] or 0 for step in steps],
+                            marker='o', markersize=4, label=lib_name)
+            if sweep.get('saturation_point'):
+                point = sweep['saturation_point']
+                ax.scatter([point['throughput_msg_per_sec']], [point['p99_total_processing_time_s']], s=120,
+                           facecolors='none', edgecolors=line.get_color(), linewidths=2)
+        slo_p99 = next(iter(sweeps.values()))['slo']['p99_total_processing_time_s']
+        ax.axhline(slo_p99, color='red', linestyle='--', linewidth=1, label=f'p99 SLO ({slo_p99}s)')
+        ax.set_yscale('log')
+        ax.set_xlabel('Achieved Throughput (messages/sec)')
+        ax.set_ylabel('P99 Total Processing Time (seconds)')
+        ax.set_title('Throughput vs P99 Latency per Sweep Step (circled: saturation point)')
+        ax.legend()
+        ax.grid(True, alpha=0.3)
+        fig.tight_layout()
+        path = os.path.join(output_dir, 'plot_saturation_curve.png')
+        plt.savefig(path)
+        plot_paths['saturation_curve'] = os.path.basename(path)
+        plt.close(fig)
+        print(f"Generated plot: {path}")
+
     # --- Response Size Plot ---
     avg_response_sizes = [float(libraries_data.get(lib_name, {}).get('workflow', {}).get('avg_response_size_bytes', 0) or 0) for lib_name in library_names]
     if any(s > 0 for s in avg_response_sizes):
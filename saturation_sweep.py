@@ -0,0 +1,130 @@
+"""Saturation sweep: finds the highest load level each library sustains within an SLO.
+
+For every selected sender class the same benchmark is repeated at increasing levels of
+either concurrency (in-flight requests / worker threads) or open-loop offered rate. The sweep
+stops at the first level whose error rate or p99 total processing time breaks the SLO; the
+last level that met it is the saturation point. Every step is kept, so the report can show the
+full throughput-vs-latency curve.
+
+Sender classes are reused unchanged: each step hands them a ConfigOverlay with the level's
+settings (or the same settings as environment variables when libraries run in subprocesses).
+"""
+import os
+
+import config
+import isolated_runner
+from benchmark_utils import ConfigOverlay
+from database_utils import async_pool_size, close_async_pool, close_sync_pool, create_async_pool
+
+DEFAULT_SWEEP_LEVELS = {
+    "concurrency": [1, 2, 4, 8, 16, 32, 64, 128, 256],
+    "rate": [10, 25, 50, 100, 200, 400, 800, 1600],
+}
+
+def get_sweep_levels():
+    """Configured SWEEP_LEVELS (ascending), or the defaults for SWEEP_DIMENSION."""
+    if config.SWEEP_DIMENSION not in DEFAULT_SWEEP_LEVELS:
+        raise ValueError(f"Unknown SWEEP_DIMENSION: {config.SWEEP_DIMENSION}")
+    levels = sorted(config.SWEEP_LEVELS) if config.SWEEP_LEVELS else DEFAULT_SWEEP_LEVELS[config.SWEEP_DIMENSION]
+    if config.SWEEP_DIMENSION == "concurrency":
+        levels = [max(1, int(level)) for level in levels]
+    return levels
+
+def step_overrides(level):
+    """Config settings for one sweep step."""
+    overrides = {"ATTEMPT_LOGS_DIRNAME": os.path.join(config.ATTEMPT_LOGS_DIRNAME, "sweep", f"{config.SWEEP_DIMENSION}_{level:g}")}
+    if config.SWEEP_DIMENSION == "concurrency":
+        # Threaded sync runs, so requests/urllib3 get the same number of requests in flight as async libraries
+        overrides.update({
+            "MAX_CONCURRENT_REQUESTS_PER_LIBRARY": level,
+            "SYNC_THREAD_WORKERS": level,
+            "SYNC_EXECUTION_MODE": "threaded",
+        })
+    else:
+        overrides.update({"LOAD_MODEL": "open", "OPEN_LOOP_RATE_MSG_PER_SEC": level})
+    return overrides
+
+def check_slo(workflow):
+    """Returns the list of SLO violations for one step (empty if it passed)."""
+    violations = []
+    total_runs = workflow.get("total_runs") or 0
+    error_rate = workflow.get("failed_runs", 0) / total_runs if total_runs else 1.0
+    if error_rate > config.SWEEP_SLO_MAX_ERROR_RATE:
+        violations.append(f"error rate {error_rate:.2%} > {config.SWEEP_SLO_MAX_ERROR_RATE:.2%}")
+    p99_s = workflow.get("p99_total_processing_time_s") or 0
+    if p99_s > config.SWEEP_SLO_P99_S:
+        violations.append(f"p99 {p99_s:.3f}s > {config.SWEEP_SLO_P99_S}s")
+    return violations
+
+async def _run_step_in_process(SenderClass, step_config, num_messages):
+    sender_instance = SenderClass(
+        config.TELEGRAM_BOT_TOKEN,
+        config.TELEGRAM_CHAT_ID,
+        config.TELEGRAM_API_URL_TEMPLATE,
+        step_config
+    )
+    if sender_instance.get_sender_type() == "async":
+        # Recreate the shared asyncpg pool so it is sized for this step's concurrency
+        await close_async_pool()
+        await create_async_pool(max_size=async_pool_size(step_config.MAX_CONCURRENT_REQUESTS_PER_LIBRARY))
+        return await sender_instance.run_benchmark_async(num_messages)
+    close_sync_pool() # run_benchmark reopens it sized for this step's worker threads
+    return sender_instance.run_benchmark(num_messages)
+
+async def run_saturation_sweep(name, SenderClass):
+    """Sweeps one library. Returns (library_key, summary at the saturation point with the sweep attached)."""
+    library_key = SenderClass.__name__.replace("Sender", "").lower()
+    levels = get_sweep_levels()
+    steps = []
+    step_summaries = []
+    stopped_reason = "all levels met the SLO"
+
+    for level in levels:
+        print(f"\n[{name}] Sweep step: {config.SWEEP_DIMENSION} = {level:g}")
+        step_config = ConfigOverlay(config, **step_overrides(level))
+        if config.ISOLATE_LIBRARIES_IN_SUBPROCESS:
+            library_key, result_data = await isolated_runner.run_in_subprocess(SenderClass, config.SWEEP_MESSAGES_PER_STEP, step_config.as_env())
+        else:
+            result_data = await _run_step_in_process(SenderClass, step_config, config.SWEEP_MESSAGES_PER_STEP)
+
+        workflow = result_data.get("workflow", {}) if result_data else {}
+        violations = check_slo(workflow) if workflow else ["benchmark failed"]
+        total_runs = workflow.get("total_runs") or 0
+        steps.append({
+            "level": level,
+            "throughput_msg_per_sec": workflow.get("throughput_msg_per_sec"),
+            "offered_rate_msg_per_sec": workflow.get("offered_rate_msg_per_sec"),
+            "p50_total_processing_time_s": workflow.get("p50_total_processing_time_s"),
+            "p99_total_processing_time_s": workflow.get("p99_total_processing_time_s"),
+            "avg_total_processing_time_s": workflow.get("avg_total_processing_time_s"),
+            "error_rate": round(workflow.get("failed_runs", 0) / total_runs, 4) if total_runs else None,
+            "peak_rss_mb": workflow.get("peak_rss_mb"),
+            "meets_slo": not violations,
+            "slo_violations": violations,
+        })
+        step_summaries.append(result_data)
+        print(f"[{name}] {config.SWEEP_DIMENSION} {level:g}: {workflow.get('throughput_msg_per_sec')} msg/s, "
+              f"p99 {workflow.get('p99_total_processing_time_s')}s -> {'OK' if not violations else '; '.join(violations)}")
+        if violations:
+            stopped_reason = f"SLO broken at {config.SWEEP_DIMENSION} {level:g}: {'; '.join(violations)}"
+            break
+
+    passing = [index for index, step in enumerate(steps) if step["meets_slo"]]
+    saturation_index = passing[-1] if passing else None
+    sweep = {
+        "dimension": config.SWEEP_DIMENSION,
+        "levels": levels,
+        "messages_per_step": config.SWEEP_MESSAGES_PER_STEP,
+        "slo": {"p99_total_processing_time_s": config.SWEEP_SLO_P99_S, "max_error_rate": config.SWEEP_SLO_MAX_ERROR_RATE},
+        "saturation_point": steps[saturation_index] if saturation_index is not None else None,
+        "stopped_reason": stopped_reason,
+        "steps": steps,
+    }
+
+    # The library's headline numbers are those of its saturation point (or of the first step if none met the SLO)
+    result_data = step_summaries[saturation_index if saturation_index is not None else 0]
+    if not result_data:
+        return library_key, None
+    result_data = dict(result_data)
+    result_data["saturation_sweep"] = sweep
+    return library_key, result_data
@@ -1,19 +1,16 @@
 # This file makes Python treat the 'senders' directory as a package. 
+import importlib
 
-from .httpx_sender import HttpxSender
-from .aiohttp_sender import AiohttpSender
-from .requests_sender import RequestsSender
-from .urllib3_sender import Urllib3Sender
-from .uplink_sender import UplinkSender
-from .ptb_sender import PTBSender
-from .pytelegrambotapi_sender import PyTelegramBotAPISender
+from .registry import SENDER_CLASS_PATHS
 
-__all__ = [
-    "HttpxSender", 
-    "AiohttpSender",
-    "RequestsSender", 
-    "Urllib3Sender",
-    "UplinkSender",
-    "PTBSender",
-    "PyTelegramBotAPISender"
-] 
\ No newline at end of file
+# Sender classes are imported lazily (PEP 562) so that a process which only needs one sender,
+# such as an isolated benchmark worker, doesn't import every HTTP library.
+_SENDER_MODULES = {class_name: module_path for module_path, class_name in SENDER_CLASS_PATHS.values()}
+
+__all__ = list(_SENDER_MODULES)
+
+def __getattr__(name):
+    if name in _SENDER_MODULES:
+        module = importlib.import_module(_SENDER_MODULES[name])
+        return getattr(module, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,6 +1,10 @@
 import aiohttp
 import asyncio
+import event_log
 from .base_sender import BaseSender
+from connection_timing import aiohttp_trace_config
+
+log = event_log.get_logger(__name__)
 
 class AiohttpSender(BaseSender):
 
@@ -10,7 +14,9 @@ class AiohttpSender(BaseSender):
         connector = aiohttp.TCPConnector(limit=self.config.MAX_CONCURRENT_REQUESTS_PER_LIBRARY)
         # Configure timeout
         timeout = aiohttp.ClientTimeout(total=10.0)
-        session = aiohttp.ClientSession(connector=connector, timeout=timeout)
+        # Trace hooks feed the per-request connection phases (DNS, connect, TTFB, ...)
+        trace_configs = [aiohttp_trace_config()] if self.config.CONNECTION_PHASE_TIMING else None
+        session = aiohttp.ClientSession(connector=connector, timeout=timeout, trace_configs=trace_configs)
         return session
 
     async def close_session(self, session: aiohttp.ClientSession):
@@ -42,26 +48,26 @@ class AiohttpSender(BaseSender):
                 # Check status after reading body
                 success = 200 <= response.status < 300
                 if not success:
-                    print(f"[Debug {self.library_name}] HTTP Status Error: {response.status}, Response: {response_text[:200]}")
+                    log.debug("send_error", "[Debug %s] HTTP Status Error: %s, Response: %s", self.library_name, response.status, response_text[:200], library=self.library_name)
                     # raise_for_status() could be used earlier if body not needed on error
                 
                 return response.status, response_text, response_size_bytes, success
         except aiohttp.ClientResponseError as e:
             # Error captured by aiohttp (includes status code)
             error_text = getattr(e, 'message', str(e))
-            print(f"[Debug {self.library_name}] ClientResponseError Status: {e.status}, Error: {error_text}, History: {e.history}")
+            log.debug("send_error", "[Debug %s] ClientResponseError Status: %s, Error: %s, History: %s", self.library_name, e.status, error_text, e.history, library=self.library_name)
             # Try to get response size if available (might be 0)
             return e.status, error_text, response_size_bytes, False
         except aiohttp.ClientError as e:
              # Other client errors (connection, etc.) - no status code typically
              error_text = str(e)
-             print(f"[Debug {self.library_name}] ClientError: {error_text}")
+             log.debug("send_error", "[Debug %s] ClientError: %s", self.library_name, error_text, library=self.library_name)
              return 0, error_text, 0, False
         except asyncio.TimeoutError as e:
-            print(f"[Debug {self.library_name}] TimeoutError: {e}")
+            log.debug("send_error", "[Debug %s] TimeoutError: %s", self.library_name, e, library=self.library_name)
             return 408, "Timeout Error", 0, False # Use 408 for timeout
         except Exception as e:
-            print(f"[Debug {self.library_name}] General Error: Type={type(e).__name__}, Error={e}")
+            log.debug("send_error", "[Debug %s] General Error: Type=%s, Error=%s", self.library_name, type(e).__name__, e, library=self.library_name)
             return 500, str(e), 0, False
 
     def send_message_sync(self, db_conn, text_payload, message_params):
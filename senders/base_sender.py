@@ -1,12 +1,27 @@
 from abc import ABC, abstractmethod
+import logging
+import os
 import time
 import datetime # Import datetime module
 import asyncio
-import numpy as np # For percentile calculations
-from benchmark_utils import ResourceMonitor # Import ResourceMonitor
-from database_utils import get_sync_db_connection, read_message_sync, get_async_db_connection, read_message_async
+import threading
+from contextlib import nullcontext
+from concurrent.futures import ThreadPoolExecutor
+import connection_timing
+import event_log
+import event_loops
+from benchmark_utils import ResourceMonitor, TIMELINE_SERIES, AttemptRecorder, SendSchedule, build_arrival_offsets # Import ResourceMonitor
+from database_utils import (get_sync_db_connection, read_message_sync, get_async_db_connection, read_message_async,
+                            create_async_pool, async_pool_size, async_pool_info,
+                            create_sync_pool, sync_pool_size, sync_pool_info, get_pooled_sync_db_connection,
+                            SyncMessagePrefetcher, AsyncMessagePrefetcher,
+                            seed_outbox, OutboxStats, SyncOutboxClaimer, AsyncOutboxClaimer)
+
+log = event_log.get_logger(__name__)
 
 class BaseSender(ABC):
+    supports_http2 = False # Senders that can be run in every protocol_matrix mode set this
+
     def __init__(self, token, chat_id, api_url_template, config_obj):
         self.token = token
         self.chat_id = chat_id
@@ -14,6 +29,9 @@ class BaseSender(ABC):
         self.results = []
         self.library_name = self.__class__.__name__.replace("Sender", "")
         self.config = config_obj
+        self._message_prefetcher = None # Prefetcher of the current run when MESSAGE_SOURCE is "prefetch"
+        self._outbox_stats = None # Claim/mark counters of the current run when MESSAGE_SOURCE is "outbox"
+        self._progress = None # ProgressReporter of the current run
 
     @abstractmethod
     def send_message_sync(self, db_conn, text_payload, message_params):
@@ -35,200 +53,567 @@ class BaseSender(ABC):
         """Asynchronously sends a single message using the provided session."""
         pass
 
-    def _record_attempt(self, start_time, db_read_time_ms, response_status, response_text, response_size_bytes, success, error_message=None):
+    def close_sync_session(self):
+        """Closes whatever a sync sender keeps open across messages (e.g. a keep-alive client). Called once a sync run ends."""
+        pass
+
+    def _record_attempt(self, recorder, attempt_index, start_time, db_read_time_ms, response_status, response_text, response_size_bytes, success, error_message=None, intended_start_time=None, pool_acquire_ms=0.0,
+                        connection_phases=None):
         end_time = time.perf_counter()
-        total_time_ms = (end_time - start_time) * 1000
-        http_time_ms = total_time_ms - db_read_time_ms # Approximate HTTP time
-        return {
-            "status_code": response_status,
-            "response_text_snippet": response_text[:100] if response_text else None,
-            "response_size_bytes": response_size_bytes,
-            "db_read_time_ms": round(db_read_time_ms, 2),
-            "http_request_time_ms": round(http_time_ms, 2),
-            "total_processing_time_ms": round(total_time_ms, 2),
-            "success": success,
-            "error_message": str(error_message) if error_message else None
-        }
+        connection_phases_ms, connection_reused = connection_phases.result(end_time) if connection_phases else (None, None)
+        # Open-loop runs measure from the intended send time, so time spent waiting for a free worker counts
+        if intended_start_time is None:
+            intended_start_time = start_time
+        queue_delay_ms = max(0.0, (start_time - intended_start_time) * 1000)
+        total_time_ms = (end_time - intended_start_time) * 1000
+        http_time_ms = total_time_ms - queue_delay_ms - pool_acquire_ms - db_read_time_ms # Approximate HTTP time
+        # Warm-up: the first WARMUP_MESSAGES messages and anything started within WARMUP_SECONDS of the run's start
+        warmup = attempt_index < self.config.WARMUP_MESSAGES or start_time - recorder.started_at < self.config.WARMUP_SECONDS
+        recorder.record(attempt_index, response_status, success, response_size_bytes, db_read_time_ms, http_time_ms, total_time_ms,
+                        queue_delay_ms=queue_delay_ms, pool_acquire_ms=pool_acquire_ms, response_text=response_text, error_message=error_message,
+                        connection_phases_ms=connection_phases_ms, connection_reused=connection_reused, started_at=start_time, completed_at=end_time, warmup=warmup)
+        if not success and log.is_enabled_for(logging.DEBUG):
+            log.debug("send_failed", "%s: attempt %d failed (status %s): %s", self.library_name, attempt_index + 1, response_status,
+                      str(error_message or response_text)[:200], library=self.library_name, index=attempt_index, status=response_status)
+        self._progress.record(success)
 
     def run_benchmark(self, num_messages, message_params=None):
         if message_params is None:
             # Default to no parse_mode for plain text, to avoid entity parsing errors with generated text
             message_params = {}
 
-        run_details = []
-        print(f"Benchmarking {self.library_name} ({self.get_sender_type()})...")
+        log.info("run_start", "Benchmarking %s (%s)...", self.library_name, self.get_sender_type(), library=self.library_name)
 
-        monitor = ResourceMonitor(process_name_hint=f"{self.library_name}_sync_benchmark")
+        # Synchronous execution path
+        if self.get_sender_type() != "sync":
+            raise TypeError(f"{self.library_name} is async, use run_benchmark_async method.")
+
+        num_messages += self.config.WARMUP_MESSAGES # Sent first, then left out of the statistics
+        recorder = self._open_attempt_recorder(num_messages)
+        self._progress = self._open_progress_reporter(num_messages)
+        schedule = self._build_send_schedule(num_messages)
+        monitor = ResourceMonitor(process_name_hint=f"{self.library_name}_sync_benchmark", sample_interval_s=self.config.RESOURCE_SAMPLE_INTERVAL_S)
+        if self.config.SYNC_DB_POOL:
+            # Open the DB pool before measuring, one connection per worker thread
+            workers = self._get_sync_thread_workers(num_messages) if self._get_sync_execution_mode() == "threaded" else 1
+            create_sync_pool(sync_pool_size(workers))
         monitor.start()
+        recorder.start()
 
-        # Synchronous execution path
-        if self.get_sender_type() == "sync":
-            try:
-                with get_sync_db_connection() as db_conn:
-                    for i in range(num_messages):
-                        start_loop_time = time.perf_counter()
-                        db_read_start_time = time.perf_counter()
-                        # Fetch a row from DB - specifically find message for this library
-                        message_id, db_text_payload = read_message_sync(db_conn, self.library_name)
-                        db_read_end_time = time.perf_counter()
-                        db_read_time_ms = (db_read_end_time - db_read_start_time) * 1000
-
-                        if message_id is None:
-                            print(f"Warning: No more messages found in DB for run {i+1}. Stopping early for {self.library_name}.")
-                            break
-                        
-                        # Use the message from DB and append test number
-                        # If the DB doesn't have library-specific messages yet, create a fallback
-                        if db_text_payload and self.library_name in db_text_payload:
-                            # Use the library-specific message from DB
-                            actual_text_payload = f"{db_text_payload}_{i+1}"
+        try:
+            with recorder, self._sync_message_source(num_messages):
+                if self._get_sync_execution_mode() == "threaded":
+                    self._run_threaded_workers(num_messages, message_params, recorder, schedule)
+                else:
+                    with self._worker_db_connection() as db_conn:
+                        if schedule:
+                            schedule.start()
+                        if self._outbox_stats:
+                            pending_indices = iter(range(num_messages))
+                            self._drain_outbox_sync(db_conn, lambda: next(pending_indices, None), num_messages, message_params, recorder, schedule)
                         else:
-                            # Fallback if DB content doesn't match the library
-                            actual_text_payload = f"{self.library_name} Test_{i+1}"
-
-                        print(f"Sending message {i+1}/{num_messages} (DB ID: {message_id}, Lib: {self.library_name}) with content: '{actual_text_payload[:30]}...'")
-                        try:
-                            status, resp_text, resp_size, success = self.send_message_sync(db_conn, actual_text_payload, message_params)
-                            # If send_message_sync returns success=False, resp_text might contain the error string
-                            current_error_message = str(resp_text) if not success and resp_text else None
-                            attempt_data = self._record_attempt(start_loop_time, db_read_time_ms, status, resp_text, resp_size, success, error_message=current_error_message)
-                        except Exception as e:
-                            # This exception is from BaseSender logic, or if send_message_sync raises unhandled
-                            attempt_data = self._record_attempt(start_loop_time, db_read_time_ms, None, str(e), 0, False, error_message=str(e))
-                        run_details.append(attempt_data)
-                        # time.sleep(0.1) # Optional delay removed for now
-            except Exception as e:
-                print(f"FATAL ERROR during sync benchmark setup/DB connection for {self.library_name}: {e}")
-                # No results to compile if DB connection fails
-                monitor.stop() # Stop monitor even on failure
-                return self._compile_summary([], monitor.get_results()) # Return empty summary
-
-        else:
-            raise TypeError(f"{self.library_name} is async, use run_benchmark_async method.")
+                            for i in range(num_messages):
+                                intended_start_time = schedule.wait_sync(i) if schedule else None
+                                if not self._process_message_sync(db_conn, i, num_messages, message_params, recorder, intended_start_time):
+                                    log.warning("db_exhausted", "Warning: No more messages found in DB for run %d. Stopping early for %s.", i + 1, self.library_name,
+                                                library=self.library_name, index=i)
+                                    break
+                                # time.sleep(0.1) # Optional delay removed for now
+        except Exception as e:
+            log.error("run_failed", "FATAL ERROR during sync benchmark setup/DB connection for %s: %s", self.library_name, e,
+                      library=self.library_name, error=str(e))
+            # Summarize whatever attempts were streamed before the failure
+            monitor.stop() # Stop monitor even on failure
+            return self._compile_summary(recorder, monitor.get_results())
+        finally:
+            # Release keep-alive sockets so they don't linger into the next run's connection and resource figures
+            try:
+                self.close_sync_session()
+            except Exception as e_close:
+                log.warning("session_close_failed", "Error closing session for %s: %s", self.library_name, e_close,
+                            library=self.library_name, error=str(e_close))
 
         resource_usage = monitor.stop()
-        return self._compile_summary(run_details, resource_usage)
+        if self._get_sync_execution_mode() == "threaded":
+            execution_info = {"execution_mode": "threaded", "concurrency": self._get_sync_thread_workers(num_messages)}
+        else:
+            execution_info = {"execution_mode": "serial", "concurrency": 1}
+        if self.config.SYNC_DB_POOL:
+            execution_info.update(sync_pool_info())
+        execution_info.update(self._load_model_info(schedule))
+        execution_info.update(self._message_source_info())
+        execution_info.update(self._sender_info())
+        return self._compile_summary(recorder, resource_usage, execution_info)
 
     async def run_benchmark_async(self, num_messages, message_params=None):
         if message_params is None:
             # Default to no parse_mode for plain text
             message_params = {}
 
-        run_details = []
-        print(f"Benchmarking {self.library_name} ({self.get_sender_type()})...")
+        log.info("run_start", "Benchmarking %s (%s)...", self.library_name, self.get_sender_type(), library=self.library_name)
         
-        monitor = ResourceMonitor(process_name_hint=f"{self.library_name}_async_benchmark")
+        num_messages += self.config.WARMUP_MESSAGES # Sent first, then left out of the statistics
+        recorder = self._open_attempt_recorder(num_messages)
+        self._progress = self._open_progress_reporter(num_messages)
+        schedule = self._build_send_schedule(num_messages)
+        monitor = ResourceMonitor(process_name_hint=f"{self.library_name}_async_benchmark", sample_interval_s=self.config.RESOURCE_SAMPLE_INTERVAL_S)
         session = None
         resource_usage = {}
         
         try:
+            # Open (and prewarm) the DB pool before measuring, sized to this run's concurrency
+            await create_async_pool(max_size=async_pool_size(self.config.MAX_CONCURRENT_REQUESTS_PER_LIBRARY))
             monitor.start()
+            recorder.start() # Session setup (e.g. PTB's Bot.initialize) lands in the cold-start window
             session = await self.initialize_session()
             if not session:
                 raise RuntimeError(f"Failed to initialize session for {self.library_name}")
 
             if self.get_sender_type() == "async":
                 try:
-                    async with get_async_db_connection() as db_conn:
-                        for i in range(num_messages):
-                            start_loop_time = time.perf_counter()
-                            db_read_start_time = time.perf_counter()
-                            # Fetch a row from DB - specifically find message for this library
-                            message_id, db_text_payload = await read_message_async(db_conn, self.library_name)
-                            db_read_end_time = time.perf_counter()
-                            db_read_time_ms = (db_read_end_time - db_read_start_time) * 1000
-
-                            if message_id is None:
-                                print(f"Warning: No more messages found in DB for run {i+1}. Stopping early for {self.library_name}.")
-                                break
-                            
-                            # Use the message from DB and append test number
-                            # If the DB doesn't have library-specific messages yet, create a fallback
-                            if db_text_payload and self.library_name in db_text_payload:
-                                # Use the library-specific message from DB
-                                actual_text_payload = f"{db_text_payload}_{i+1}"
-                            else:
-                                # Fallback if DB content doesn't match the library
-                                actual_text_payload = f"{self.library_name} Test_{i+1}"
-
-                            print(f"Sending message {i+1}/{num_messages} (DB ID: {message_id}, Lib: {self.library_name}) with content: '{actual_text_payload[:30]}...'")
-                            try:
-                                status, resp_text, resp_size, success = await self.send_message_async(session, db_conn, actual_text_payload, message_params)
-                                # If send_message_async returns success=False, resp_text might contain the error string
-                                current_error_message = str(resp_text) if not success and resp_text else None
-                                attempt_data = self._record_attempt(start_loop_time, db_read_time_ms, status, resp_text, resp_size, success, error_message=current_error_message)
-                            except Exception as e:
-                                print(f"[ERROR in run_benchmark_async loop for {self.library_name}] Type: {type(e).__name__}, Error: {e}")
-                                # This exception is from BaseSender logic, or if send_message_async raises unhandled
-                                attempt_data = self._record_attempt(start_loop_time, db_read_time_ms, None, str(e), 0, False, error_message=str(e))
-                            run_details.append(attempt_data)
+                    async with self._async_message_source(num_messages):
+                        await self._run_async_workers(session, num_messages, message_params, recorder, schedule)
                 except Exception as e:
-                    print(f"FATAL ERROR during async benchmark setup/DB connection for {self.library_name}: {e}")
+                    log.error("run_failed", "FATAL ERROR during async benchmark setup/DB connection for %s: %s", self.library_name, e,
+                              library=self.library_name, error=str(e))
                     monitor.stop()
-                    return self._compile_summary([], monitor.get_results())
+                    recorder.close()
+                    return self._compile_summary(recorder, monitor.get_results())
             else:
                 raise TypeError(f"{self.library_name} is sync, use run_benchmark method.")
 
         except Exception as e:
-            print(f"FATAL ERROR during async benchmark setup/run for {self.library_name}: {e}")
-            if monitor.is_running():
-                resource_usage = monitor.stop()
-            else:
-                resource_usage = monitor.get_results() if monitor.start_time else {}
-            return self._compile_summary(run_details, resource_usage)
+            log.error("run_failed", "FATAL ERROR during async benchmark setup/run for %s: %s", self.library_name, e,
+                      library=self.library_name, error=str(e))
+            # The monitor isn't started yet if opening the DB pool failed
+            resource_usage = monitor.stop() if monitor.is_running() else {}
+            recorder.close()
+            return self._compile_summary(recorder, resource_usage)
         finally:
             if monitor.is_running():
                 resource_usage = monitor.stop()
+            recorder.close()
             
             if session:
                 try:
                     await self.close_session(session)
                 except Exception as e_close:
-                    print(f"Error closing session for {self.library_name}: {e_close}")
+                    log.warning("session_close_failed", "Error closing session for %s: %s", self.library_name, e_close,
+                                library=self.library_name, error=str(e_close))
         
-        return self._compile_summary(run_details, resource_usage)
+        execution_info = {"execution_mode": "async", "concurrency": self._get_async_concurrency(num_messages)}
+        execution_info.update(async_pool_info())
+        execution_info.update(event_loops.loop_info())
+        execution_info.update(self._load_model_info(schedule))
+        execution_info.update(self._message_source_info())
+        execution_info.update(self._sender_info())
+        return self._compile_summary(recorder, resource_usage, execution_info)
+
+    def _open_attempt_recorder(self, num_messages):
+        """Creates the columnar recorder for this run; attempt details stream to an NDJSON log."""
+        filename = f"{self.library_name.lower()}_attempts.ndjson"
+        return AttemptRecorder(num_messages, os.path.join(self.config.REPORTS_DIR, self.config.ATTEMPT_LOGS_DIRNAME, filename))
+
+    def _open_progress_reporter(self, num_messages):
+        """Progress summaries for this run (every LOG_PROGRESS_EVERY_N attempts or LOG_PROGRESS_EVERY_S seconds)."""
+        return event_log.ProgressReporter(log, self.library_name, num_messages,
+                                          self.config.LOG_PROGRESS_EVERY_N, self.config.LOG_PROGRESS_EVERY_S)
+
+    def _build_send_schedule(self, num_messages):
+        """Open-loop SendSchedule for this run, or None for the default closed loop."""
+        if self.config.LOAD_MODEL == "closed":
+            return None
+        if self.config.LOAD_MODEL != "open":
+            raise ValueError(f"Unknown LOAD_MODEL: {self.config.LOAD_MODEL}")
+        offsets_s = build_arrival_offsets(
+            num_messages,
+            self.config.OPEN_LOOP_ARRIVAL,
+            self.config.OPEN_LOOP_RATE_MSG_PER_SEC,
+            ramp_start_rate_msg_per_sec=self.config.OPEN_LOOP_RAMP_START_RATE_MSG_PER_SEC,
+            seed=self.config.OPEN_LOOP_SEED,
+        )
+        log.info("load_model", "Open-loop load for %s: %s arrivals at %s msg/s.", self.library_name, self.config.OPEN_LOOP_ARRIVAL,
+                 self.config.OPEN_LOOP_RATE_MSG_PER_SEC, library=self.library_name, arrival=self.config.OPEN_LOOP_ARRIVAL,
+                 rate_msg_per_sec=self.config.OPEN_LOOP_RATE_MSG_PER_SEC)
+        return SendSchedule(offsets_s)
+
+    def _load_model_info(self, schedule):
+        """Load-model fields merged into execution_info."""
+        if schedule is None:
+            return {"load_model": "closed"}
+        return {
+            "load_model": "open",
+            "arrival": self.config.OPEN_LOOP_ARRIVAL,
+            "target_rate_msg_per_sec": self.config.OPEN_LOOP_RATE_MSG_PER_SEC,
+            "offered_rate_msg_per_sec": round(schedule.target_rate_msg_per_sec(), 2), # Mean rate of the generated schedule
+        }
+
+    def _prepare_message_source(self, num_messages):
+        """Resets per-run message-source state; seeds the outbox in "outbox" mode. Returns the mode."""
+        mode = self.config.MESSAGE_SOURCE
+        if mode not in ("per_message", "prefetch", "outbox"):
+            raise ValueError(f"Unknown MESSAGE_SOURCE: {mode}")
+        self._message_prefetcher = None
+        self._outbox_stats = None
+        if mode == "outbox":
+            seed_outbox(self.library_name, num_messages)
+            self._outbox_stats = OutboxStats(self.config.OUTBOX_CLAIM_BATCH_SIZE)
+        return mode
+
+    def _sync_message_source(self, num_messages):
+        """Context that runs a SyncMessagePrefetcher for this run when MESSAGE_SOURCE is "prefetch"."""
+        if self._prepare_message_source(num_messages) != "prefetch":
+            return nullcontext()
+        self._message_prefetcher = SyncMessagePrefetcher(
+            self.library_name, num_messages, self.config.PREFETCH_BATCH_SIZE, self.config.PREFETCH_QUEUE_BATCHES
+        )
+        return self._message_prefetcher
+
+    def _async_message_source(self, num_messages):
+        """Async counterpart of _sync_message_source."""
+        if self._prepare_message_source(num_messages) != "prefetch":
+            return nullcontext()
+        self._message_prefetcher = AsyncMessagePrefetcher(
+            self.library_name, num_messages, self.config.PREFETCH_BATCH_SIZE, self.config.PREFETCH_QUEUE_BATCHES
+        )
+        return self._message_prefetcher
+
+    def _sender_info(self):
+        """Library-specific fields merged into execution_info (e.g. negotiated HTTP versions)."""
+        return {}
+
+    def _message_source_info(self):
+        """Message-source fields merged into execution_info (prefetch/outbox runs add the amortized DB cost)."""
+        if self._outbox_stats:
+            return self._outbox_stats.stats()
+        if self._message_prefetcher:
+            return self._message_prefetcher.stats()
+        return {"message_source": "per_message"}
+
+    def _worker_db_connection(self):
+        """A worker's own DB connection; not needed when messages come from the prefetcher or are checked out per message."""
+        if self._message_prefetcher or (self.config.SYNC_DB_POOL and not self._outbox_stats):
+            return nullcontext()
+        return get_pooled_sync_db_connection() if self.config.SYNC_DB_POOL else get_sync_db_connection()
+
+    def _message_db_connection_sync(self, db_conn):
+        """The connection for one message: the worker's own, or one checked out of the pool for just this message."""
+        if db_conn is not None or self._message_prefetcher:
+            return nullcontext(db_conn)
+        return get_pooled_sync_db_connection()
+
+    def _read_message_sync(self, db_conn):
+        if self._message_prefetcher:
+            return self._message_prefetcher.get()
+        return read_message_sync(db_conn, self.library_name)
+
+    def _build_text_payload(self, db_text_payload, i):
+        """Builds the text actually sent for message `i` from the DB content."""
+        # Use the message from DB and append test number
+        # If the DB doesn't have library-specific messages yet, create a fallback
+        if db_text_payload and self.library_name in db_text_payload:
+            # Use the library-specific message from DB
+            return f"{db_text_payload}_{i+1}"
+        # Fallback if DB content doesn't match the library
+        return f"{self.library_name} Test_{i+1}"
+
+    def _get_sync_execution_mode(self):
+        """'serial' (one message at a time) or 'threaded' (ThreadPoolExecutor of SYNC_THREAD_WORKERS)."""
+        if self.config.SYNC_EXECUTION_MODE not in ("serial", "threaded"):
+            raise ValueError(f"Unknown SYNC_EXECUTION_MODE: {self.config.SYNC_EXECUTION_MODE}")
+        return self.config.SYNC_EXECUTION_MODE
 
-    def _compile_summary(self, run_details, resource_usage_data):
-        successful_requests = sum(1 for r in run_details if r["success"])
-        failed_requests = len(run_details) - successful_requests
-        total_attempts = len(run_details)
+    def _get_sync_thread_workers(self, num_messages):
+        """Number of worker threads used in threaded mode (bounded by the message count)."""
+        return max(1, min(int(self.config.SYNC_THREAD_WORKERS), num_messages))
+
+    def _run_threaded_workers(self, num_messages, message_params, recorder, schedule=None):
+        """Drives send_message_sync from a ThreadPoolExecutor.
+
+        Every worker thread uses its own DB connection (psycopg2 connections must not be
+        used concurrently), checked out of the sync pool per message or opened for the worker,
+        and pulls message indices from a shared, lock-protected iterator.
+        With an open-loop `schedule`, each worker sleeps until its message's intended send time.
+        """
+        num_workers = self._get_sync_thread_workers(num_messages)
+        log.info("workers_started", "Running %s with %d worker threads.", self.library_name, num_workers,
+                 library=self.library_name, workers=num_workers)
+        pending_indices = iter(range(num_messages))
+        indices_lock = threading.Lock()
+        db_exhausted = threading.Event()
+
+        def next_index():
+            with indices_lock:
+                return next(pending_indices, None)
+
+        def worker():
+            with self._worker_db_connection() as db_conn:
+                if self._outbox_stats:
+                    self._drain_outbox_sync(db_conn, next_index, num_messages, message_params, recorder, schedule)
+                    return
+                while not db_exhausted.is_set():
+                    i = next_index()
+                    if i is None:
+                        break
+                    intended_start_time = schedule.wait_sync(i) if schedule else None
+                    if not self._process_message_sync(db_conn, i, num_messages, message_params, recorder, intended_start_time):
+                        log.warning("db_exhausted", "Warning: No more messages found in DB for run %d. Stopping early for %s.", i + 1, self.library_name,
+                                    library=self.library_name, index=i)
+                        db_exhausted.set()
+                        break
+
+        with ThreadPoolExecutor(max_workers=num_workers, thread_name_prefix=f"{self.library_name}_worker") as executor:
+            if schedule:
+                schedule.start()
+            futures = [executor.submit(worker) for _ in range(num_workers)]
+            for future in futures:
+                future.result() # Re-raise worker failures (e.g. DB connection errors)
+
+    def _process_message_sync(self, db_conn, i, num_messages, message_params, recorder, intended_start_time=None):
+        """Reads one message from the DB, sends it and records the attempt. Returns False if the DB is empty."""
+        start_loop_time = time.perf_counter()
+        with self._message_db_connection_sync(db_conn) as db_conn:
+            # Checkout wait when the pool has fewer connections than worker threads
+            pool_acquire_ms = (time.perf_counter() - start_loop_time) * 1000
+            db_read_start_time = time.perf_counter()
+            # Fetch a row from DB - specifically find message for this library
+            message_id, db_text_payload = self._read_message_sync(db_conn)
+            db_read_end_time = time.perf_counter()
+            db_read_time_ms = (db_read_end_time - db_read_start_time) * 1000
+
+            if message_id is None:
+                return False
+
+            self._send_and_record_sync(db_conn, i, num_messages, message_params, recorder, message_id, db_text_payload,
+                                       start_loop_time, db_read_time_ms, intended_start_time, pool_acquire_ms)
+            return True
+
+    def _send_and_record_sync(self, db_conn, i, num_messages, message_params, recorder, message_id, db_text_payload,
+                              start_loop_time, db_read_time_ms, intended_start_time=None, pool_acquire_ms=0.0):
+        """Sends an already-read message and records the attempt. Returns True if the send succeeded."""
+        actual_text_payload = self._build_text_payload(db_text_payload, i)
+
+        log.debug("send", "Sending message %d/%d (DB ID: %s, Lib: %s) with content: '%s...'", i + 1, num_messages, message_id,
+                  self.library_name, actual_text_payload[:30], library=self.library_name, index=i, message_id=message_id)
+        # Library hooks report DNS/connect/TLS/TTFB/... into this attempt's record
+        with connection_timing.track(self.config.CONNECTION_PHASE_TIMING) as connection_phases:
+            try:
+                status, resp_text, resp_size, success = self.send_message_sync(db_conn, actual_text_payload, message_params)
+                # If send_message_sync returns success=False, resp_text might contain the error string
+                current_error_message = str(resp_text) if not success and resp_text else None
+                self._record_attempt(recorder, i, start_loop_time, db_read_time_ms, status, resp_text, resp_size, success, error_message=current_error_message,
+                                     intended_start_time=intended_start_time, pool_acquire_ms=pool_acquire_ms, connection_phases=connection_phases)
+                return bool(success)
+            except Exception as e:
+                # This exception is from BaseSender logic, or if send_message_sync raises unhandled
+                self._record_attempt(recorder, i, start_loop_time, db_read_time_ms, None, str(e), 0, False, error_message=str(e),
+                                     intended_start_time=intended_start_time, pool_acquire_ms=pool_acquire_ms, connection_phases=connection_phases)
+                return False
+
+    def _drain_outbox_sync(self, db_conn, next_index, num_messages, message_params, recorder, schedule=None):
+        """Claims batches of unsent rows, sends them and bulk-marks the delivered ones sent.
+
+        A message index is only taken once a claimed row is in hand, so workers that find the
+        outbox empty (every remaining row locked by other workers) simply stop. The first message
+        of each batch carries the claim time as its DB time, unless the claim finished before
+        that message was even due (open-loop runs).
+        """
+        claimer = SyncOutboxClaimer(db_conn, self.library_name, self.config.OUTBOX_CLAIM_BATCH_SIZE, self._outbox_stats)
+        while True:
+            claim_start_time = time.perf_counter()
+            rows, claim_time_ms = claimer.claim()
+            if not rows:
+                claimer.mark_sent([]) # Ends the claim transaction
+                return
+            delivered_ids = []
+            out_of_indices = False
+            for position, (message_id, db_text_payload) in enumerate(rows):
+                i = next_index()
+                if i is None:
+                    out_of_indices = True
+                    break
+                intended_start_time = schedule.wait_sync(i) if schedule else None
+                charge_claim = position == 0 and (intended_start_time is None or claim_start_time >= intended_start_time)
+                start_loop_time = claim_start_time if charge_claim else time.perf_counter()
+                if self._send_and_record_sync(db_conn, i, num_messages, message_params, recorder, message_id, db_text_payload,
+                                              start_loop_time, claim_time_ms if charge_claim else 0.0, intended_start_time):
+                    delivered_ids.append(message_id)
+            claimer.mark_sent(delivered_ids) # Also releases rows that were not delivered
+            if out_of_indices:
+                return
+
+    def _get_async_concurrency(self, num_messages):
+        """Number of requests kept in flight by the async engine (bounded by the message count)."""
+        return max(1, min(int(self.config.MAX_CONCURRENT_REQUESTS_PER_LIBRARY), num_messages))
+
+    async def _run_async_workers(self, session, num_messages, message_params, recorder, schedule=None):
+        """Fans the messages out over a bounded pool of worker coroutines.
+
+        Each worker pulls the next message index from a shared iterator, so at most
+        `MAX_CONCURRENT_REQUESTS_PER_LIBRARY` requests are in flight at any time.
+        Attempts are written into `recorder` by message index. With an open-loop `schedule`,
+        each worker waits for its message's intended send time before taking a DB connection.
+        """
+        concurrency = self._get_async_concurrency(num_messages)
+        log.info("workers_started", "Running %s with %d concurrent in-flight requests.", self.library_name, concurrency,
+                 library=self.library_name, concurrency=concurrency)
+        pending_indices = iter(range(num_messages)) # Shared by all workers; next() never yields to the loop
+        db_exhausted = False
+
+        async def worker():
+            nonlocal db_exhausted
+            if self._outbox_stats:
+                await self._drain_outbox_async(session, lambda: next(pending_indices, None), num_messages, message_params, recorder, schedule)
+                return
+            for i in pending_indices:
+                if db_exhausted:
+                    break
+                intended_start_time = await schedule.wait_async(i) if schedule else None
+                if not await self._process_message_async(session, i, num_messages, message_params, recorder, intended_start_time):
+                    log.warning("db_exhausted", "Warning: No more messages found in DB for run %d. Stopping early for %s.", i + 1, self.library_name,
+                                library=self.library_name, index=i)
+                    db_exhausted = True
+                    break
+
+        if schedule:
+            schedule.start()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+
+    async def _process_message_async(self, session, i, num_messages, message_params, recorder, intended_start_time=None):
+        """Reads one message from the DB, sends it and records the attempt. Returns False if the DB is empty."""
+        # Each in-flight request holds its own pooled connection (asyncpg connections are not shareable);
+        # with the prefetcher, rows come from its queue and no connection is needed
+        start_loop_time = time.perf_counter()
+        async with self._message_db_connection_async() as db_conn:
+            # Time spent waiting for a free pooled connection (near zero when the pool covers the concurrency)
+            pool_acquire_ms = (time.perf_counter() - start_loop_time) * 1000
+            db_read_start_time = time.perf_counter()
+            # Fetch a row from DB - specifically find message for this library
+            if self._message_prefetcher:
+                message_id, db_text_payload = await self._message_prefetcher.get()
+            else:
+                message_id, db_text_payload = await read_message_async(db_conn, self.library_name)
+            db_read_end_time = time.perf_counter()
+            db_read_time_ms = (db_read_end_time - db_read_start_time) * 1000
+
+            if message_id is None:
+                return False
+
+            await self._send_and_record_async(session, db_conn, i, num_messages, message_params, recorder, message_id, db_text_payload,
+                                              start_loop_time, db_read_time_ms, intended_start_time, pool_acquire_ms)
+            return True
+
+    async def _send_and_record_async(self, session, db_conn, i, num_messages, message_params, recorder, message_id, db_text_payload,
+                                     start_loop_time, db_read_time_ms, intended_start_time=None, pool_acquire_ms=0.0):
+        """Sends an already-read message and records the attempt. Returns True if the send succeeded."""
+        actual_text_payload = self._build_text_payload(db_text_payload, i)
+
+        log.debug("send", "Sending message %d/%d (DB ID: %s, Lib: %s) with content: '%s...'", i + 1, num_messages, message_id,
+                  self.library_name, actual_text_payload[:30], library=self.library_name, index=i, message_id=message_id)
+        # Library hooks report DNS/connect/TLS/TTFB/... into this attempt's record (one per worker task)
+        with connection_timing.track(self.config.CONNECTION_PHASE_TIMING) as connection_phases:
+            try:
+                status, resp_text, resp_size, success = await self.send_message_async(session, db_conn, actual_text_payload, message_params)
+                # If send_message_async returns success=False, resp_text might contain the error string
+                current_error_message = str(resp_text) if not success and resp_text else None
+                self._record_attempt(recorder, i, start_loop_time, db_read_time_ms, status, resp_text, resp_size, success, error_message=current_error_message,
+                                     intended_start_time=intended_start_time, pool_acquire_ms=pool_acquire_ms, connection_phases=connection_phases)
+                return bool(success)
+            except Exception as e:
+                log.warning("send_failed", "[ERROR in run_benchmark_async loop for %s] Type: %s, Error: %s", self.library_name, type(e).__name__, e,
+                            library=self.library_name, index=i, error_type=type(e).__name__, error=str(e))
+                # This exception is from BaseSender logic, or if send_message_async raises unhandled
+                self._record_attempt(recorder, i, start_loop_time, db_read_time_ms, None, str(e), 0, False, error_message=str(e),
+                                     intended_start_time=intended_start_time, pool_acquire_ms=pool_acquire_ms, connection_phases=connection_phases)
+                return False
+
+    async def _drain_outbox_async(self, session, next_index, num_messages, message_params, recorder, schedule=None):
+        """Async counterpart of _drain_outbox_sync; the worker holds one pooled connection throughout."""
+        async with get_async_db_connection() as db_conn:
+            claimer = AsyncOutboxClaimer(db_conn, self.library_name, self.config.OUTBOX_CLAIM_BATCH_SIZE, self._outbox_stats)
+            while True:
+                claim_start_time = time.perf_counter()
+                rows, claim_time_ms = await claimer.claim()
+                if not rows:
+                    return
+                delivered_ids = []
+                out_of_indices = False
+                for position, (message_id, db_text_payload) in enumerate(rows):
+                    i = next_index()
+                    if i is None:
+                        out_of_indices = True
+                        break
+                    intended_start_time = await schedule.wait_async(i) if schedule else None
+                    charge_claim = position == 0 and (intended_start_time is None or claim_start_time >= intended_start_time)
+                    start_loop_time = claim_start_time if charge_claim else time.perf_counter()
+                    if await self._send_and_record_async(session, db_conn, i, num_messages, message_params, recorder, message_id, db_text_payload,
+                                                         start_loop_time, claim_time_ms if charge_claim else 0.0, intended_start_time):
+                        delivered_ids.append(message_id)
+                await claimer.mark_sent(delivered_ids)
+                if out_of_indices:
+                    return
+
+    def _message_db_connection_async(self):
+        return nullcontext() if self._message_prefetcher else get_async_db_connection()
+
+    def _compile_summary(self, recorder, resource_usage_data, execution_info=None):
+        # The run is over: report final progress and let the log catch up before the summary is printed
+        self._progress.finish()
+        event_log.flush()
+        # All statistics come from one vectorized pass over the recorder's columns (successful attempts only)
+        stats = recorder.summarize()
+        total_attempts = stats["total_attempts"]
+        successful_requests = stats["successful"]
+        failed_requests = stats["failed"]
         success_rate_percent = (successful_requests / total_attempts * 100) if total_attempts > 0 else 0
-        
-        # Extract times for successful runs
-        db_times = [r["db_read_time_ms"] for r in run_details if r["success"]]
-        http_times = [r["http_request_time_ms"] for r in run_details if r["success"]]
-        total_times = [r["total_processing_time_ms"] for r in run_details if r["success"]]
-        response_sizes = [r["response_size_bytes"] for r in run_details if r["success"]]
-
-        # Calculate stats (times in seconds for reporting consistency with example)
-        avg_db_time_s = (sum(db_times) / len(db_times) / 1000) if db_times else 0
-        avg_http_time_s = (sum(http_times) / len(http_times) / 1000) if http_times else 0
-        avg_total_time_s = (sum(total_times) / len(total_times) / 1000) if total_times else 0
-
-        p95_db_time_s = (np.percentile(db_times, 95) / 1000) if db_times else 0
-        p99_db_time_s = (np.percentile(db_times, 99) / 1000) if db_times else 0
-        p95_http_time_s = (np.percentile(http_times, 95) / 1000) if http_times else 0
-        p99_http_time_s = (np.percentile(http_times, 99) / 1000) if http_times else 0
-        p95_total_time_s = (np.percentile(total_times, 95) / 1000) if total_times else 0
-        p99_total_time_s = (np.percentile(total_times, 99) / 1000) if total_times else 0
-
-        # Standard Deviations
-        std_db_time_s = (np.std(db_times) / 1000) if db_times else 0
-        std_http_time_s = (np.std(http_times) / 1000) if http_times else 0
-        std_total_time_s = (np.std(total_times) / 1000) if total_times else 0
-        
+
+        # Times in seconds for reporting consistency with example
+        db_stats = stats["db_read_time_ms"]
+        http_stats = stats["http_request_time_ms"]
+        total_stats = stats["total_processing_time_ms"]
+        avg_db_time_s, p95_db_time_s, p99_db_time_s, std_db_time_s = (db_stats[k] / 1000 for k in ("avg", "p95", "p99", "std"))
+        avg_http_time_s, p95_http_time_s, p99_http_time_s, std_http_time_s = (http_stats[k] / 1000 for k in ("avg", "p95", "p99", "std"))
+        avg_total_time_s, p95_total_time_s, p99_total_time_s, std_total_time_s = (total_stats[k] / 1000 for k in ("avg", "p95", "p99", "std"))
+        avg_queue_delay_s, p95_queue_delay_s, p99_queue_delay_s = (stats["queue_delay_ms"][k] / 1000 for k in ("avg", "p95", "p99"))
+        avg_acquire_s, p95_acquire_s, p99_acquire_s = (stats["pool_acquire_ms"][k] / 1000 for k in ("avg", "p95", "p99"))
+        connection_stats = recorder.summarize_connection_phases()
+        connection_phase_fields = {}
+        for phase, phase_stats in connection_stats["phases"].items():
+            # None when the library's hooks don't expose the phase (or phase timing is off)
+            for stat in ("avg", "p99"):
+                connection_phase_fields[f"{stat}_{phase}_s"] = round(phase_stats[stat] / 1000, 6) if phase_stats else None
+
         # Response Size
-        avg_response_size = sum(response_sizes) / len(response_sizes) if response_sizes else 0
+        avg_response_size = stats["avg_response_size_bytes"]
 
-        # Throughput
+        # HDR-style histograms give the full percentile spectrum and can be merged across workers/processes
+        histograms = recorder.build_histograms()
+        percentile_spectrum = {}
+        for phase, histogram in histograms.items():
+            phase_summary = histogram.summary_s()
+            for label in ("p50", "p90", "p99_9", "p99_99", "max"):
+                percentile_spectrum[f"{label}_{phase}_s"] = phase_summary[label]
+
+        # Throughput (with a warm-up: steady-state attempts over the time after the warm-up finished)
         total_benchmark_duration_s = resource_usage_data.get("duration_seconds", 0)
-        throughput = total_attempts / total_benchmark_duration_s if total_benchmark_duration_s > 0 else 0
+        steady_duration_s = recorder.steady_duration_s()
+        throughput_duration_s = steady_duration_s if steady_duration_s else total_benchmark_duration_s
+        throughput = total_attempts / throughput_duration_s if throughput_duration_s > 0 else 0
+
+        # Cold start, reported apart from the steady-state figures above
+        warmup_stats = recorder.summarize(window="warmup")
+        first_attempt_ms = recorder.first_attempt_ms()
 
         summary_data = {
             "library": self.library_name,
             "version": self.get_library_version(),
             "type": self.get_sender_type(),
-            "run_details": run_details, # Detailed attempts
+            # Detailed attempts are streamed to NDJSON; path is relative to the reports directory
+            "run_details_file": os.path.relpath(recorder.path, self.config.REPORTS_DIR),
+            "resource_timeline": resource_usage_data.get("timeline"), # Raw sampled series for plotting
+            "latency_histograms": {phase: histogram.to_dict() for phase, histogram in histograms.items()},
+            # Per-window completions, throughput and latency, warm-up included, to show the cold -> steady transition
+            "time_windows": recorder.summarize_time_windows(self.config.TIME_WINDOW_S),
             "workflow": { 
                 # Renaming fields slightly for clarity with DB inclusion
                 "avg_db_read_time_s": round(avg_db_time_s, 5),
@@ -243,10 +628,36 @@ class BaseSender(ABC):
                 "p95_total_processing_time_s": round(p95_total_time_s, 5),
                 "p99_total_processing_time_s": round(p99_total_time_s, 5),
                 "std_total_processing_time_s": round(std_total_time_s, 5),
+                # Open-loop only: wait between intended and actual send time (already included in total time)
+                "avg_queue_delay_s": round(avg_queue_delay_s, 5),
+                "p95_queue_delay_s": round(p95_queue_delay_s, 5),
+                "p99_queue_delay_s": round(p99_queue_delay_s, 5),
+                # Waiting for a pooled DB connection (already included in total time)
+                "avg_pool_acquire_wait_s": round(avg_acquire_s, 5),
+                "p95_pool_acquire_wait_s": round(p95_acquire_s, 5),
+                "p99_pool_acquire_wait_s": round(p99_acquire_s, 5),
+                # Connection lifecycle per request (see connection_timing.py) and keep-alive reuse
+                **connection_phase_fields,
+                "new_connections": connection_stats["new_connections"],
+                "reused_connections": connection_stats["reused_connections"],
+                "connection_reuse_percent": round(connection_stats["connection_reuse_percent"], 2)
+                                            if connection_stats["connection_reuse_percent"] is not None else None,
+                # Requests (HTTP/2: streams) carried per opened connection
+                "requests_per_connection": round((connection_stats["new_connections"] + connection_stats["reused_connections"])
+                                                 / connection_stats["new_connections"], 2) if connection_stats["new_connections"] else None,
+                # p50/p90/p99.9/p99.99/max per phase from the latency histograms
+                **percentile_spectrum,
                 "avg_response_size_bytes": round(avg_response_size, 1),
                 "throughput_msg_per_sec": round(throughput, 2),
                 
                 "total_benchmark_duration_s": round(total_benchmark_duration_s, 4), # Overall time for this library's test
+                "steady_state_duration_s": round(steady_duration_s, 4) if steady_duration_s is not None else None,
+
+                # Warm-up attempts: executed but excluded from every other statistic
+                "warmup_attempts": warmup_stats["total_attempts"],
+                "warmup_avg_total_processing_time_s": round(warmup_stats["total_processing_time_ms"]["avg"] / 1000, 5) if warmup_stats["successful"] else None,
+                "warmup_p99_total_processing_time_s": round(warmup_stats["total_processing_time_ms"]["p99"] / 1000, 5) if warmup_stats["successful"] else None,
+                "first_attempt_total_time_s": round(first_attempt_ms / 1000, 5) if first_attempt_ms is not None else None,
                 
                 "successful_runs": successful_requests,
                 "failed_runs": failed_requests,
@@ -254,7 +665,13 @@ class BaseSender(ABC):
                 "success_rate_percent": round(success_rate_percent, 2),
                 
                 "cpu_time_percent": resource_usage_data.get("cpu_time_percent"),
-                "memory_increase_mb": resource_usage_data.get("memory_increase_mb")
+                "memory_increase_mb": resource_usage_data.get("memory_increase_mb"),
+                # Peak/avg/p95 of the sampled timeline (e.g. peak_rss_mb, p95_cpu_percent, peak_sockets)
+                **{f"{stat}_{series}": resource_usage_data.get(f"{stat}_{series}")
+                   for series in TIMELINE_SERIES for stat in ("peak", "avg", "p95")},
+
+                # How the messages were driven (e.g. {"execution_mode": "async", "concurrency": 50})
+                **(execution_info or {})
             }
         }
         return summary_data
@@ -1,18 +1,56 @@
 import httpx
 import asyncio
+import threading
+from collections import Counter
+import event_log
 from .base_sender import BaseSender
+from connection_timing import httpcore_trace, httpcore_trace_async
+
+log = event_log.get_logger(__name__)
 
 class HttpxSender(BaseSender):
-    
+    supports_http2 = True # Can run in every protocol_matrix mode
+
+    def __init__(self, token, chat_id, api_url_template, config_obj):
+        super().__init__(token, chat_id, api_url_template, config_obj)
+        self._http_versions = Counter() # Negotiated protocol of every response ("HTTP/1.1", "HTTP/2")
+        self._http_versions_lock = threading.Lock()
+
+    def _requested_http_version(self):
+        return str(self.config.HTTPX_HTTP_VERSION)
+
+    def _protocol_options(self, concurrency):
+        """httpx transport/client kwargs for the requested HTTP version and HTTPX_MAX_CONNECTIONS (0 = `concurrency`)."""
+        version = self._requested_http_version()
+        if version not in ("1.1", "2"):
+            raise ValueError(f"Unknown HTTP version for {self.library_name}: {version} (choose 1.1 or 2)")
+        max_connections = int(self.config.HTTPX_MAX_CONNECTIONS) or int(concurrency)
+        options = {
+            "limits": httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+            "http2": version == "2",
+        }
+        if version == "2" and self.api_url_template.startswith("http://"):
+            # ALPN only negotiates HTTP/2 over TLS; in cleartext, use it with prior knowledge (h2c)
+            options["http1"] = False
+        return options
+
+    def _count_http_version(self, response):
+        with self._http_versions_lock:
+            self._http_versions[response.http_version] += 1
+
+    def _sender_info(self):
+        return {
+            "http_version_requested": self._requested_http_version(),
+            "http_max_connections": int(self.config.HTTPX_MAX_CONNECTIONS) or "auto",
+            "negotiated_http_versions": dict(self._http_versions),
+        }
+
     async def initialize_session(self):
         """Initialize and return the httpx AsyncClient."""
-        # Use configured concurrency limits if applicable (httpx uses httpcore limits)
-        # We can configure limits on the transport.
-        limits = httpx.Limits(max_connections=self.config.MAX_CONCURRENT_REQUESTS_PER_LIBRARY, 
-                              max_keepalive_connections=20) # Default keepalive
+        # Limits and protocol go on the transport (AsyncClient ignores http2= when given a transport)
         timeout = httpx.Timeout(10.0, connect=5.0)
-        transport = httpx.AsyncHTTPTransport(limits=limits, retries=1) 
-        client = httpx.AsyncClient(transport=transport, timeout=timeout, http2=True) # Enable HTTP/2
+        transport = httpx.AsyncHTTPTransport(retries=1, **self._protocol_options(self.config.MAX_CONCURRENT_REQUESTS_PER_LIBRARY))
+        client = httpx.AsyncClient(transport=transport, timeout=timeout)
         return client
 
     async def close_session(self, session: httpx.AsyncClient):
@@ -31,7 +69,10 @@ class HttpxSender(BaseSender):
         }
         try:
             # Use the passed-in session client
-            response = await session.post(api_url, data=data) # Timeout is set on client
+            # httpcore's trace extension feeds the per-request connection phases (connect, TLS, TTFB, ...)
+            extensions = {"trace": httpcore_trace_async} if self.config.CONNECTION_PHASE_TIMING else None
+            response = await session.post(api_url, data=data, extensions=extensions) # Timeout is set on client
+            self._count_http_version(response)
             response.raise_for_status() 
             response_text = response.text
             response_size_bytes = len(response.content)
@@ -40,17 +81,25 @@ class HttpxSender(BaseSender):
             response_text = e.response.text
             response_size_bytes = len(e.response.content)
             # Add debug log
-            print(f"[Debug {self.library_name}] HTTP Status Error: {e.response.status_code}, Response: {response_text[:200]}")
+            log.debug("send_error", "[Debug %s] HTTP Status Error: %s, Response: %s", self.library_name, e.response.status_code, response_text[:200], library=self.library_name)
             return e.response.status_code, response_text, response_size_bytes, False
         except httpx.RequestError as e:
             # Add debug log
-            print(f"[Debug {self.library_name}] Request Error: {e}")
+            log.debug("send_error", "[Debug %s] Request Error: %s", self.library_name, e, library=self.library_name)
             return 0, str(e), 0, False # Use 0 for status code on connection errors
         except Exception as e:
             # Add debug log
-            print(f"[Debug {self.library_name}] General Error: Type={type(e).__name__}, Error={e}")
+            log.debug("send_error", "[Debug %s] General Error: Type=%s, Error=%s", self.library_name, type(e).__name__, e, library=self.library_name)
             return 500, str(e), 0, False # Use 500 for unknown errors
 
+    def _post_sync(self, api_url, data):
+        # A fresh Client (and connection) per call; HttpxClientSender keeps one for the whole run
+        with httpx.Client(**self._protocol_options(1)) as client:
+            return client.post(api_url, data=data, timeout=10.0, extensions=self._sync_trace_extensions())
+
+    def _sync_trace_extensions(self):
+        return {"trace": httpcore_trace} if self.config.CONNECTION_PHASE_TIMING else None
+
     def send_message_sync(self, db_conn, text_payload, message_params):
         # This sync version is primarily a placeholder if needed, focus is async
         api_url = self.api_url_template.format(token=self.token)
@@ -60,12 +109,12 @@ class HttpxSender(BaseSender):
             **message_params
         }
         try:
-            with httpx.Client() as client:
-                response = client.post(api_url, data=data, timeout=10.0)
-                response.raise_for_status()
-                response_text = response.text
-                response_size_bytes = len(response.content)
-                return response.status_code, response_text, response_size_bytes, True
+            response = self._post_sync(api_url, data)
+            self._count_http_version(response)
+            response.raise_for_status()
+            response_text = response.text
+            response_size_bytes = len(response.content)
+            return response.status_code, response_text, response_size_bytes, True
         except httpx.HTTPStatusError as e:
             response_text = e.response.text
             response_size_bytes = len(e.response.content)
@@ -0,0 +1,25 @@
+import httpx
+from .httpx_sender import HttpxSender
+
+class HttpxSyncSender(HttpxSender):
+    """httpx's synchronous API with a fresh Client per message (the cold per-call baseline)."""
+
+    def get_sender_type(self):
+        return "sync"
+
+    def _requested_http_version(self):
+        return str(self.config.HTTPX_SYNC_HTTP_VERSION)
+
+class HttpxClientSender(HttpxSyncSender):
+    """httpx's synchronous API through one long-lived Client, so connections are kept alive across messages."""
+
+    def __init__(self, token, chat_id, api_url_template, config_obj):
+        super().__init__(token, chat_id, api_url_template, config_obj)
+        # One keep-alive connection per worker thread by default (httpx.Client is thread-safe)
+        self.client = httpx.Client(timeout=httpx.Timeout(10.0, connect=5.0), **self._protocol_options(self.config.SYNC_THREAD_WORKERS))
+
+    def _post_sync(self, api_url, data):
+        return self.client.post(api_url, data=data, extensions=self._sync_trace_extensions())
+
+    def close_sync_session(self):
+        self.client.close()
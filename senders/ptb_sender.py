@@ -1,10 +1,13 @@
 from telegram import Bot
 from telegram.error import TelegramError, BadRequest, TimedOut, NetworkError
-# from telegram.request import HTTPXRequest # Not strictly needed for default PTB usage
+from telegram.request import HTTPXRequest # Needed to size PTB's connection pool for concurrent sends
 import json
 
+import event_log
 from .base_sender import BaseSender # Removed PerformanceStats
 
+log = event_log.get_logger(__name__)
+
 class PTBSender(BaseSender):
     name = "python-telegram-bot"
     _bot: Bot = None
@@ -12,7 +15,12 @@ class PTBSender(BaseSender):
     async def initialize_session(self):
         if not self.config.TELEGRAM_BOT_TOKEN:
             raise ValueError("TELEGRAM_BOT_TOKEN not found in config for PTBSender.")
-        self._bot = Bot(token=self.config.TELEGRAM_BOT_TOKEN)
+        # Size PTB's connection pool to the in-flight window, so its connection limit matches
+        # BaseSender's worker count instead of PTB's default (256 in v22)
+        request = HTTPXRequest(connection_pool_size=self.config.MAX_CONCURRENT_REQUESTS_PER_LIBRARY)
+        # PTB appends the token to base_url, so this also targets the local mock server when enabled
+        self._bot = Bot(token=self.config.TELEGRAM_BOT_TOKEN, request=request,
+                        base_url=f"{self.config.TELEGRAM_API_BASE_URL}/bot")
         await self._bot.initialize()
         return self._bot # BaseSender expects the session object to be returned
 
@@ -51,40 +59,40 @@ class PTBSender(BaseSender):
             # Specific logging for PTB errors
             error_desc = e.message
             error_code = 400 # Assume 400 for BadRequest
-            print(f"{self.name} sender BadRequest: {error_desc}")
-            print(f"[Debug {self.name}] BadRequest Detail: {error_desc}")
+            log.warning("send_error", "%s sender BadRequest: %s", self.name, error_desc, library=self.name)
+            log.debug("send_error", "[Debug %s] BadRequest Detail: %s", self.name, error_desc, library=self.name)
             error_json_str = json.dumps({"ok": False, "error_code": error_code, "description": error_desc})
             return error_code, error_json_str, len(error_json_str.encode('utf-8')), False
             
         except TimedOut as e:
             error_desc = e.message
             error_code = 504 # Assume 504
-            print(f"{self.name} sender TimedOut: {error_desc}")
-            print(f"[Debug {self.name}] TimedOut Detail: {error_desc}")
+            log.warning("send_error", "%s sender TimedOut: %s", self.name, error_desc, library=self.name)
+            log.debug("send_error", "[Debug %s] TimedOut Detail: %s", self.name, error_desc, library=self.name)
             error_json_str = json.dumps({"ok": False, "error_code": error_code, "description": error_desc})
             return error_code, error_json_str, len(error_json_str.encode('utf-8')), False
             
         except NetworkError as e: # More general network issue
             error_desc = e.message
             error_code = 503 # Assume 503
-            print(f"{self.name} sender NetworkError: {error_desc}")
-            print(f"[Debug {self.name}] NetworkError Detail: {error_desc}")
+            log.warning("send_error", "%s sender NetworkError: %s", self.name, error_desc, library=self.name)
+            log.debug("send_error", "[Debug %s] NetworkError Detail: %s", self.name, error_desc, library=self.name)
             error_json_str = json.dumps({"ok": False, "error_code": error_code, "description": error_desc})
             return error_code, error_json_str, len(error_json_str.encode('utf-8')), False
             
         except TelegramError as e: # Catch other Telegram-specific errors
             error_desc = e.message
             error_code = 500 # Assume generic 500
-            print(f"{self.name} sender TelegramError: {error_desc}")
-            print(f"[Debug {self.name}] TelegramError Detail: Type={type(e).__name__}, Error={error_desc}")
+            log.warning("send_error", "%s sender TelegramError: %s", self.name, error_desc, library=self.name)
+            log.debug("send_error", "[Debug %s] TelegramError Detail: Type=%s, Error=%s", self.name, type(e).__name__, error_desc, library=self.name)
             error_json_str = json.dumps({"ok": False, "error_code": error_code, "description": error_desc})
             return error_code, error_json_str, len(error_json_str.encode('utf-8')), False
             
         except Exception as e:
             error_desc = str(e)
             error_code = 500 # Assume generic 500
-            print(f"{self.name} sender general error: {e}")
-            print(f"[Debug {self.name}] General Error Detail: Type={type(e).__name__}, Error={error_desc}")
+            log.warning("send_error", "%s sender general error: %s", self.name, e, library=self.name)
+            log.debug("send_error", "[Debug %s] General Error Detail: Type=%s, Error=%s", self.name, type(e).__name__, error_desc, library=self.name)
             error_json_str = json.dumps({"ok": False, "error_code": error_code, "description": error_desc})
             return error_code, error_json_str, len(error_json_str.encode('utf-8')), False
 
@@ -1,14 +1,19 @@
 from telebot.async_telebot import AsyncTeleBot
+from telebot import asyncio_helper
 from telebot.apihelper import ApiTelegramException
 from telebot.types import Message # For type hinting
 import json
 import importlib.metadata # Import the metadata module
 
+import event_log
 from .base_sender import BaseSender # Removed PerformanceStats
 
+log = event_log.get_logger(__name__)
+
 class PyTelegramBotAPISender(BaseSender):
     name = "pytelegrambotapi"
     _bot: AsyncTeleBot = None
+    _saved_helper_settings: dict = None # asyncio_helper's module-level values before this run
 
     async def initialize_session(self):
         """Initializes the AsyncTeleBot object."""
@@ -16,7 +21,13 @@ class PyTelegramBotAPISender(BaseSender):
             raise ValueError("TELEGRAM_BOT_TOKEN not found in config for PyTelegramBotAPISender.")
         
         # AsyncTeleBot manages its own aiohttp.ClientSession internally.
-        # We can pass custom loop or proxy settings if needed, but defaults are fine for benchmark.
+        # Its connector limit and endpoint are module-level settings: set them for this run only
+        # (close_session restores them, so later runs with another concurrency aren't affected).
+        self._saved_helper_settings = {"REQUEST_LIMIT": asyncio_helper.REQUEST_LIMIT, "API_URL": asyncio_helper.API_URL}
+        # Match the connector limit to the in-flight window
+        asyncio_helper.REQUEST_LIMIT = self.config.MAX_CONCURRENT_REQUESTS_PER_LIBRARY
+        # The API endpoint is module-level too ("{0}" is the token, "{1}" the method name)
+        asyncio_helper.API_URL = f"{self.config.TELEGRAM_API_BASE_URL}/bot{{0}}/{{1}}"
         self._bot = AsyncTeleBot(token=self.config.TELEGRAM_BOT_TOKEN)
         
         # The "session" for BaseSender is the AsyncTeleBot instance.
@@ -27,9 +38,14 @@ class PyTelegramBotAPISender(BaseSender):
     async def close_session(self, session: AsyncTeleBot):
         """Closes the AsyncTeleBot's internal aiohttp session."""
         # 'session' is the self._bot instance.
-        if session: # Which is self._bot
-            await session.close_session() # This is the method to close its underlying client session
-        self._bot = None
+        try:
+            if session: # Which is self._bot
+                await session.close_session() # This is the method to close its underlying client session
+        finally:
+            self._bot = None
+            for name, value in (self._saved_helper_settings or {}).items():
+                setattr(asyncio_helper, name, value)
+            self._saved_helper_settings = None
 
     async def send_message_async(self, 
                                  session: AsyncTeleBot, # Add session parameter
@@ -60,7 +76,7 @@ class PyTelegramBotAPISender(BaseSender):
                         response_text = json.dumps(sent_message_obj.to_dict())
                         response_size = len(response_text.encode('utf-8'))
                     except Exception as e_dict:
-                        print(f"[Debug {self.name}] Error using to_dict(): {e_dict}")
+                        log.debug("response_parse_error", "[Debug %s] Error using to_dict(): %s", self.name, e_dict, library=self.name)
                         response_text = str(sent_message_obj)
                 elif hasattr(sent_message_obj, 'json'): # Typically a property, not a method
                     try:
@@ -71,10 +87,10 @@ class PyTelegramBotAPISender(BaseSender):
                             response_text = sent_message_obj.json # If .json is a string
                             response_size = len(response_text.encode('utf-8'))
                         except Exception as e_json_prop:
-                            print(f"[Debug {self.name}] Error using .json property: {e_json_prop}")
+                            log.debug("response_parse_error", "[Debug %s] Error using .json property: %s", self.name, e_json_prop, library=self.name)
                             response_text = str(sent_message_obj)
                     except Exception as e_json:
-                        print(f"[Debug {self.name}] Error using .json: {e_json}")
+                        log.debug("response_parse_error", "[Debug %s] Error using .json: %s", self.name, e_json, library=self.name)
                         response_text = str(sent_message_obj)
                 elif hasattr(sent_message_obj, 'text'): # For simple text responses
                     response_text = str(sent_message_obj.text)
@@ -89,14 +105,14 @@ class PyTelegramBotAPISender(BaseSender):
             # Specific logging for pyTelegramBotAPI errors
             status_code = e.error_code if isinstance(e.error_code, int) else 500
             error_desc = e.description
-            print(f"{self.name} sender ApiTelegramException: {status_code} - {error_desc}")
+            log.warning("send_error", "%s sender ApiTelegramException: %s - %s", self.name, status_code, error_desc, library=self.name)
             
             response_body_str = ""
             if e.result and isinstance(e.result, (str, bytes)):
                 response_body_str = e.result.decode('utf-8') if isinstance(e.result, bytes) else str(e.result)
-                print(f"[Debug {self.name}] ApiTelegramException Response Body: {response_body_str[:500]}") # Log response body
+                log.debug("send_error", "[Debug %s] ApiTelegramException Response Body: %s", self.name, response_body_str[:500], library=self.name) # Log response body
             else:
-                print(f"[Debug {self.name}] ApiTelegramException: No response body available. Description: {error_desc}")
+                log.debug("send_error", "[Debug %s] ApiTelegramException: No response body available. Description: %s", self.name, error_desc, library=self.name)
                 response_body_str = json.dumps({"ok": False, "error_code": status_code, "description": error_desc})
             
             response_size = len(response_body_str.encode('utf-8'))
@@ -106,8 +122,8 @@ class PyTelegramBotAPISender(BaseSender):
             # Specific logging for general errors
             error_desc = str(e)
             error_code = 500 # Assume generic 500
-            print(f"{self.name} sender general error: {e}")
-            print(f"[Debug {self.name}] General Error Detail: Type={type(e).__name__}, Error={error_desc}")
+            log.warning("send_error", "%s sender general error: %s", self.name, e, library=self.name)
+            log.debug("send_error", "[Debug %s] General Error Detail: Type=%s, Error=%s", self.name, type(e).__name__, error_desc, library=self.name)
             error_response_str = json.dumps({"ok":False, "description": error_desc})
             return error_code, error_response_str, len(error_response_str.encode('utf-8')), False
 
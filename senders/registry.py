@@ -0,0 +1,67 @@
+"""Registry of benchmarkable senders: benchmark name -> (module, class), imported only when selected.
+
+main.py looks senders up here instead of importing every HTTP library at startup, so a run
+limited by LIBRARIES_TO_TEST only imports the libraries it benchmarks. `measure_import_cost`
+quantifies what importing each one costs a cold process (the serverless start-up penalty).
+"""
+import importlib
+import json
+import os
+import subprocess
+import sys
+
+SENDER_CLASS_PATHS = {
+    "httpx": ("senders.httpx_sender", "HttpxSender"),
+    "aiohttp": ("senders.aiohttp_sender", "AiohttpSender"),
+    "requests": ("senders.requests_sender", "RequestsSender"),
+    "requests-session": ("senders.requests_session_sender", "RequestsSessionSender"), # One long-lived Session instead of requests.post per call
+    "httpx-sync": ("senders.httpx_sync_sender", "HttpxSyncSender"), # httpx's sync API, fresh Client per call
+    "httpx-client": ("senders.httpx_sync_sender", "HttpxClientSender"), # httpx's sync API, one long-lived Client
+    "urllib3": ("senders.urllib3_sender", "Urllib3Sender"),
+    "uplink": ("senders.uplink_sender", "UplinkSender"),
+    "python-telegram-bot": ("senders.ptb_sender", "PTBSender"),
+    "pytelegrambotapi": ("senders.pytelegrambotapi_sender", "PyTelegramBotAPISender"),
+}
+
+def load_sender_class(name):
+    """Imports and returns the sender class registered as `name`."""
+    module_path, class_name = SENDER_CLASS_PATHS[name]
+    return getattr(importlib.import_module(module_path), class_name)
+
+def library_column_value(name):
+    """The `library` column value of `name`'s messages (its class name without "Sender", as BaseSender.library_name)."""
+    return SENDER_CLASS_PATHS[name][1].replace("Sender", "")
+
+# Runs in a fresh interpreter: imports the shared sender base first (config, NumPy, psutil, DB drivers),
+# then the sender module, so the second figure is what choosing this library adds
+_IMPORT_PROBE = """
+import sys
+result_pipe, sys.stdout = sys.stdout, sys.stderr # config prints warnings on import
+import importlib, json, time
+import psutil
+process = psutil.Process()
+start = time.perf_counter()
+import senders.base_sender
+base_done = time.perf_counter()
+base_rss = process.memory_info().rss
+modules_before = len(sys.modules)
+importlib.import_module(sys.argv[1])
+done = time.perf_counter()
+json.dump({
+    "base_import_time_s": round(base_done - start, 4),
+    "import_time_s": round(done - base_done, 4),
+    "import_memory_mb": round((process.memory_info().rss - base_rss) / (1024 * 1024), 2),
+    "modules_imported": len(sys.modules) - modules_before,
+}, result_pipe)
+"""
+
+def measure_import_cost(name):
+    """Cold import cost of sender `name`, measured in a fresh interpreter. Returns a dict, or None on failure."""
+    module_path, _ = SENDER_CLASS_PATHS[name]
+    project_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    completed = subprocess.run([sys.executable, "-c", _IMPORT_PROBE, module_path], cwd=project_dir,
+                               stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, timeout=120)
+    if completed.returncode != 0:
+        print(f"Could not measure the import cost of {name} (exit code {completed.returncode}).")
+        return None
+    return json.loads(completed.stdout)
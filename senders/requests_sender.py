@@ -15,6 +15,10 @@ class RequestsSender(BaseSender):
         # No explicit session to close that was managed by initialize_session
         pass
 
+    def _post(self, url, **kwargs):
+        # Module-level requests.post: a throwaway Session (and connection) per call
+        return requests.post(url, **kwargs)
+
     def send_message_sync(self, db_conn, text_payload, message_params):
         data = {
             'chat_id': self.chat_id,
@@ -24,7 +28,7 @@ class RequestsSender(BaseSender):
         response_size_bytes = 0
         response_text = ""
         try:
-            response = requests.post(self.api_url, data=data, timeout=10) 
+            response = self._post(self.api_url, data=data, timeout=10)
             response_size_bytes = len(response.content) # Get size from content bytes
             response_text = response.text # Access text after size
             response.raise_for_status() # Raise an HTTPError for bad responses (4xx or 5xx)
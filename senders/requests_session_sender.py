@@ -0,0 +1,23 @@
+import requests
+from requests.adapters import HTTPAdapter
+from .requests_sender import RequestsSender
+from connection_timing import instrument_pool_manager
+
+class RequestsSessionSender(RequestsSender):
+    """requests through one long-lived Session, so connections are kept alive across messages."""
+
+    def __init__(self, token, chat_id, api_url_template, config_obj):
+        super().__init__(token, chat_id, api_url_template, config_obj)
+        self.session = requests.Session()
+        # One pooled connection per worker thread; pool_block makes extra threads wait instead of opening throwaway connections
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=int(self.config.SYNC_THREAD_WORKERS), pool_block=True)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        if self.config.CONNECTION_PHASE_TIMING:
+            instrument_pool_manager(adapter.poolmanager) # Per-request connect / TLS / TTFB timing
+
+    def _post(self, url, **kwargs):
+        return self.session.post(url, **kwargs)
+
+    def close_sync_session(self):
+        self.session.close()
@@ -4,6 +4,7 @@ import aiohttp
 import typing
 import json
 from .base_sender import BaseSender
+from connection_timing import aiohttp_trace_config
 
 # Define the Telegram API consumer using Uplink
 class TelegramAPI(Consumer):
@@ -24,11 +25,12 @@ class UplinkSender(BaseSender):
     async def initialize_session(self):
         """Initialize the aiohttp session and Uplink service."""
         self._aiohttp_session = aiohttp.ClientSession(
-            connector=aiohttp.TCPConnector(limit=self.config.MAX_CONCURRENT_REQUESTS_PER_LIBRARY)
+            connector=aiohttp.TCPConnector(limit=self.config.MAX_CONCURRENT_REQUESTS_PER_LIBRARY),
+            trace_configs=[aiohttp_trace_config()] if self.config.CONNECTION_PHASE_TIMING else None
         )
         
         # Build the Telegram API client with the base URL including the token
-        base_url = f"https://api.telegram.org/bot{self.token}/"
+        base_url = f"{self.config.TELEGRAM_API_BASE_URL}/bot{self.token}/"
         self._api = uplink.build(TelegramAPI, base_url=base_url, client=self._aiohttp_session)
         
         return self._aiohttp_session
@@ -81,7 +83,7 @@ class UplinkSender(BaseSender):
         import requests
         
         # Format the URL directly
-        url = f"https://api.telegram.org/bot{self.token}/sendMessage"
+        url = f"{self.config.TELEGRAM_API_BASE_URL}/bot{self.token}/sendMessage"
         
         # Prepare the form data
         data = {
@@ -1,12 +1,16 @@
 import urllib3
 import json # For encoding the payload
 from .base_sender import BaseSender
+from connection_timing import instrument_pool_manager
 
 class Urllib3Sender(BaseSender):
     def __init__(self, token, chat_id, api_url_template, config_obj):
         super().__init__(token, chat_id, api_url_template, config_obj)
         # Create a PoolManager instance. Consider if timeout/retries need adjustment.
-        self.http = urllib3.PoolManager()
+        # Keep one pooled connection per worker thread so threaded runs don't discard connections.
+        self.http = urllib3.PoolManager(maxsize=int(self.config.SYNC_THREAD_WORKERS))
+        if self.config.CONNECTION_PHASE_TIMING:
+            instrument_pool_manager(self.http) # Per-request connect / TLS / TTFB timing
         self.api_url = self.api_url_template.format(token=self.token)
 
     async def initialize_session(self):
@@ -19,6 +23,9 @@ class Urllib3Sender(BaseSender):
         # Connections are managed internally.
         pass
 
+    def close_sync_session(self):
+        self.http.clear() # Closes the pooled keep-alive connections
+
     def send_message_sync(self, db_conn, text_payload, message_params):
         data = {
             'chat_id': self.chat_id,
@@ -0,0 +1,222 @@
+"""Repeated trials and significance testing between libraries.
+
+A single run per library can't tell a real difference from run-to-run noise (other processes,
+CPU frequency, network jitter, the mock server's random latency). With TRIALS > 1 the whole
+library list is run TRIALS times, rotating the library order every trial so that no library
+always runs first or last and slow drift over the session is spread evenly across libraries.
+
+Each ranked metric gets its per-trial values, mean, standard deviation and a bootstrap 95%
+confidence interval of the mean. Every pair of libraries in every ranking is then compared
+with a two-sided Mann-Whitney U test over the per-trial values (exact when the number of
+orderings is small enough to enumerate, normal approximation with tie correction otherwise)
+plus a bootstrap confidence interval of the difference in means. Pairs with p >= SIGNIFICANCE_ALPHA
+are reported as ties. With 3 trials per library the smallest possible exact p-value is 0.1, so
+use at least 4 (better 5+) trials for a 0.05 threshold.
+
+Only the standard library is used (no scipy).
+"""
+import itertools
+import math
+import os
+import random
+import shutil
+import statistics
+
+import config
+
+# Ranking keys in overall_summary["rankings"] (already ordered best first) -> workflow metric
+RANKED_METRICS = {
+    "avg_total_processing_time_s": "avg_total_processing_time_s",
+    "throughput_msg_per_sec": "throughput_msg_per_sec",
+    "std_total_processing_time_s": "std_total_processing_time_s",
+    "avg_db_read_time_s": "avg_db_read_time_s",
+    "avg_http_send_time_s": "avg_http_send_time_s",
+    "success_rate": "success_rate_percent",
+    "avg_response_size_bytes": "avg_response_size_bytes",
+    "memory_increase_mb": "memory_increase_mb",
+    "cpu_time_percent": "cpu_time_percent",
+    "peak_rss_mb": "peak_rss_mb",
+}
+
+_BOOTSTRAP_SEED = 0 # Fixed, so the same trial values always give the same intervals
+_EXACT_TEST_MAX_ORDERINGS = 50_000
+
+def trial_order(names, trial):
+    """The library order for one trial: the list rotated by one position per trial."""
+    names = list(names)
+    if not names:
+        return names
+    shift = trial % len(names)
+    return names[shift:] + names[:shift]
+
+def archive_attempt_logs(result_data, trial):
+    """Moves a trial's attempt logs under attempts/trials/trial_<n>/ so the next trial doesn't overwrite them."""
+    trial_dirname = os.path.join(config.ATTEMPT_LOGS_DIRNAME, "trials", f"trial_{trial + 1}")
+
+    def archive(relative_path):
+        if not relative_path:
+            return relative_path
+        inside_logs_dir = os.path.relpath(relative_path, config.ATTEMPT_LOGS_DIRNAME)
+        archived_path = os.path.join(trial_dirname, inside_logs_dir)
+        source = os.path.join(config.REPORTS_DIR, relative_path)
+        if not os.path.exists(source):
+            return relative_path
+        os.makedirs(os.path.dirname(os.path.join(config.REPORTS_DIR, archived_path)), exist_ok=True)
+        shutil.move(source, os.path.join(config.REPORTS_DIR, archived_path))
+        return archived_path
+
+    result_data = dict(result_data)
+    if result_data.get("run_details_files"):
+        result_data["run_details_files"] = [archive(path) for path in result_data["run_details_files"]]
+        result_data["run_details_file"] = result_data["run_details_files"][0]
+    else:
+        result_data["run_details_file"] = archive(result_data.get("run_details_file"))
+    return result_data
+
+def _bootstrap_means(values, resamples, rng):
+    count = len(values)
+    return [sum(rng.choices(values, k=count)) / count for _ in range(resamples)]
+
+def _percentile_interval(samples, confidence=0.95):
+    ordered = sorted(samples)
+    tail = (1 - confidence) / 2
+    low_index = int(math.floor(tail * (len(ordered) - 1)))
+    high_index = int(math.ceil((1 - tail) * (len(ordered) - 1)))
+    return ordered[low_index], ordered[high_index]
+
+def describe(values):
+    """Mean, std, range and bootstrap 95% CI of the mean of one metric's per-trial values."""
+    rng = random.Random(_BOOTSTRAP_SEED)
+    mean = statistics.fmean(values)
+    ci_low, ci_high = _percentile_interval(_bootstrap_means(values, config.BOOTSTRAP_RESAMPLES, rng)) if len(values) > 1 else (None, None)
+    return {
+        "values": values,
+        "mean": round(mean, 6),
+        "std": round(statistics.stdev(values), 6) if len(values) > 1 else None,
+        "min": min(values),
+        "max": max(values),
+        "ci95_low": round(ci_low, 6) if ci_low is not None else None,
+        "ci95_high": round(ci_high, 6) if ci_high is not None else None,
+    }
+
+def combine_trials(trial_results):
+    """One library's entry from its [(trial, result_data), ...] runs.
+
+    The entry is the median-throughput trial's result (so histograms, timelines and percentiles
+    stay those of one real run), with every ranked metric replaced by its mean over all trials.
+    Per-trial values and confidence intervals go under "trials".
+    """
+    metrics = {}
+    for metric in RANKED_METRICS.values():
+        values = [result_data.get("workflow", {}).get(metric) for _, result_data in trial_results]
+        values = [value for value in values if value is not None]
+        if values:
+            metrics[metric] = describe(values)
+
+    by_throughput = sorted(trial_results, key=lambda run: run[1].get("workflow", {}).get("throughput_msg_per_sec") or 0)
+    representative_trial, representative = by_throughput[(len(by_throughput) - 1) // 2]
+    combined = dict(representative)
+    workflow = dict(combined.get("workflow", {}))
+    for metric, stats in metrics.items():
+        workflow[metric] = stats["mean"]
+    combined["workflow"] = workflow
+    combined["trials"] = {
+        "count": len(trial_results),
+        "trial_numbers": [trial + 1 for trial, _ in trial_results],
+        "representative_trial": representative_trial + 1,
+        "metrics": metrics,
+    }
+    return combined
+
+def _midranks(values):
+    """1-based ranks of `values`, tied values sharing the average of their positions."""
+    order = sorted(range(len(values)), key=lambda index: values[index])
+    ranks = [0.0] * len(values)
+    start = 0
+    while start < len(order):
+        end = start
+        while end + 1 < len(order) and values[order[end + 1]] == values[order[start]]:
+            end += 1
+        for position in range(start, end + 1):
+            ranks[order[position]] = (start + end) / 2 + 1
+        start = end + 1
+    return ranks
+
+def mann_whitney_u(a, b):
+    """Two-sided Mann-Whitney U test. Returns (U of `a`, p-value)."""
+    n1, n2 = len(a), len(b)
+    ranks = _midranks(list(a) + list(b))
+    u = sum(ranks[:n1]) - n1 * (n1 + 1) / 2
+    mean_u = n1 * n2 / 2
+    observed = abs(u - mean_u)
+
+    if math.comb(n1 + n2, n1) <= _EXACT_TEST_MAX_ORDERINGS:
+        # Exact permutation distribution of U over the pooled (mid)ranks, so ties are handled exactly
+        extreme = total = 0
+        for group in itertools.combinations(ranks, n1):
+            total += 1
+            if abs(sum(group) - n1 * (n1 + 1) / 2 - mean_u) >= observed - 1e-9:
+                extreme += 1
+        return u, extreme / total
+
+    # Normal approximation with tie and continuity corrections
+    n = n1 + n2
+    tie_term = sum(count ** 3 - count for count in _tie_counts(ranks))
+    variance = n1 * n2 / 12 * ((n + 1) - tie_term / (n * (n - 1)))
+    if variance <= 0:
+        return u, 1.0
+    z = max(observed - 0.5, 0) / math.sqrt(variance)
+    return u, min(1.0, 2 * (1 - statistics.NormalDist().cdf(z)))
+
+def _tie_counts(ranks):
+    counts = {}
+    for rank in ranks:
+        counts[rank] = counts.get(rank, 0) + 1
+    return [count for count in counts.values() if count > 1]
+
+def compare(a, b):
+    """Compares per-trial values `a` (the better-ranked library) with `b`."""
+    rng = random.Random(_BOOTSTRAP_SEED)
+    differences = [mean_a - mean_b for mean_a, mean_b in zip(_bootstrap_means(a, config.BOOTSTRAP_RESAMPLES, rng),
+                                                               _bootstrap_means(b, config.BOOTSTRAP_RESAMPLES, rng))]
+    ci_low, ci_high = _percentile_interval(differences)
+    mean_a, mean_b = statistics.fmean(a), statistics.fmean(b)
+    _, p_value = mann_whitney_u(a, b)
+    return {
+        "mean_difference": round(mean_a - mean_b, 6),
+        "difference_percent": round((mean_a - mean_b) / mean_b * 100, 2) if mean_b else None,
+        "ci95_difference": [round(ci_low, 6), round(ci_high, 6)],
+        "ci95_difference_percent": [round(ci_low / mean_b * 100, 2), round(ci_high / mean_b * 100, 2)] if mean_b else None,
+        "p_value": round(p_value, 4),
+        "significant": p_value < config.SIGNIFICANCE_ALPHA,
+    }
+
+def rank_significance(libraries, rankings):
+    """Significance of every pairwise ordering in `rankings`, from the libraries' per-trial values.
+
+    Returns {ranking_key: {"leader", "tied_with_leader", "leader_is_significant", "pairs": [...]}}
+    for every ranking whose libraries have at least two trials each.
+    """
+    significance = {}
+    for ranking_key, ranked in rankings.items():
+        if ranking_key not in RANKED_METRICS:
+            continue
+        metric = RANKED_METRICS[ranking_key]
+        values = {lib_name: ((libraries.get(lib_name, {}).get("trials") or {}).get("metrics", {}).get(metric) or {}).get("values")
+                  for lib_name, _ in ranked}
+        ranked_names = [lib_name for lib_name, _ in ranked if values.get(lib_name) and len(values[lib_name]) > 1]
+        if len(ranked_names) < 2:
+            continue
+        pairs = []
+        for better, worse in itertools.combinations(ranked_names, 2):
+            pairs.append({"better": better, "worse": worse, **compare(values[better], values[worse])})
+        leader = ranked_names[0]
+        tied_with_leader = [pair["worse"] for pair in pairs if pair["better"] == leader and not pair["significant"]]
+        significance[ranking_key] = {
+            "metric": metric,
+            "leader": leader,
+            "tied_with_leader": tied_with_leader,
+            "leader_is_significant": not tied_with_leader,
+            "pairs": pairs,
+        }
+    return significance